@@ -0,0 +1,58 @@
+"""Compare the overhead of DataFrame and numpy_params criterion functions.
+
+For a very cheap criterion with many parameters, most of the runtime of an
+optimization is spent on building the params DataFrame for each evaluation. This
+script measures how much of it is saved by decorating the criterion with
+:func:`~estimagic.decorators.numpy_params`.
+
+Run it with ``python docs/scripts/benchmark_numpy_params.py``.
+
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+from estimagic.decorators import numpy_params
+from estimagic.optimization.optimize import minimize
+
+N_PARAMS = 300
+N_ITERATIONS = 3
+N_REPETITIONS = 5
+
+
+def dataframe_criterion(params):
+    x = params["value"].to_numpy()
+    return x @ x
+
+
+@numpy_params
+def numpy_criterion(x):
+    return x @ x
+
+
+def run_optimization(criterion):
+    params = pd.DataFrame({"value": np.linspace(1, 2, N_PARAMS)})
+    minimize(
+        criterion=criterion,
+        params=params,
+        algorithm="scipy_lbfgsb",
+        algo_options={"stopping_max_iterations": N_ITERATIONS},
+        logging=False,
+    )
+
+
+def main():
+    for name, criterion in [
+        ("DataFrame", dataframe_criterion),
+        ("numpy_params", numpy_criterion),
+    ]:
+        # the first run is not timed because it includes imports and compilation
+        run_optimization(criterion)
+        timings = timeit.repeat(
+            lambda: run_optimization(criterion), number=1, repeat=N_REPETITIONS
+        )
+        print(f"{name}: {np.mean(timings):.3f}s per optimization")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from estimagic import utilities
 from estimagic.benchmarking.get_benchmark_problems import get_benchmark_problems
 from estimagic.benchmarking.run_benchmark import run_benchmark
+from estimagic.differentiation.derivatives import directional_derivative
 from estimagic.differentiation.derivatives import first_derivative
 from estimagic.differentiation.derivatives import second_derivative
 from estimagic.estimation.estimate_ml import estimate_ml
@@ -31,6 +32,7 @@ __all__ = [
     "utilities",
     "first_derivative",
     "second_derivative",
+    "directional_derivative",
     "bootstrap",
     "bootstrap_from_outcomes",
     "estimate_msm",
@@ -4,6 +4,17 @@ All batch evaluators have the same interface and any function with the same inte
 can be used used as batch evaluator in estimagic.
 
 """
+import hashlib
+import multiprocessing
+import shutil
+import signal
+import tempfile
+import weakref
+from pathlib import Path
+
+import cloudpickle
+import numpy as np
+import pandas as pd
 from joblib import delayed
 from joblib import Parallel
 
@@ -17,6 +28,7 @@ except ImportError:
 
 from estimagic.config import DEFAULT_N_CORES as N_CORES
 from estimagic.decorators import catch
+from estimagic.decorators import get_batch_function
 from estimagic.decorators import unpack
 
 
@@ -129,6 +141,272 @@ def joblib_batch_evaluator(
     return res
 
 
+def pool_batch_evaluator(
+    func,
+    arguments,
+    n_cores=N_CORES,
+    error_handling="continue",
+    unpack_symbol=None,
+):
+    """Batch evaluator based on a temporary :class:`PoolBatchEvaluator`.
+
+    The worker processes are shut down after the evaluation. To keep them alive
+    between calls, create a :class:`PoolBatchEvaluator` yourself and use it as
+    batch_evaluator. Inside ``minimize`` and ``maximize``, the string "pool" is
+    replaced by one such evaluator that lives as long as the optimization.
+
+    Args:
+        func (Callable): The function that is evaluated.
+        arguments (Iterable): Arguments for the functions. Their interperation
+            depends on the unpack argument.
+        n_cores (int): Number of cores used to evaluate the function in parallel.
+            Value below one are interpreted as one. If only one core is used, the
+            batch evaluator disables everything that could cause problems, i.e. in that
+            case func and arguments are never pickled and func is executed in the main
+            process.
+        error_handling (str): Can take the values "raise" (raise the error and stop all
+            tasks as soon as one task fails) and "continue" (catch exceptions and set
+            the output of failed tasks to the traceback of the raised exception.
+            KeyboardInterrupt and SystemExit are always raised.
+        unpack_symbol (str or None). Can be "**", "*" or None. If None, func just takes
+            one argument. If "*", the elements of arguments are positional arguments for
+            func. If "**", the elements of arguments are keyword arguments for func.
+
+    Returns:
+        list: The function evaluations.
+
+    """
+    with PoolBatchEvaluator(n_cores=n_cores) as evaluator:
+        res = evaluator(
+            func=func,
+            arguments=arguments,
+            n_cores=n_cores,
+            error_handling=error_handling,
+            unpack_symbol=unpack_symbol,
+        )
+    return res
+
+
+class PoolBatchEvaluator:
+    """Batch evaluator that keeps its worker processes alive between calls.
+
+    The worker processes are started at the first call that uses more than one core
+    and are reused by all following calls. func is serialized with cloudpickle and
+    shipped to each worker only once. Subsequent calls with the same func object are
+    not serialized again and calls with an identical func (e.g. a freshly partialled
+    version of the same criterion) are not shipped again. Only the arguments are
+    transferred. Error handling and unpacking are done in the worker processes.
+
+    The evaluator can be used as context manager. Otherwise :meth:`close` has to be
+    called to shut down the workers. If an exception or KeyboardInterrupt occurs while
+    tasks are running, the workers are terminated and restarted at the next call.
+
+    Instances are called with the same arguments as all other batch evaluators.
+
+    Args:
+        n_cores (int): Default number of cores that is used if the evaluator is called
+            without n_cores.
+
+    """
+
+    def __init__(self, n_cores=N_CORES):
+        self.n_cores = n_cores
+        self._pool = None
+        self._pool_size = None
+        self._func_dir = None
+        self._shipped = set()
+        self._shipped_funcs = {}
+        self._finalizer = None
+        self._is_copy = False
+
+    def __call__(
+        self,
+        func,
+        arguments,
+        n_cores=None,
+        error_handling="continue",
+        unpack_symbol=None,
+    ):
+        n_cores = self.n_cores if n_cores is None else n_cores
+        _check_inputs(func, arguments, n_cores, error_handling, unpack_symbol)
+        n_cores = int(n_cores)
+
+        reraise = error_handling == "raise"
+
+        # copies that were sent to other processes never start a nested pool
+        if n_cores <= 1 or self._is_copy:
+            internal_func = _make_internal_func(func, reraise, unpack_symbol)
+            return [internal_func(arg) for arg in arguments]
+
+        self._start(n_cores)
+        func_path = self._ship(func)
+        tasks = [
+            (func_path, reraise, unpack_symbol, cloudpickle.dumps(arg))
+            for arg in arguments
+        ]
+
+        try:
+            raw = self._pool.map_async(_evaluate_shipped_func, tasks).get()
+        except BaseException:
+            self._shutdown(terminate=True)
+            raise
+
+        return [cloudpickle.loads(r) for r in raw]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._shutdown(terminate=exc_type is not None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(
+            _pool=None,
+            _func_dir=None,
+            _shipped=set(),
+            _shipped_funcs={},
+            _finalizer=None,
+            _is_copy=True,
+        )
+        return state
+
+    def close(self):
+        """Shut down the worker processes after all pending tasks are done."""
+        self._shutdown(terminate=False)
+
+    def _start(self, n_cores):
+        if self._pool is not None and self._pool_size != n_cores:
+            self._shutdown(terminate=False)
+        if self._pool is None:
+            self._func_dir = Path(tempfile.mkdtemp(prefix="estimagic_pool_"))
+            self._pool = multiprocessing.Pool(
+                processes=n_cores, initializer=_initialize_worker
+            )
+            self._pool_size = n_cores
+            self._finalizer = weakref.finalize(
+                self, _terminate_pool, self._pool, self._func_dir
+            )
+
+    def _ship(self, func):
+        # func is stored with its path, such that its id cannot be reused by another
+        # object while it is in the cache
+        cached = self._shipped_funcs.get(id(func))
+        if cached is not None and cached[0] is func:
+            return cached[1]
+
+        pickled = cloudpickle.dumps(func)
+        path = self._func_dir / f"{hashlib.sha1(pickled).hexdigest()}.pkl"
+        if path not in self._shipped:
+            path.write_bytes(pickled)
+            self._shipped.add(path)
+
+        if len(self._shipped_funcs) >= 10:
+            del self._shipped_funcs[next(iter(self._shipped_funcs))]
+        self._shipped_funcs[id(func)] = (func, str(path))
+        return str(path)
+
+    def _shutdown(self, terminate):
+        if self._pool is not None:
+            self._finalizer.detach()
+            if terminate:
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            shutil.rmtree(self._func_dir, ignore_errors=True)
+        self._pool = None
+        self._pool_size = None
+        self._func_dir = None
+        self._shipped = set()
+        self._shipped_funcs = {}
+        self._finalizer = None
+
+
+_WORKER_FUNCS = {}
+
+
+def _initialize_worker():
+    # KeyboardInterrupts are handled in the main process which terminates the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _make_internal_func(func, reraise, unpack_symbol):
+    @unpack(symbol=unpack_symbol)
+    @catch(default="__traceback__", reraise=reraise)
+    def internal_func(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    return internal_func
+
+
+def _evaluate_shipped_func(task):
+    func_path, reraise, unpack_symbol, pickled_arg = task
+    key = (func_path, reraise, unpack_symbol)
+    if key not in _WORKER_FUNCS:
+        if len(_WORKER_FUNCS) >= 10:
+            del _WORKER_FUNCS[next(iter(_WORKER_FUNCS))]
+        func = cloudpickle.loads(Path(func_path).read_bytes())
+        _WORKER_FUNCS[key] = _make_internal_func(func, reraise, unpack_symbol)
+    res = _WORKER_FUNCS[key](cloudpickle.loads(pickled_arg))
+    return cloudpickle.dumps(res)
+
+
+def _terminate_pool(pool, func_dir):
+    pool.terminate()
+    shutil.rmtree(func_dir, ignore_errors=True)
+
+
+def evaluate_batch(
+    func, arguments, batch_evaluator, n_cores=N_CORES, error_handling="continue"
+):
+    """Evaluate func at several parameter vectors, vectorized if possible.
+
+    If func is a batch criterion (see :func:`~estimagic.decorators.batch_criterion`),
+    the parameter vectors are stacked into a 2d array and func is evaluated in one
+    call. Otherwise, or if the vectorized call fails and error_handling is "continue",
+    the evaluations are done by batch_evaluator.
+
+    Args:
+        func (Callable): The function that is evaluated.
+        arguments (Iterable): Parameter vectors. Can be numpy arrays, pandas.Series,
+            DataFrames with a "value" column or scalars.
+        batch_evaluator (Callable): An estimagic batch evaluator.
+        n_cores (int): Number of cores used by batch_evaluator.
+        error_handling (str): "raise" or "continue". See the batch evaluators.
+
+    Returns:
+        list: The function evaluations.
+
+    """
+    arguments = list(arguments)
+    batch_func = get_batch_function(func)
+
+    if batch_func is not None and arguments:
+        stacked = np.array([_get_parameter_values(arg) for arg in arguments])
+        try:
+            return list(batch_func(stacked))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            if error_handling == "raise":
+                raise
+
+    return batch_evaluator(
+        func=func, arguments=arguments, n_cores=n_cores, error_handling=error_handling
+    )
+
+
+def _get_parameter_values(params):
+    if isinstance(params, pd.DataFrame):
+        values = params["value"].to_numpy()
+    elif isinstance(params, pd.Series):
+        values = params.to_numpy()
+    else:
+        values = params
+    return np.atleast_1d(np.asarray(values, dtype=float))
+
+
 def _check_inputs(func, arguments, n_cores, error_handling, unpack_symbol):
     if not callable(func):
         raise ValueError("func must be callable.")
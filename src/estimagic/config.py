@@ -79,6 +79,14 @@ else:
     IS_FIDES_INSTALLED = True
 
 
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    IS_PYARROW_INSTALLED = False
+else:
+    IS_PYARROW_INSTALLED = True
+
+
 # =================================================================================
 # Dashboard Defaults
 # =================================================================================
@@ -1,8 +1,6 @@
 from functools import partial
 
 import numpy as np
-from estimagic.logging.database_utilities import read_new_rows
-from estimagic.logging.database_utilities import transpose_nested_list
 
 
 def reset_and_start_convergence(
@@ -11,7 +9,7 @@ def reset_and_start_convergence(
     new,
     session_data,
     doc,
-    database,
+    reader,
     button,
     start_params,
     updating_options,
@@ -24,7 +22,7 @@ def reset_and_start_convergence(
         new: New state of the Button.
 
         doc (bokeh.Document)
-        database (sqlalchemy.MetaData)
+        reader (estimagic.logging.read_log.OptimizationHistoryReader)
         session_data (dict): This app's entry of infos to be passed between and within
             apps. The keys are:
             - last_retrieved (int): last iteration currently in the ColumnDataSource
@@ -44,12 +42,11 @@ def reset_and_start_convergence(
             _update_convergence_plots,
             criterion_cds=criterion_cds,
             param_cds=param_cds,
-            database=database,
+            reader=reader,
             session_data=session_data,
             start_params=start_params,
             rollover=updating_options["rollover"],
             update_chunk=updating_options["update_chunk"],
-            stride=updating_options["stride"],
         )
         callback_dict["plot_periodic_data"] = doc.add_periodic_callback(
             plot_new_data,
@@ -63,6 +60,7 @@ def reset_and_start_convergence(
         doc.remove_periodic_callback(callback_dict["plot_periodic_data"])
         _reset_column_data_sources([criterion_cds, param_cds])
         session_data["last_retrieved"] = 0
+        reader.reset(0)
 
         # change the button color
         button.button_type = "danger"
@@ -70,19 +68,19 @@ def reset_and_start_convergence(
 
 
 def _update_convergence_plots(
-    database,
+    reader,
     criterion_cds,
     param_cds,
     session_data,
     start_params,
     rollover,
     update_chunk,
-    stride,
 ):
     """Callback to look up new entries in the database and plot them.
 
     Args:
-        database (sqlalchemy.MetaData)
+        reader (estimagic.logging.read_log.OptimizationHistoryReader): Reader whose
+            cursor is at the last iteration currently in the ColumnDataSource.
         session_data (dict):
             infos to be passed between and within apps.
             Keys of this app's entry are:
@@ -93,31 +91,18 @@ def _update_convergence_plots(
         update_chunk (int): Number of values to add at each update.
         criterion_cds (bokeh.ColumnDataSource)
         param_cds (bokeh.ColumnDataSource)
-        stride (int): Plot every stride_th database row in the dashboard. Note that
-            some database rows only contain gradient evaluations, thus for some values
-            of stride the convergence plot of the criterion function can be empty.
 
     """
     clip_bound = np.finfo(float).max
-    data, new_last = read_new_rows(
-        database=database,
-        table_name="optimization_iterations",
-        last_retrieved=session_data["last_retrieved"],
-        return_type="dict_of_lists",
-        limit=update_chunk,
-        stride=stride,
-    )
+    data = reader.read_new_rows(limit=update_chunk)
 
     # update the criterion plot
-    # todo: remove None entries!
-    missing = [i for i, val in enumerate(data["value"]) if val is None]
+    has_value = ~np.isnan(data["value"])
     crit_data = {
-        "iteration": [id_ for i, id_ in enumerate(data["rowid"]) if i not in missing],
-        "criterion": [
-            np.clip(val, -clip_bound, clip_bound)
-            for i, val in enumerate(data["value"])
-            if i not in missing
-        ],
+        "iteration": data["rowid"][has_value].tolist(),
+        "criterion": np.clip(
+            data["value"][has_value], -clip_bound, clip_bound
+        ).tolist(),
     }
     _stream_data(cds=criterion_cds, data=crit_data, rollover=rollover)
 
@@ -128,15 +113,16 @@ def _update_convergence_plots(
     params_data = _create_params_data_for_update(data, param_ids, clip_bound)
     _stream_data(cds=param_cds, data=params_data, rollover=rollover)
     # update last retrieved
-    session_data["last_retrieved"] = new_last
+    session_data["last_retrieved"] = reader.last_retrieved
 
 
 def _create_params_data_for_update(data, param_ids, clip_bound):
     """Create the dictionary to stream to the param_cds from data and param_ids.
 
     Args:
-        data
-        param_ids (list): list of the length of the arrays in data["params"]
+        data (dict): Contains "rowid" and "params", a 2d array with one row per
+            iteration.
+        param_ids (list): list of the length of the rows in data["params"]
         clip_bound (float)
 
     Returns:
@@ -144,14 +130,11 @@ def _create_params_data_for_update(data, param_ids, clip_bound):
             are lists of values that will be added to the ColumnDataSources columns.
 
     """
-    params_data = [
-        np.clip(arr, -clip_bound, clip_bound).tolist() for arr in data["params"]
-    ]
-    params_data = transpose_nested_list(params_data)
-    params_data = dict(zip(param_ids, params_data))
-    if params_data == {}:
-        params_data = {name: [] for name in param_ids}
-    params_data["iteration"] = data["rowid"]
+    params = np.clip(data["params"], -clip_bound, clip_bound)
+    params_data = {name: [] for name in param_ids}
+    if len(params) > 0:
+        params_data.update(zip(param_ids, params.T.tolist()))
+    params_data["iteration"] = np.asarray(data["rowid"]).tolist()
     return params_data
 
 
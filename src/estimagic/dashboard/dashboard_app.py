@@ -13,6 +13,7 @@ from estimagic.dashboard.callbacks import reset_and_start_convergence
 from estimagic.dashboard.plot_functions import plot_time_series
 from estimagic.logging.database_utilities import load_database
 from estimagic.logging.database_utilities import read_last_rows
+from estimagic.logging.read_log import OptimizationHistoryReader
 from estimagic.logging.read_log import read_start_params
 from jinja2 import Environment
 from jinja2 import FileSystemLoader
@@ -46,6 +47,9 @@ def dashboard_app(
     database = load_database(path=session_data["database_path"])
     start_point = _calculate_start_point(database, updating_options)
     session_data["last_retrieved"] = start_point
+    reader = OptimizationHistoryReader(
+        database, last_retrieved=start_point, stride=updating_options["stride"]
+    )
     start_params = read_start_params(path_or_database=database)
     start_params["id"] = _create_id_column(start_params)
     group_to_param_ids = _map_group_to_other_column(start_params, "id")
@@ -73,7 +77,7 @@ def dashboard_app(
 
     restart_button = _create_restart_button(
         doc=doc,
-        database=database,
+        reader=reader,
         session_data=session_data,
         start_params=start_params,
         updating_options=updating_options,
@@ -233,7 +237,7 @@ def _create_initial_plots(
 
 def _create_restart_button(
     doc,
-    database,
+    reader,
     session_data,
     start_params,
     updating_options,
@@ -242,7 +246,7 @@ def _create_restart_button(
 
     Args:
         doc (bokeh.Document)
-        database (sqlalchemy.MetaData): Bound metadata object.
+        reader (estimagic.logging.read_log.OptimizationHistoryReader)
         session_data (dict): dictionary with the last retrieved row id
         start_params (pd.DataFrame): See :ref:`params`
         updating_options (dict): Specification how to update the plotting data.
@@ -265,7 +269,7 @@ def _create_restart_button(
         reset_and_start_convergence,
         session_data=session_data,
         doc=doc,
-        database=database,
+        reader=reader,
         button=restart_button,
         start_params=start_params,
         updating_options=updating_options,
@@ -17,6 +17,7 @@ import numpy as np
 import pandas as pd
 from estimagic.exceptions import get_traceback
 from estimagic.parameters.process_constraints import process_constraints
+from estimagic.parameters.reparametrize import compile_reparametrization_plan
 from estimagic.parameters.reparametrize import reparametrize_from_internal
 
 
@@ -47,6 +48,7 @@ def numpy_interface(func=None, *, params=None, constraints=None, numpy_output=Fa
     fixed_values = pp["_internal_fixed_value"].to_numpy()
     pre_replacements = pp["_pre_replacements"].to_numpy().astype(int)
     post_replacements = pp["_post_replacements"].to_numpy().astype(int)
+    plan = compile_reparametrization_plan(pc)
 
     def decorator_numpy_interface(func):
         @functools.wraps(func)
@@ -62,6 +64,7 @@ def numpy_interface(func=None, *, params=None, constraints=None, numpy_output=Fa
                     post_replacements=post_replacements,
                     params=params,
                     return_numpy=False,
+                    plan=plan,
                 )
             else:
                 raise ValueError(
@@ -83,6 +86,129 @@ def numpy_interface(func=None, *, params=None, constraints=None, numpy_output=Fa
         return decorator_numpy_interface
 
 
+def numpy_params(func):
+    """Declare that a function takes a numpy array of parameter values.
+
+    By default, estimagic calls the criterion function (and closed form derivatives)
+    with a copy of the params DataFrame where the "value" column is replaced. For
+    cheap functions, copying the DataFrame can take longer than evaluating the
+    function. Functions decorated with ``numpy_params`` instead receive a 1d numpy
+    array with the values of the external parameters in the order of params.
+
+    Args:
+        func (callable): The function to which the decorator is applied.
+
+    Returns:
+        callable
+
+    """
+
+    @functools.wraps(func)
+    def wrapper_numpy_params(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    wrapper_numpy_params.numpy_params = True
+
+    return wrapper_numpy_params
+
+
+def takes_numpy_params(func):
+    """Check if a (possibly partialled) function takes a numpy array of parameters.
+
+    Args:
+        func (callable or None): Function that might be decorated with
+            :func:`numpy_params` or :func:`batch_criterion`.
+
+    Returns:
+        bool
+
+    """
+    while isinstance(func, functools.partial):
+        func = func.func
+    return bool(getattr(func, "numpy_params", False))
+
+
+def batch_criterion(func=None, *, batch_func=None):
+    """Declare that a function can evaluate many parameter vectors in one call.
+
+    The decorated function (also called batch criterion) takes a 2d numpy array of
+    shape (n_points, n_params) as first argument, where each row is one parameter
+    vector, and returns a sequence with one output per row. estimagic then evaluates
+    finite difference points, multistart exploration samples, Nelder-Mead simplices
+    and pygmo populations in one vectorized call instead of one call per point.
+
+    The decorated function can still be called with a single parameter vector
+    (numpy array, pandas.Series or params DataFrame). In that case, it receives a 2d
+    array with one row and only the first output is returned.
+
+    This decorator can be used with and without additional arguments.
+
+    Args:
+        func (callable): The function to which the decorator is applied.
+        batch_func (callable, optional): If provided, func is only marked as batch
+            criterion and batch_func is used for vectorized evaluations. func is then
+            used for single parameter vectors.
+
+    Returns:
+        callable
+
+    """
+
+    def decorator_batch_criterion(func):
+        if batch_func is None:
+
+            @functools.wraps(func)
+            def wrapper_batch_criterion(params, *args, **kwargs):
+                x = params["value"] if isinstance(params, pd.DataFrame) else params
+                x = np.atleast_1d(np.asarray(x, dtype=float))
+                return func(x[np.newaxis], *args, **kwargs)[0]
+
+            wrapper_batch_criterion.batch_func = func
+            wrapper_batch_criterion.numpy_params = True
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper_batch_criterion(*args, **kwargs):
+                return func(*args, **kwargs)
+
+            wrapper_batch_criterion.batch_func = batch_func
+
+        return wrapper_batch_criterion
+
+    if callable(func):
+        return decorator_batch_criterion(func)
+    else:
+        return decorator_batch_criterion
+
+
+def get_batch_function(func):
+    """Get the vectorized version of a (possibly partialled) batch criterion.
+
+    Args:
+        func (callable): A function decorated with :func:`batch_criterion` or a
+            ``functools.partial`` of it where only keyword arguments were partialled.
+
+    Returns:
+        callable or None: Function that takes a 2d array of parameter vectors and
+            returns a list with one output per row. None if func is not a batch
+            criterion.
+
+    """
+    kwargs = {}
+    while isinstance(func, functools.partial):
+        if func.args:
+            return None
+        kwargs = {**func.keywords, **kwargs}
+        func = func.func
+
+    batch_func = getattr(func, "batch_func", None)
+    if batch_func is not None and kwargs:
+        batch_func = functools.partial(batch_func, **kwargs)
+
+    return batch_func
+
+
 def catch(
     func=None,
     *,
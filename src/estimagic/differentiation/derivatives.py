@@ -1,15 +1,19 @@
 import functools
-import itertools
 import re
-from itertools import product
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from estimagic import batch_evaluators
 from estimagic.config import DEFAULT_N_CORES
+from estimagic.decorators import batch_criterion
+from estimagic.decorators import get_batch_function
 from estimagic.differentiation import finite_differences
 from estimagic.differentiation.generate_steps import generate_steps
 from estimagic.differentiation.richardson_extrapolation import richardson_extrapolation
+from estimagic.differentiation.sparsity import color_columns
+from estimagic.differentiation.sparsity import decompress_evaluations
+from estimagic.differentiation.sparsity import process_sparsity
 from estimagic.utilities import namedtuple_from_kwargs
 
 
@@ -33,6 +37,9 @@ def first_derivative(
     return_func_value=False,
     return_info=True,
     key=None,
+    sparsity=None,
+    cache=None,
+    richardson_tol=None,
 ):
     """Evaluate first derivative of func at params according to method and step options.
 
@@ -55,16 +62,23 @@ def first_derivative(
             calculated. If it is a DataFrame, it can contain the columns "lower_bound"
             and "upper_bound" for bounds. See :ref:`params`.
         func_kwargs (dict): Additional keyword arguments for func, optional.
-        method (str): One of ["central", "forward", "backward"], default "central".
+        method (str): One of ["central", "forward", "backward", "complex"], default
+            "central". "complex" uses the complex step method, i.e. the derivative
+            is the imaginary part of func(x + ih) divided by h. It is accurate up to
+            machine precision with one evaluation per parameter, but func has to be
+            analytic and has to accept and propagate complex parameters. Bounds are
+            irrelevant for the complex step method because the real part of the
+            parameters is never changed.
         n_steps (int): Number of steps needed. For central methods, this is
             the number of steps per direction. It is 1 if no Richardson extrapolation
-            is used.
+            is used. Has to be 1 for the complex step method.
         base_steps (numpy.ndarray, optional): 1d array of the same length as params.
             base_steps * scaling_factor is the absolute value of the first (and possibly
             only) step used in the finite differences approximation of the derivative.
             If base_steps * scaling_factor conflicts with bounds, the actual steps will
             be adjusted. If base_steps is not provided, it will be determined according
-            to a rule of thumb as long as this does not conflict with min_steps.
+            to a rule of thumb as long as this does not conflict with min_steps. For
+            the complex step method, base_steps is the size of the imaginary step.
         scaling_factor (numpy.ndarray or float): Scaling factor which is applied to
             base_steps. If it is an numpy.ndarray, it needs to be as long as params.
             scaling_factor is useful if you want to increase or decrease the base_step
@@ -104,6 +118,22 @@ def first_derivative(
             returned if n_steps > 1. Default True.
         key (str): If func returns a dictionary, take the derivative of
             func(params)[key].
+        sparsity (numpy.ndarray, pandas.DataFrame or scipy.sparse.spmatrix): Boolean
+            array of shape (dim_f, dim_x) that marks the entries of the Jacobian that
+            can be nonzero, optional. If provided, structurally orthogonal parameters
+            are perturbed together, such that only one function evaluation per group
+            and step is needed, and the derivative is returned as sparse matrix.
+        cache (EvaluationCache): Cache with function evaluations, optional. Points
+            that are in the cache are not evaluated again and new evaluations are added
+            to it. See :class:`~estimagic.differentiation.evaluation_cache.
+            EvaluationCache`.
+        richardson_tol (float): Tolerance for adaptive Richardson extrapolation,
+            optional. If None (default), all n_steps steps are evaluated for each
+            parameter. Otherwise, the steps are evaluated in rounds, starting with the
+            three smallest steps. A parameter gets no further steps once the error
+            estimate of its derivative is below richardson_tol * (1 + |derivative|)
+            for all outputs or once its error estimate stops improving. n_steps is
+            then the maximal number of steps per direction.
 
     Returns:
         result (dict): Result dictionary with keys:
@@ -116,6 +146,10 @@ def first_derivative(
                 - f: R -> R^n leads to shape (n, 1), usually called Jacobian
                 - f: R^m -> R^n leads to shape (n, m), usually called Jacobian
 
+                If sparsity is provided, the derivative is a scipy.sparse.csr_matrix
+                of shape (n, m) or, if params or the function output are pandas
+                objects, a DataFrame with sparse columns.
+
             - "func_value" (numpy.ndarray, pandas.Series or pandas.DataFrame): Function
                 value at params, returned if return_func_value is True.
 
@@ -144,10 +178,24 @@ def first_derivative(
     if np.isnan(x).any():
         raise ValueError("The parameter vector must not contain NaNs.")
 
+    implemented_methods = {"central", "forward", "backward", "complex"}
+    if method not in implemented_methods:
+        raise ValueError(f"Method has to be in {implemented_methods}.")
+
+    is_complex_step = method == "complex"
+    if is_complex_step:
+        if n_steps != 1:
+            raise ValueError(
+                "The complex step method does not need Richardson extrapolation. "
+                "n_steps has to be 1."
+            )
+        # complex steps only change the imaginary part, so they cannot violate bounds
+        lower_bounds, upper_bounds = None, None
+
     # generate the step array
     steps = generate_steps(
         x=x,
-        method=method,
+        method="forward" if is_complex_step else method,
         n_steps=n_steps,
         target="first_derivative",
         base_steps=base_steps,
@@ -158,39 +206,62 @@ def first_derivative(
         min_steps=min_steps,
     )
 
+    # group structurally orthogonal parameters; without sparsity each parameter is
+    # its own group
+    if sparsity is None:
+        colors = np.arange(len(x))
+    else:
+        sparsity = process_sparsity(sparsity, len(x))
+        colors = color_columns(sparsity)
+    groups = [np.flatnonzero(colors == c) for c in range(colors.max(initial=-1) + 1)]
+
+    # with adaptive Richardson extrapolation, the steps are evaluated in rounds. The
+    # first round contains the three smallest steps, which is the minimum for an
+    # error estimate. Each further round adds the next step for all parameters whose
+    # derivative estimate did not converge yet.
+    is_adaptive = richardson_tol is not None and n_steps > 3
+    selected = np.full((2, n_steps, len(groups)), True)
+    if is_adaptive:
+        selected[:, 3:] = False
+
+    batch_error_handling = "raise" if error_handling == "raise_strict" else "continue"
+    evaluate = functools.partial(
+        _cached_batch_evaluator,
+        func=partialed_func,
+        cache=cache,
+        n_cores=n_cores,
+        error_handling=batch_error_handling,
+        batch_evaluator=batch_evaluator,
+    )
+
+    # with sparsity, f0 is needed to check the pattern before any perturbed
+    # evaluations are done
+    if sparsity is not None:
+        if f0 is None:
+            f0 = evaluate(points=[x], arguments=[params])[0]
+            if isinstance(f0, str):
+                raise Exception(f0)
+        _check_sparsity_rows(sparsity, f0, key)
+
     # generate parameter vectors at which func has to be evaluated as numpy arrays
-    evaluation_points = []
-    for step_arr in steps:
-        for i, j in product(range(n_steps), range(len(x))):
-            if np.isnan(step_arr[i, j]):
-                evaluation_points.append(np.nan)
-            else:
-                point = x.copy()
-                point[j] += step_arr[i, j]
-                evaluation_points.append(point)
+    evaluation_points = _get_first_derivative_evaluation_points(
+        x, steps, groups, selected, is_complex_step
+    )
 
     # convert the numpy arrays to whatever is needed by func
-    evaluation_points = _convert_evaluation_points_to_original(
-        evaluation_points, params
-    )
+    arguments = list(_convert_evaluation_points_to_original(evaluation_points, params))
 
     # we always evaluate f0, so we can fall back to one-sided derivatives if
     # two-sided derivatives fail. The extra cost is negligible in most cases.
     if f0 is None:
-        evaluation_points.append(params)
+        evaluation_points.append(x)
+        arguments.append(params)
 
     # do the function evaluations, including error handling
-    batch_error_handling = "raise" if error_handling == "raise_strict" else "continue"
-    raw_evals = _nan_skipping_batch_evaluator(
-        func=partialed_func,
-        arguments=evaluation_points,
-        n_cores=n_cores,
-        error_handling=batch_error_handling,
-        batch_evaluator=batch_evaluator,
-    )
+    raw_evals = evaluate(points=evaluation_points, arguments=arguments)
 
     # extract information on exceptions that occurred during function evaluations
-    exc_info = "\n\n".join([val for val in raw_evals if isinstance(val, str)])
+    exceptions = [val for val in raw_evals if isinstance(val, str)]
     raw_evals = [val if not isinstance(val, str) else np.nan for val in raw_evals]
 
     # store full function value at params as func_value and a processed version of it
@@ -204,17 +275,63 @@ def first_derivative(
     out_index = f0.index if isinstance(f0, pd.Series) else None
     f0 = np.atleast_1d(f0)
 
-    # convert the raw evaluations to numpy arrays
-    raw_evals = _convert_evals_to_numpy(raw_evals, key)
+    # with sparsity, derivatives are only calculated for the entries of the pattern,
+    # which are arranged like the Jacobian of a scalar function of len(entries) inputs
+    if sparsity is None:
+        entries = np.arange(len(x))
+        jac_steps = steps
+    else:
+        entries = sparsity.tocoo().col
+        jac_steps = namedtuple_from_kwargs(
+            pos=steps.pos[:, entries], neg=steps.neg[:, entries]
+        )
+
+    # convert the raw evaluations to an array with one entry per sign, step and group
+    group_evals = np.full((2, n_steps, len(groups), len(f0)), np.nan)
+    group_evals[selected] = _convert_first_derivative_evals(
+        raw_evals, key, f0.shape, is_complex_step
+    )
 
     # apply finite difference formulae
-    evals = np.array(raw_evals).reshape(2, n_steps, len(x), -1)
-    evals = np.transpose(evals, axes=(0, 1, 3, 2))
-    evals = namedtuple_from_kwargs(pos=evals[0], neg=evals[1])
+    jac_candidates, evals = _get_jacobian_candidates(
+        group_evals, jac_steps, f0, colors, sparsity, is_complex_step
+    )
+
+    if is_adaptive:
+        last_error = np.full(len(entries), np.inf)
+        for step_number in range(3, n_steps):
+            jac, error = _get_richardson_estimate(jac_candidates, jac_steps, n_steps)
+            error = np.where(np.isnan(error), np.inf, error)
+            converged = (error <= richardson_tol * (1 + np.abs(jac))).all(axis=0)
+            max_error = error.max(axis=0)
+            # parameters stop when they converged or their error did not improve
+            active = ~converged & (max_error < last_error)
+            last_error = max_error
+
+            new = np.full_like(selected, False)
+            new[:, step_number, np.unique(colors[entries[active]])] = True
+            if not new.any():
+                break
+
+            points = _get_first_derivative_evaluation_points(
+                x, steps, groups, new, is_complex_step
+            )
+            arguments = list(_convert_evaluation_points_to_original(points, params))
+            raw_evals = evaluate(points=points, arguments=arguments)
+            exceptions += [val for val in raw_evals if isinstance(val, str)]
+            raw_evals = [
+                val if not isinstance(val, str) else np.nan for val in raw_evals
+            ]
+
+            group_evals[new] = _convert_first_derivative_evals(
+                raw_evals, key, f0.shape, is_complex_step
+            )
+            selected |= new
+            jac_candidates, evals = _get_jacobian_candidates(
+                group_evals, jac_steps, f0, colors, sparsity, is_complex_step
+            )
 
-    jac_candidates = {}
-    for m in ["forward", "backward", "central"]:
-        jac_candidates[m] = finite_differences.jacobian(evals, steps, f0, m)
+    exc_info = "\n\n".join(exceptions)
 
     # get the best derivative estimate out of all derivative estimates that could be
     # calculated, given the function evaluations.
@@ -222,6 +339,7 @@ def first_derivative(
         "central": ["central", "forward", "backward"],
         "forward": ["forward", "backward"],
         "backward": ["backward", "forward"],
+        "complex": ["complex"],
     }
 
     if n_steps == 1:
@@ -229,7 +347,7 @@ def first_derivative(
         updated_candidates = None
     else:
         richardson_candidates = _compute_richardson_candidates(
-            jac_candidates, steps, n_steps
+            jac_candidates, jac_steps, n_steps
         )
         jac, updated_candidates = _consolidate_extrapolated(richardson_candidates)
 
@@ -238,20 +356,206 @@ def first_derivative(
         raise Exception(exc_info)
 
     # results processing
-    derivative = jac.flatten() if f_was_scalar else jac
-    derivative = _add_index_to_derivative(derivative, params_index, out_index)
+    if sparsity is not None:
+        derivative = _to_sparse_derivative(jac, sparsity, params_index, out_index)
+    else:
+        derivative = jac.flatten() if f_was_scalar else jac
+        derivative = _add_index_to_derivative(derivative, params_index, out_index)
 
     result = {"derivative": derivative}
     if return_func_value:
         result["func_value"] = func_value
 
     info = _collect_additional_info(
-        return_info, steps, evals, updated_candidates, target="first_derivative"
+        return_info, jac_steps, evals, updated_candidates, target="first_derivative"
     )
+    if sparsity is not None:
+        info = {k: _index_by_pattern(v, sparsity) for k, v in info.items()}
     result = {**result, **info}
     return result
 
 
+def directional_derivative(
+    func,
+    params,
+    directions,
+    *,
+    func_kwargs=None,
+    method="central",
+    n_steps=1,
+    base_steps=None,
+    scaling_factor=1,
+    lower_bounds=None,
+    upper_bounds=None,
+    step_ratio=2,
+    min_steps=None,
+    f0=None,
+    n_cores=DEFAULT_N_CORES,
+    error_handling="continue",
+    batch_evaluator="joblib",
+    return_func_value=False,
+    return_info=True,
+    key=None,
+):
+    """Evaluate derivatives of func at params in the direction of each direction.
+
+    The result is the Jacobian-vector product J @ directions, where J is the Jacobian
+    of func at params. It is calculated as the Jacobian of t -> func(params +
+    directions @ t) at t = 0 with :func:`first_derivative`, which needs function
+    evaluations proportional to the number of directions instead of the number of
+    parameters.
+
+    Steps are measured in multiples of the directions. By default, the step for a
+    direction d is chosen such that the perturbation of each parameter is at most as
+    large as the rule of thumb for first_derivative and exactly as large for the
+    parameter with the largest relative change. For a unit vector, the step is thus
+    the same as in first_derivative. Steps are adjusted such that params +
+    directions @ t stays within the bounds.
+
+    Args:
+        func (callable): Function of which the derivative is calculated.
+        params (numpy.ndarray, pandas.Series or pandas.DataFrame): 1d numpy array or
+            :class:`pandas.DataFrame` with parameters at which the derivative is
+            calculated. If it is a DataFrame, it can contain the columns "lower_bound"
+            and "upper_bound" for bounds. See :ref:`params`.
+        directions (numpy.ndarray, pandas.Series or pandas.DataFrame): 1d array with
+            one direction or 2d array with one direction per column. The number of
+            rows has to be equal to the number of parameters. The rows of pandas
+            objects are aligned with the index of params.
+        func_kwargs (dict): Additional keyword arguments for func, optional.
+        method (str): One of ["central", "forward", "backward", "complex"], default
+            "central".
+        n_steps (int): Number of steps needed. For central methods, this is
+            the number of steps per direction. It is 1 if no Richardson extrapolation
+            is used.
+        base_steps (numpy.ndarray, optional): 1d array with one entry per direction.
+            base_steps * scaling_factor is the absolute value of the first (and
+            possibly only) multiple of the direction that is used as step. If not
+            provided, it is determined as described above.
+        scaling_factor (numpy.ndarray or float): Scaling factor which is applied to
+            base_steps. Default 1.
+        lower_bounds (numpy.ndarray): 1d array with lower bounds for each parameter. If
+            params is a DataFrame and has the columns "lower_bound", this will be taken
+            as lower_bounds if now lower_bounds have been provided explicitly.
+        upper_bounds (numpy.ndarray): 1d array with upper bounds for each parameter. If
+            params is a DataFrame and has the columns "upper_bound", this will be taken
+            as upper_bounds if no upper_bounds have been provided explicitly.
+        step_ratio (float, numpy.array): Ratio between two consecutive Richardson
+            extrapolation steps in the same direction. default 2.0. Has to be larger
+            than one. The step ratio is only used if n_steps > 1.
+        min_steps (numpy.ndarray): Minimal possible multiples of the directions that
+            can be chosen to accommodate bounds. By default min_steps is equal to
+            base_steps.
+        f0 (numpy.ndarray): 1d numpy array with func(params), optional.
+        n_cores (int): Number of processes used to parallelize the function
+            evaluations. Default 1.
+        error_handling (str): One of "continue", "raise" and "raise_strict". See
+            :func:`first_derivative` for details.
+        batch_evaluator (str or callable): Name of a pre-implemented batch evaluator
+            (currently 'joblib' and 'pathos_mp') or Callable with the same interface
+            as the estimagic batch_evaluators.
+        return_func_value (bool): If True, return function value at params, stored in
+            output dict under "func_value". Default False.
+        return_info (bool): If True, return additional information on function
+            evaluations and internal derivative candidates, stored in output dict under
+            "func_evals" and "derivative_candidates". In both, dim_x refers to the
+            directions. Default True.
+        key (str): If func returns a dictionary, take the derivative of
+            func(params)[key].
+
+    Returns:
+        result (dict): Result dictionary with keys:
+            - "derivative" (numpy.ndarray, pandas.Series or pandas.DataFrame): The
+                directional derivatives. The shape is (n_directions, ) for scalar
+                functions and (dim_f, n_directions) otherwise. If directions is 1d,
+                the directions axis is dropped.
+
+            - "func_value" (numpy.ndarray, pandas.Series or pandas.DataFrame): Function
+                value at params, returned if return_func_value is True.
+
+            - "func_evals" (pandas.DataFrame): Function evaluations produced by internal
+                derivative method, returned if return_info is True.
+
+            - "derivative_candidates" (pandas.DataFrame): Derivative candidates from
+                Richardson extrapolation, returned if return_info is True and n_steps >
+                1.
+
+    """
+    lower_bounds, upper_bounds = _process_bounds(lower_bounds, upper_bounds, params)
+
+    func_kwargs = {} if func_kwargs is None else func_kwargs
+    partialed_func = functools.partial(func, **func_kwargs)
+
+    params_index = (
+        params.index if isinstance(params, (pd.DataFrame, pd.Series)) else None
+    )
+    x = params["value"].to_numpy() if isinstance(params, pd.DataFrame) else params
+    x = np.atleast_1d(x).astype(float)
+
+    if np.isnan(x).any():
+        raise ValueError("The parameter vector must not contain NaNs.")
+
+    # convert the directions to a 2d array with one direction per column
+    directions_index = None
+    if isinstance(directions, (pd.DataFrame, pd.Series)):
+        if params_index is not None:
+            directions = directions.reindex(params_index)
+        if isinstance(directions, pd.DataFrame):
+            directions_index = directions.columns
+    was_one_direction = np.ndim(directions) == 1
+    directions = np.asarray(directions, dtype=float).reshape(len(x), -1)
+
+    if np.isnan(directions).any():
+        raise ValueError("directions must not contain NaNs.")
+
+    if base_steps is None:
+        base_steps = _get_directional_base_steps(x, directions)
+    t_lower, t_upper = _get_directional_bounds(
+        x, directions, lower_bounds, upper_bounds
+    )
+
+    def directional_func(t):
+        point = x + directions @ t
+        return partialed_func(*_convert_evaluation_points_to_original([point], params))
+
+    batch_func = get_batch_function(partialed_func)
+    if batch_func is not None:
+        directional_func = batch_criterion(
+            directional_func,
+            batch_func=lambda ts: batch_func(x + np.array(ts) @ directions.T),
+        )
+
+    result = first_derivative(
+        directional_func,
+        np.zeros(directions.shape[1]),
+        method=method,
+        n_steps=n_steps,
+        base_steps=base_steps,
+        scaling_factor=scaling_factor,
+        lower_bounds=t_lower,
+        upper_bounds=t_upper,
+        step_ratio=step_ratio,
+        min_steps=min_steps,
+        f0=f0,
+        n_cores=n_cores,
+        error_handling=error_handling,
+        batch_evaluator=batch_evaluator,
+        return_func_value=return_func_value,
+        return_info=return_info,
+        key=key,
+    )
+
+    derivative = result["derivative"]
+    out_index = derivative.index if isinstance(derivative, pd.DataFrame) else None
+    derivative = np.asarray(derivative)
+    if was_one_direction:
+        derivative = derivative[..., 0]
+    result["derivative"] = _add_index_to_derivative(
+        derivative, directions_index, out_index
+    )
+    return result
+
+
 def second_derivative(
     func,
     params,
@@ -272,6 +576,8 @@ def second_derivative(
     return_func_value=False,
     return_info=True,
     key=None,
+    fallback_methods=None,
+    cache=None,
 ):
     """Evaluate second derivative of func at params according to method and step options
 
@@ -347,6 +653,18 @@ def second_derivative(
             returned if n_steps > 1. Default True.
         key (str): If func returns a dictionary, take the derivative of
             func(params)[key].
+        fallback_methods (list): Methods that are used, in the given order, for
+            entries of the Hessian that could not be calculated with method, e.g.
+            because of bounds or failed function evaluations. Function evaluations
+            for a fallback method are only done for the missing entries. By default,
+            the fallbacks are all other methods, where methods with the same kind of
+            steps as method come first. One-sided methods only fall back to the other
+            one-sided method because two-sided methods cannot be calculated with
+            one-sided steps. An empty list disables the fallback.
+        cache (EvaluationCache): Cache with function evaluations, optional. Points
+            that are in the cache are not evaluated again and new evaluations are added
+            to it. See :class:`~estimagic.differentiation.evaluation_cache.
+            EvaluationCache`.
 
     Returns:
         result (dict): Result dictionary with keys:
@@ -364,7 +682,8 @@ def second_derivative(
 
             - "func_evals_one_step" (pandas.DataFrame): Function evaluations produced by
                 internal derivative method when altering the params vector at one
-                dimension, returned if return_info is True.
+                dimension, returned if return_info is True. Evaluations that were not
+                needed for the chosen methods are NaN.
 
             - "func_evals_two_step" (pandas.DataFrame): This features is not implemented
                 yet and therefore set to None. Once implemented it will contain
@@ -400,6 +719,17 @@ def second_derivative(
     if method not in implemented_methods:
         raise ValueError(f"Method has to be in {implemented_methods}.")
 
+    if fallback_methods is None:
+        fallback_methods = _SECOND_DERIVATIVE_FALLBACKS[method]
+    if not set(fallback_methods).issubset(implemented_methods):
+        raise ValueError(f"All fallback_methods have to be in {implemented_methods}.")
+    plan = [method] + [m for m in dict.fromkeys(fallback_methods) if m != method]
+
+    if n_steps > 1:
+        raise ValueError(
+            "Richardson extrapolation is not implemented for the second derivative yet."
+        )
+
     # generate the step array
     steps = generate_steps(
         x=x,
@@ -414,112 +744,68 @@ def second_derivative(
         min_steps=min_steps,
     )
 
-    # generate parameter vectors at which func has to be evaluated as numpy arrays
-    evaluation_points = {"one_step": [], "two_step": [], "cross_step": []}
-    for step_arr in steps:
-        # single direction steps
-        for i, j in product(range(n_steps), range(len(x))):
-            if np.isnan(step_arr[i, j]):
-                evaluation_points["one_step"].append(np.nan)
-            else:
-                point = x.copy()
-                point[j] += step_arr[i, j]
-                evaluation_points["one_step"].append(point)
-        # two and cross direction steps
-        for i, j, k in product(range(n_steps), range(len(x)), range(len(x))):
-            if j > k or np.isnan(step_arr[i, j]) or np.isnan(step_arr[i, k]):
-                evaluation_points["two_step"].append(np.nan)
-                evaluation_points["cross_step"].append(np.nan)
-            else:
-                point = x.copy()
-                point[j] += step_arr[i, j]
-                point[k] += step_arr[i, k]
-                evaluation_points["two_step"].append(point)
-                if j == k:
-                    evaluation_points["cross_step"].append(np.nan)
-                else:
-                    point = x.copy()
-                    point[j] += step_arr[i, j]
-                    point[k] -= step_arr[i, k]
-                    evaluation_points["cross_step"].append(point)
-
-    # convert the numpy arrays to whatever is needed by func
-    evaluation_points = {
-        step_type: _convert_evaluation_points_to_original(points, params)
-        for step_type, points in evaluation_points.items()
-    }
-
-    # we always evaluate f0, so we can fall back to one-sided derivatives if
-    # two-sided derivatives fail. The extra cost is negligible in most cases.
-    if f0 is None:
-        evaluation_points["one_step"].append(params)
-
-    # do the function evaluations for one and two step, including error handling
     batch_error_handling = "raise" if error_handling == "raise_strict" else "continue"
-    raw_evals = _nan_skipping_batch_evaluator(
+    evaluate = functools.partial(
+        _cached_batch_evaluator,
         func=partialed_func,
-        arguments=list(itertools.chain.from_iterable(evaluation_points.values())),
+        cache=cache,
         n_cores=n_cores,
         error_handling=batch_error_handling,
         batch_evaluator=batch_evaluator,
     )
 
-    # extract information on exceptions that occurred during function evaluations
-    exc_info = "\n\n".join([val for val in raw_evals if isinstance(val, str)])
-    raw_evals = [val if not isinstance(val, str) else np.nan for val in raw_evals]
+    if f0 is not None:
+        f0, out_index = _process_f0(f0, key)
 
-    n_one_step, n_two_step, n_cross_step = map(len, evaluation_points.values())
-    raw_evals = {
-        "one_step": raw_evals[:n_one_step],
-        "two_step": raw_evals[n_one_step : n_two_step + n_one_step],
-        "cross_step": raw_evals[n_two_step + n_one_step :],
-    }
+    # Go through the plan and only evaluate func at the points that are needed for
+    # the Hessian entries that could not be calculated with the previous methods.
+    # Function evaluations are shared between the methods.
+    raw_evals = {}
+    exc_info = []
+    hess_candidates = {}
+    missing = np.ones((n_steps, len(x), len(x)), dtype=bool)
+    for candidate_method in plan:
+        eval_keys = _get_required_evaluation_keys(candidate_method, missing, steps)
+        eval_keys = [k for k in eval_keys if k not in raw_evals]
+        evaluation_points = [_get_evaluation_point(k, x, steps) for k in eval_keys]
+
+        # convert the numpy arrays to whatever is needed by func
+        arguments = list(
+            _convert_evaluation_points_to_original(evaluation_points, params)
+        )
 
-    # store full function value at params as func_value and a processed version of it
-    # that we need to calculate derivatives as f0
-    if f0 is None:
-        f0 = raw_evals["one_step"][-1]
-        raw_evals["one_step"] = raw_evals["one_step"][:-1]
-    f0 = f0[key] if isinstance(f0, dict) else f0
-    out_index = f0.index if isinstance(f0, pd.Series) else None
-    f0 = np.atleast_1d(f0)
+        # we always evaluate f0, so we can fall back to one-sided derivatives if
+        # two-sided derivatives fail. The extra cost is negligible in most cases.
+        evaluate_f0 = f0 is None
+        if evaluate_f0:
+            evaluation_points.append(x)
+            arguments.append(params)
 
-    # convert the raw evaluations to numpy arrays
-    raw_evals = {
-        step_type: _convert_evals_to_numpy(evals, key)
-        for step_type, evals in raw_evals.items()
-    }
+        new_evals = evaluate(points=evaluation_points, arguments=arguments)
 
-    # reshape arrays into dimension (n_steps, dim_f, dim_x) or (n_steps, dim_f, dim_x,
-    # dim_x) for finite differences
-    evals = {}
-    evals["one_step"] = _reshape_one_step_evals(raw_evals["one_step"], n_steps, len(x))
-    evals["two_step"] = _reshape_two_step_evals(raw_evals["two_step"], n_steps, len(x))
-    evals["cross_step"] = _reshape_cross_step_evals(
-        raw_evals["cross_step"], n_steps, len(x), f0
-    )
+        # extract information on exceptions that occurred during function evaluations
+        exc_info += [val for val in new_evals if isinstance(val, str)]
+        new_evals = [val if not isinstance(val, str) else np.nan for val in new_evals]
 
-    # apply finite difference formulae
-    hess_candidates = {}
-    for m in ["forward", "backward", "central_average", "central_cross"]:
-        hess_candidates[m] = finite_differences.hessian(evals, steps, f0, m)
+        # store a processed version of the function value at params that we need to
+        # calculate derivatives as f0
+        if evaluate_f0:
+            f0, out_index = _process_f0(new_evals.pop(), key)
+
+        raw_evals.update(zip(eval_keys, new_evals))
+
+        evals = _arrange_second_derivative_evals(raw_evals, key, n_steps, len(x), f0)
+        candidate = finite_differences.hessian(evals, steps, f0, candidate_method)
+        hess_candidates[candidate_method] = candidate
+        missing = missing & np.isnan(candidate).any(axis=1)
+        if not missing.any():
+            break
 
     # get the best derivative estimate out of all derivative estimates that could be
     # calculated, given the function evaluations.
-    orders = {
-        "central_cross": ["central_cross", "central_average", "forward", "backward"],
-        "central_average": ["central_average", "central_cross", "forward", "backward"],
-        "forward": ["forward", "backward", "central_average", "central_cross"],
-        "backward": ["backward", "forward", "central_average", "central_cross"],
-    }
-
-    if n_steps == 1:
-        hess = _consolidate_one_step_derivatives(hess_candidates, orders[method])
-        updated_candidates = None
-    else:
-        raise ValueError(
-            "Richardson extrapolation is not implemented for the second derivative yet."
-        )
+    hess = _consolidate_one_step_derivatives(hess_candidates, list(hess_candidates))
+    updated_candidates = None
+    exc_info = "\n\n".join(exc_info)
 
     # raise error if necessary
     if error_handling in ("raise", "raise_strict") and np.isnan(hess).any():
@@ -539,6 +825,130 @@ def second_derivative(
     return result
 
 
+_SECOND_DERIVATIVE_FALLBACKS = {
+    "central_cross": ["central_average", "forward", "backward"],
+    "central_average": ["central_cross", "forward", "backward"],
+    "forward": ["backward"],
+    "backward": ["forward"],
+}
+
+
+def _process_f0(f0, key):
+    """Extract the relevant entry of f0 and convert it to a 1d numpy array."""
+    f0 = f0[key] if isinstance(f0, dict) else f0
+    out_index = f0.index if isinstance(f0, pd.Series) else None
+    f0 = np.atleast_1d(f0)
+    return f0, out_index
+
+
+def _get_required_evaluation_keys(method, missing, steps):
+    """Get the function evaluations needed for the missing entries of a Hessian.
+
+    Each evaluation is identified by a key (step_type, sign, i, j) for one step or
+    (step_type, sign, i, j, k) for two and cross steps, where sign is 0 for the
+    positive and 1 for the negative steps, i indexes the step and j <= k the
+    parameters. Because of symmetry, two and cross steps are only needed for the
+    upper triangle. Evaluations whose steps are NaN are never needed.
+
+    Args:
+        method (str): One of {"forward", "backward", "central_average",
+            "central_cross"}.
+        missing (numpy.ndarray): Boolean array of shape (n_steps, dim_x, dim_x) that
+            is True for the Hessian entries that have to be calculated.
+        steps (namedtuple): Namedtuple with the fields pos and neg.
+
+    Returns:
+        list: Keys of the required function evaluations without duplicates.
+
+    """
+    signs = {
+        "forward": [0],
+        "backward": [1],
+        "central_average": [0, 1],
+        "central_cross": [0, 1],
+    }[method]
+    step_types = ["two_step", "cross_step"] if method == "central_cross" else None
+
+    missing = missing | missing.swapaxes(1, 2)
+    keys = {}
+    for i, j, k in zip(*np.nonzero(np.triu(missing))):
+        for sign in signs:
+            if step_types is None:
+                candidates = [
+                    ("one_step", sign, i, j),
+                    ("one_step", sign, i, k),
+                    ("two_step", sign, i, j, k),
+                ]
+            else:
+                candidates = [("two_step", sign, i, j, k)]
+                if j != k:
+                    candidates.append(("cross_step", sign, i, j, k))
+            for candidate in candidates:
+                if not np.isnan(steps[sign][i, list(candidate[3:])]).any():
+                    keys[candidate] = None
+    return list(keys)
+
+
+def _get_evaluation_point(key, x, steps):
+    """Construct the parameter vector that belongs to an evaluation key."""
+    step_type, sign, i, *dims = key
+    step_arr = steps[sign]
+    point = x.copy()
+    point[dims[0]] += step_arr[i, dims[0]]
+    if step_type == "two_step":
+        point[dims[1]] += step_arr[i, dims[1]]
+    elif step_type == "cross_step":
+        point[dims[1]] -= step_arr[i, dims[1]]
+    return point
+
+
+def _arrange_second_derivative_evals(raw_evals, key, n_steps, dim_x, f0):
+    """Arrange the available function evaluations for the finite difference formulae.
+
+    Args:
+        raw_evals (dict): Maps evaluation keys as returned by
+            :func:`_get_required_evaluation_keys` to function evaluations.
+        key (str): If func returns a dictionary, the entry that is differentiated.
+        n_steps (int): Number of steps.
+        dim_x (int): Dimension of x.
+        f0 (numpy.ndarray): 1d array with the function value at x.
+
+    Returns:
+        dict: Dictionary with namedtuples for "one_step", "two_step" and "cross_step"
+            as expected by the hessian function in finite_differences. Evaluations
+            that are not in raw_evals are NaN.
+
+    """
+    shapes = {
+        "one_step": (2, n_steps, dim_x),
+        "two_step": (2, n_steps, dim_x, dim_x),
+        "cross_step": (2, n_steps, dim_x, dim_x),
+    }
+    arranged = {
+        step_type: [np.nan] * np.prod(shape) for step_type, shape in shapes.items()
+    }
+    for eval_key, evaluation in raw_evals.items():
+        step_type, *position = eval_key
+        flat_position = np.ravel_multi_index(position, shapes[step_type])
+        arranged[step_type][flat_position] = evaluation
+
+    arranged = {
+        step_type: _convert_evals_to_numpy(evals, key, default_shape=f0.shape)
+        for step_type, evals in arranged.items()
+    }
+
+    # reshape arrays into dimension (n_steps, dim_f, dim_x) or (n_steps, dim_f, dim_x,
+    # dim_x) for finite differences
+    evals = {
+        "one_step": _reshape_one_step_evals(arranged["one_step"], n_steps, dim_x),
+        "two_step": _reshape_two_step_evals(arranged["two_step"], n_steps, dim_x),
+        "cross_step": _reshape_cross_step_evals(
+            arranged["cross_step"], n_steps, dim_x, f0
+        ),
+    }
+    return evals
+
+
 def _reshape_one_step_evals(raw_evals_one_step, n_steps, dim_x):
     """Reshape raw_evals for evaluation points with one step.
 
@@ -616,6 +1026,62 @@ def _reshape_cross_step_evals(raw_evals_cross_step, n_steps, dim_x, f0):
     return evals
 
 
+def _get_directional_base_steps(x, directions):
+    """Get the rule of thumb steps as multiples of each direction.
+
+    The steps are chosen such that no parameter changes by more than the rule of thumb
+    step of first_derivative for that parameter.
+
+    Args:
+        x (numpy.ndarray): 1d array with parameters.
+        directions (numpy.ndarray): 2d array with one direction per column.
+
+    Returns:
+        numpy.ndarray: 1d array with one step per direction.
+
+    """
+    scale = np.maximum(np.abs(x), 0.1).reshape(-1, 1)
+    relative_change = (np.abs(directions) / scale).max(axis=0)
+    if (relative_change == 0).any():
+        raise ValueError("directions must not contain columns that are all zero.")
+    return np.finfo(float).eps ** (1 / 2) / relative_change
+
+
+def _get_directional_bounds(x, directions, lower_bounds, upper_bounds):
+    """Get the bounds on multiples of each direction implied by the parameter bounds.
+
+    Args:
+        x (numpy.ndarray): 1d array with parameters.
+        directions (numpy.ndarray): 2d array with one direction per column.
+        lower_bounds (numpy.ndarray or None): 1d array with lower bounds.
+        upper_bounds (numpy.ndarray or None): 1d array with upper bounds.
+
+    Returns:
+        t_lower (numpy.ndarray): 1d array with the smallest multiple of each direction
+            that can be added to x without violating a bound.
+        t_upper (numpy.ndarray): 1d array with the largest such multiple.
+
+    Examples:
+
+    >>> x = np.array([0.5, 0.5])
+    >>> directions = np.array([[1.0, 1], [0, -2]])
+    >>> _get_directional_bounds(x, directions, np.zeros(2), np.ones(2))
+    (array([-0.5 , -0.25]), array([0.5 , 0.25]))
+
+    """
+    lower_bounds = np.full(len(x), -np.inf) if lower_bounds is None else lower_bounds
+    upper_bounds = np.full(len(x), np.inf) if upper_bounds is None else upper_bounds
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        to_upper = (upper_bounds - x).reshape(-1, 1) / directions
+        to_lower = (lower_bounds - x).reshape(-1, 1) / directions
+
+    positive, negative = directions > 0, directions < 0
+    t_upper = np.where(positive, to_upper, np.where(negative, to_lower, np.inf))
+    t_lower = np.where(positive, to_lower, np.where(negative, to_upper, -np.inf))
+    return t_lower.max(axis=0), t_upper.min(axis=0)
+
+
 def _process_bounds(lower_bounds, upper_bounds, params):
     lower_bounds = np.atleast_1d(lower_bounds) if lower_bounds is not None else None
     upper_bounds = np.atleast_1d(upper_bounds) if upper_bounds is not None else None
@@ -726,12 +1192,13 @@ def _convert_richardson_candidates_to_frame(jac, err):
     return df
 
 
-def _convert_evals_to_numpy(raw_evals, key):
+def _convert_evals_to_numpy(raw_evals, key, default_shape=None):
     """harmonize the output of the function evaluations.
 
     The raw_evals might contain dictionaries of which we only need one entry, scalar
     np.nan where we need arrays filled with np.nan or pandas objects. The processed
-    evals only contain numpy arrays.
+    evals only contain numpy arrays. If all raw_evals are np.nan, the output shape
+    cannot be inferred and default_shape is used if it is provided.
 
     """
     # get rid of dictionaries
@@ -744,7 +1211,11 @@ def _convert_evals_to_numpy(raw_evals, key):
         array = next(x for x in evals if hasattr(x, "shape") or isinstance(x, dict))
         out_shape = array.shape
     except StopIteration:
-        out_shape = "scalar"
+        all_missing = all(isinstance(val, float) and np.isnan(val) for val in evals)
+        if all_missing and default_shape is not None:
+            out_shape = default_shape
+        else:
+            out_shape = "scalar"
 
     # convert to correct output shape
     if out_shape == "scalar":
@@ -757,6 +1228,135 @@ def _convert_evals_to_numpy(raw_evals, key):
     return evals
 
 
+def _get_first_derivative_evaluation_points(x, steps, groups, selected, is_complex):
+    """Generate the parameter vectors at which func is evaluated for first derivatives.
+
+    Args:
+        x (numpy.ndarray): 1d array with parameters.
+        steps (namedtuple): Namedtuple with the fields pos and neg. Each field contains
+            a numpy array of shape (n_steps, dim_x).
+        groups (list): List of integer arrays with the parameters that are perturbed
+            together.
+        selected (numpy.ndarray): Boolean array of shape (2, n_steps, n_groups) that
+            marks the combinations of sign, step and group that are evaluated.
+        is_complex (bool): Whether steps are taken in the imaginary direction.
+
+    Returns:
+        list: The evaluation points in the order of the True entries of selected. The
+            entry is np.nan if the step is NaN for all parameters of a group.
+
+    """
+    evaluation_points = []
+    for sign, i, g in zip(*np.nonzero(selected)):
+        group = groups[g][~np.isnan(steps[sign][i, groups[g]])]
+        if len(group) == 0:
+            evaluation_points.append(np.nan)
+        else:
+            step = steps[sign][i, group]
+            if is_complex:
+                point = x.astype(complex)
+                point[group] += 1j * step
+            else:
+                point = x.copy()
+                point[group] += step
+            evaluation_points.append(point)
+    return evaluation_points
+
+
+def _convert_first_derivative_evals(raw_evals, key, out_shape, is_complex):
+    """Convert raw evaluations to a float array of shape (len(raw_evals), dim_f).
+
+    The derivative information of complex steps is in the imaginary part of the
+    evaluations, so only the imaginary part is kept for them.
+
+    """
+    evals = _convert_evals_to_numpy(raw_evals, key, default_shape=out_shape)
+    if is_complex:
+        _check_complex_step_evaluations(evals)
+        evals = [np.where(np.isnan(val), np.nan, val.imag) for val in evals]
+    return np.array(evals).reshape(len(evals), -1)
+
+
+def _get_jacobian_candidates(group_evals, steps, f0, colors, sparsity, is_complex):
+    """Calculate Jacobian estimates with all finite difference formulae.
+
+    Args:
+        group_evals (numpy.ndarray): Array of shape (2, n_steps, n_groups, dim_f) with
+            the function evaluations.
+        steps (namedtuple): Namedtuple with the fields pos and neg. With sparsity, the
+            steps are of shape (n_steps, n_entries) and contain the step of the
+            parameter of each entry of the pattern.
+        f0 (numpy.ndarray): 1d array with the function value at params.
+        colors (numpy.ndarray): Integer array of length dim_x with the group of each
+            parameter.
+        sparsity (scipy.sparse.spmatrix or None): Processed sparsity pattern.
+        is_complex (bool): Whether steps are taken in the imaginary direction.
+
+    Returns:
+        jac_candidates (dict): Jacobian estimates of shape (n_steps, dim_f, dim_x) for
+            each finite difference formula. With sparsity, the shape is
+            (n_steps, 1, n_entries).
+        evals (namedtuple): Namedtuple with the fields pos and neg that contain the
+            evaluations as arrays of the same shape as the Jacobian estimates.
+
+    """
+    if sparsity is None:
+        evals = np.transpose(group_evals, axes=(0, 1, 3, 2))
+        diffs, diff_f0 = evals, f0
+    else:
+        evals = decompress_evaluations(group_evals, colors, sparsity)
+        # parameters whose step was not possible were not perturbed in their group
+        evals[np.isnan(np.stack(steps))] = np.nan
+        evals = evals[:, :, np.newaxis, :]
+        # the entries belong to different outputs, so the function value at params is
+        # subtracted per entry. The imaginary part of unperturbed outputs is zero.
+        unperturbed = 0 if is_complex else f0[sparsity.tocoo().row]
+        diffs, diff_f0 = evals - unperturbed, np.zeros(1)
+    evals = namedtuple_from_kwargs(pos=evals[0], neg=evals[1])
+    diffs = namedtuple_from_kwargs(pos=diffs[0], neg=diffs[1])
+
+    methods = ["complex"] if is_complex else ["forward", "backward", "central"]
+    jac_candidates = {
+        m: finite_differences.jacobian(diffs, steps, diff_f0, m) for m in methods
+    }
+    return jac_candidates, evals
+
+
+def _get_richardson_estimate(jac_candidates, steps, n_steps):
+    """Get the best Richardson extrapolated derivative and its error estimate."""
+    richardson_candidates = _compute_richardson_candidates(
+        jac_candidates, steps, n_steps
+    )
+    _, (candidate_der, candidate_err) = _consolidate_extrapolated(richardson_candidates)
+    jac, error = _select_minimizer_along_axis(
+        np.stack(list(candidate_der.values())), np.stack(list(candidate_err.values()))
+    )
+    return jac, error
+
+
+def _check_complex_step_evaluations(evals):
+    """Raise an error if func dropped the imaginary part of complex parameters.
+
+    Evaluations that failed or were not attempted only contain NaNs and are skipped.
+
+    Args:
+        evals (list): List of numpy arrays with evaluations at complex parameters.
+
+    Raises:
+        ValueError: If one of the evaluations is real but not missing.
+
+    """
+    for val in evals:
+        if not np.iscomplexobj(val) and not np.isnan(val).all():
+            raise ValueError(
+                "The complex step method requires that func propagates the imaginary "
+                "part of complex parameters to its output, but func returned real "
+                "values for complex parameters. This happens if func converts its "
+                "parameters to float or uses functions like np.abs or np.real that "
+                "are not analytic. Use a finite difference method instead."
+            )
+
+
 def _consolidate_one_step_derivatives(candidates, preference_order):
     """Replace missing derivative estimates of preferred method with others.
 
@@ -886,10 +1486,13 @@ def _select_minimizer_along_axis(derivative, errors):
         jac_minimal = np.squeeze(derivative, axis=0)
         error_minimal = np.squeeze(errors, axis=0)
     else:
-        minimizer = np.nanargmin(errors, axis=0)
+        # entries without any error estimate are NaN in the output
+        minimizer = np.argmin(np.where(np.isnan(errors), np.inf, errors), axis=0)
         jac_minimal = np.take_along_axis(derivative, minimizer[np.newaxis, :], axis=0)
         jac_minimal = np.squeeze(jac_minimal, axis=0)
-        error_minimal = np.nanmin(errors, axis=0)
+        error_minimal = np.take_along_axis(errors, minimizer[np.newaxis, :], axis=0)
+        error_minimal = np.squeeze(error_minimal, axis=0)
+        jac_minimal = np.where(np.isnan(error_minimal), np.nan, jac_minimal)
 
     return jac_minimal, error_minimal
 
@@ -925,9 +1528,13 @@ def _nan_skipping_batch_evaluator(
             batch_evaluators, f"{batch_evaluator}_batch_evaluator"
         )
 
-    # evaluate functions
-    evaluations = batch_evaluator(
-        func=func, arguments=real_args, n_cores=n_cores, error_handling=error_handling
+    # evaluate functions; batch criteria are evaluated in one vectorized call
+    evaluations = batch_evaluators.evaluate_batch(
+        func=func,
+        arguments=real_args,
+        batch_evaluator=batch_evaluator,
+        n_cores=n_cores,
+        error_handling=error_handling,
     )
 
     # combine results
@@ -942,6 +1549,48 @@ def _nan_skipping_batch_evaluator(
     return results
 
 
+def _cached_batch_evaluator(
+    func, points, arguments, cache, n_cores, error_handling, batch_evaluator
+):
+    """Evaluate func at each entry in arguments, skipping entries that are cached.
+
+    Args:
+        func (function): Python function that returns a numpy array.
+        points (list): List of the same length as arguments with the parameter vectors
+            as 1d numpy arrays that identify the arguments in the cache or np.nan.
+        arguments (list): List with inputs for func.
+        cache (EvaluationCache or None): If None, all arguments are evaluated.
+        n_cores (int): Number of processes.
+
+    Returns
+        evaluations (list): The function evaluations, same length as arguments.
+
+    """
+    evaluate = functools.partial(
+        _nan_skipping_batch_evaluator,
+        func=func,
+        n_cores=n_cores,
+        error_handling=error_handling,
+        batch_evaluator=batch_evaluator,
+    )
+    if cache is None:
+        return evaluate(arguments=arguments)
+
+    not_cached = object()
+    results = [
+        cache.get(point, not_cached) if isinstance(point, np.ndarray) else np.nan
+        for point in points
+    ]
+    positions = [i for i, res in enumerate(results) if res is not_cached]
+    new_evals = evaluate(arguments=[arguments[i] for i in positions])
+    for i, evaluation in zip(positions, new_evals):
+        results[i] = evaluation
+        # strings contain tracebacks of failed evaluations
+        if not isinstance(evaluation, str):
+            cache[points[i]] = evaluation
+    return results
+
+
 def _add_index_to_derivative(derivative, params_index, out_index):
     if len(derivative.shape) == 1 and params_index is not None:
         derivative = pd.Series(derivative, index=params_index)
@@ -952,6 +1601,37 @@ def _add_index_to_derivative(derivative, params_index, out_index):
     return derivative
 
 
+def _to_sparse_derivative(jac, pattern, params_index, out_index):
+    pattern = pattern.tocoo()
+    derivative = sp.csr_matrix(
+        (jac.flatten(), (pattern.row, pattern.col)), shape=pattern.shape
+    )
+    if params_index is not None or out_index is not None:
+        derivative = pd.DataFrame.sparse.from_spmatrix(
+            derivative, index=out_index, columns=params_index
+        )
+    return derivative
+
+
+def _check_sparsity_rows(pattern, f0, key):
+    f0 = f0[key] if isinstance(f0, dict) else f0
+    dim_f = np.atleast_1d(f0).size
+    if pattern.shape[0] != dim_f:
+        raise ValueError(
+            f"sparsity has {pattern.shape[0]} rows but func has {dim_f} outputs."
+        )
+
+
+def _index_by_pattern(df, pattern):
+    """Replace the entry numbers in the index of an info frame by dim_x and dim_f."""
+    pattern = pattern.tocoo()
+    index = df.index.to_frame(index=False)
+    entries = index["dim_x"].to_numpy(dtype=int)
+    index["dim_x"] = pattern.col[entries]
+    index["dim_f"] = pattern.row[entries]
+    return df.set_axis(pd.MultiIndex.from_frame(index), axis=0)
+
+
 def _add_index_to_second_derivative(derivative, params_index, out_index):
     if len(derivative.shape) == 1:
         if derivative.shape[0] == 1 and params_index is not None:
@@ -0,0 +1,52 @@
+"""Cache for function evaluations that can be shared between derivative calls."""
+import hashlib
+
+import numpy as np
+
+
+class EvaluationCache:
+    """Store function evaluations keyed by a hash of the parameter vector.
+
+    A cache can be passed to :func:`~estimagic.differentiation.derivatives.
+    first_derivative` and :func:`~estimagic.differentiation.derivatives.
+    second_derivative`. Before evaluating the function, they look up each point in
+    the cache and only evaluate the function at points that are not stored yet.
+    Afterwards, all successful evaluations are added to the cache. Sharing one cache
+    between several calls thus evaluates repeated points, like the function value at
+    params, only once.
+
+    The cache does not know which function produced an evaluation. It must only be
+    shared between calls that differentiate the same function with the same
+    func_kwargs, but it does not matter which key is differentiated.
+
+    Attributes:
+        n_hits (int): Number of evaluations that were taken from the cache.
+
+    """
+
+    def __init__(self):
+        self._evaluations = {}
+        self.n_hits = 0
+
+    def __len__(self):
+        return len(self._evaluations)
+
+    def __contains__(self, x):
+        return _hash_params(x) in self._evaluations
+
+    def __setitem__(self, x, evaluation):
+        self._evaluations[_hash_params(x)] = evaluation
+
+    def get(self, x, default=None):
+        """Return the stored evaluation at x or default if there is none."""
+        evaluation = self._evaluations.get(_hash_params(x), default)
+        if evaluation is not default:
+            self.n_hits += 1
+        return evaluation
+
+
+def _hash_params(x):
+    # complex parameters of the complex step method must not collide with real ones
+    dtype = np.complex128 if np.iscomplexobj(x) else np.float64
+    x = np.ascontiguousarray(x, dtype=dtype)
+    return hashlib.sha256(x.tobytes()).hexdigest()
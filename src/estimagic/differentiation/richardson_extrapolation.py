@@ -48,7 +48,8 @@ def richardson_extrapolation(sequence, steps, method="central", num_terms=None):
 
     """
     seq_len = sequence.shape[0]
-    steps = steps.pos
+    # one-sided methods only have steps in one direction
+    steps = np.fmax(steps.pos, -steps.neg)
     n_steps = steps.shape[0]
     num_terms = n_steps if num_terms is None else num_terms
 
@@ -0,0 +1,120 @@
+"""Column coloring for the estimation of sparse Jacobians.
+
+Two columns of a Jacobian are structurally orthogonal if no row has a nonzero entry
+in both of them. The partial derivatives with respect to structurally orthogonal
+parameters can be estimated from one function evaluation in which all of them are
+perturbed at the same time (Curtis, Powell and Reid, 1974). Grouping the columns into
+as few such groups as possible is a graph coloring problem on the column intersection
+graph, which we solve approximately with a greedy largest-first heuristic.
+
+"""
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def process_sparsity(sparsity, dim_x):
+    """Convert a user provided sparsity pattern to a boolean scipy.sparse matrix.
+
+    Args:
+        sparsity (numpy.ndarray, pandas.DataFrame or scipy.sparse.spmatrix): Array of
+            shape (dim_f, dim_x) whose nonzero (or True) entries mark the entries of
+            the Jacobian that can be nonzero.
+        dim_x (int): Number of parameters.
+
+    Returns:
+        scipy.sparse.csc_matrix: Boolean matrix of shape (dim_f, dim_x).
+
+    Raises:
+        ValueError: If sparsity is not two dimensional or does not have one column
+            per parameter.
+
+    """
+    if isinstance(sparsity, pd.DataFrame):
+        sparsity = sparsity.to_numpy()
+
+    if sp.issparse(sparsity):
+        pattern = sp.csc_matrix(sparsity, dtype=bool)
+    else:
+        sparsity = np.asarray(sparsity)
+        if sparsity.ndim != 2:
+            raise ValueError("sparsity must be a two dimensional array.")
+        pattern = sp.csc_matrix(sparsity.astype(bool))
+
+    pattern.eliminate_zeros()
+
+    if pattern.shape[1] != dim_x:
+        raise ValueError(
+            f"sparsity has {pattern.shape[1]} columns but there are {dim_x} "
+            "parameters."
+        )
+
+    return pattern
+
+
+def color_columns(pattern):
+    """Group structurally orthogonal columns with a greedy largest-first coloring.
+
+    Args:
+        pattern (scipy.sparse.spmatrix): Boolean matrix of shape (dim_f, dim_x).
+
+    Returns:
+        numpy.ndarray: Integer array of length dim_x with the color of each column.
+            Columns with the same color are structurally orthogonal. Colors are
+            consecutive integers starting at zero.
+
+    Examples:
+
+    >>> import numpy as np
+    >>> pattern = np.array([[1, 0, 0], [0, 1, 1]])
+    >>> color_columns(sp.csc_matrix(pattern))
+    array([0, 0, 1])
+
+    """
+    pattern = sp.csc_matrix(pattern, dtype=np.int64)
+    dim_x = pattern.shape[1]
+
+    # two columns are adjacent if they share a nonzero row
+    intersection = (pattern.T @ pattern).tocsr()
+    intersection.setdiag(0)
+    intersection.eliminate_zeros()
+
+    degrees = np.diff(intersection.indptr)
+    order = np.argsort(-degrees, kind="stable")
+
+    colors = np.full(dim_x, -1, dtype=np.int64)
+    for col in order:
+        neighbors = intersection.indices[
+            intersection.indptr[col] : intersection.indptr[col + 1]
+        ]
+        forbidden = np.zeros(len(neighbors) + 1, dtype=bool)
+        neighbor_colors = colors[neighbors]
+        neighbor_colors = neighbor_colors[
+            (neighbor_colors >= 0) & (neighbor_colors < len(forbidden))
+        ]
+        forbidden[neighbor_colors] = True
+        colors[col] = np.argmin(forbidden)
+
+    return colors
+
+
+def decompress_evaluations(group_evals, colors, pattern):
+    """Map function evaluations at perturbed color groups to the entries of a pattern.
+
+    For each nonzero entry (row, col) of the pattern, the evaluation of output row is
+    taken from the color group of parameter col. Entries outside of the pattern are
+    never materialized, because their derivative is exactly zero.
+
+    Args:
+        group_evals (numpy.ndarray): Array of shape (2, n_steps, n_colors, dim_f) with
+            the function evaluations where all columns of one color were perturbed.
+        colors (numpy.ndarray): Integer array of length dim_x.
+        pattern (scipy.sparse.spmatrix): Boolean matrix of shape (dim_f, dim_x).
+
+    Returns:
+        numpy.ndarray: Array of shape (2, n_steps, n_entries) with the evaluations for
+            the nonzero entries of the pattern in the order of ``pattern.tocoo()``.
+
+    """
+    pattern = pattern.tocoo()
+    return group_evals[:, :, colors[pattern.col], pattern.row]
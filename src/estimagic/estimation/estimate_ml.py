@@ -1,3 +1,5 @@
+from estimagic.differentiation.evaluation_cache import EvaluationCache
+from estimagic.differentiation.generate_steps import generate_steps
 from estimagic.inference.ml_covs import cov_cluster_robust
 from estimagic.inference.ml_covs import cov_hessian
 from estimagic.inference.ml_covs import cov_jacobian
@@ -7,9 +9,11 @@ from estimagic.inference.shared import calculate_inference_quantities
 from estimagic.inference.shared import check_is_optimized_and_derivative_case
 from estimagic.inference.shared import get_derivative_case
 from estimagic.inference.shared import get_internal_first_derivative
+from estimagic.inference.shared import get_internal_second_derivative
 from estimagic.inference.shared import transform_covariance
 from estimagic.optimization.optimize import maximize
 from estimagic.parameters.parameter_conversion import get_derivative_conversion_function
+from estimagic.parameters.parameter_conversion import get_reparametrize_functions
 from estimagic.parameters.process_constraints import process_constraints
 from estimagic.shared.check_option_dicts import check_numdiff_options
 from estimagic.shared.check_option_dicts import check_optimization_options
@@ -36,6 +40,7 @@ def estimate_ml(
     ci_level=0.95,
     n_samples=10_000,
     bounds_handling="raise",
+    transformation_method="sampling",
     design_info=None,
 ):
     """Do a maximum likelihood (ml) estimation.
@@ -100,7 +105,16 @@ def estimate_ml(
             loglike_and_derivative.
         numdiff_options (dict): Keyword arguments for the calculation of numerical
             derivatives for the calculation of standard errors. See
-            :ref:`first_derivative` for details.
+            :ref:`first_derivative` for details. They are also used for a numerical
+            Hessian, where the methods "central" and "complex" are replaced by
+            "central_cross" and options for Richardson extrapolation are ignored. The
+            Jacobian and the Hessian share an :class:`~estimagic.differentiation.
+            evaluation_cache.EvaluationCache`, such that loglike is evaluated only once
+            at each point. You can pass your own cache under the key "cache". If both
+            are calculated numerically with the default method and no base_steps or
+            min_steps are given, the Jacobian uses twice the base_steps of the Hessian.
+            Then all points of the Jacobian are on the diagonal of the Hessian and are
+            taken from the cache.
         jacobian (callable or pandas.DataFrame or False): A function that takes
             ``params`` and potentially other keyword arguments and returns the jacobian
             of loglike["contributions"] with respect to the params. Alternatively, you
@@ -135,6 +149,12 @@ def estimate_ml(
             Standard errors are only adjusted if a sampling step is necessary due to
             additional constraints. If "raise" and any lower or upper bound is binding,
             we raise an Error. If "ignore", boundary problems are simply ignored.
+        transformation_method (str): One of "sampling" and "delta". Determines how
+            the covariance matrix of the internal parameters is transformed into the
+            covariance matrix of the external parameters if you have specified
+            constraints. "sampling" transforms n_samples draws. "delta" uses the
+            delta method with the jacobian of the transformation, which is
+            deterministic and much faster but ignores bounds_handling.
         design_info (pandas.DataFrame): DataFrame with one row per observation that
             contains some or all of the variables "psu" (primary sampling unit),
             "stratum" and "fpc" (finite population corrector). See
@@ -167,6 +187,7 @@ def estimate_ml(
 
     check_numdiff_options(numdiff_options, "estimate_ml")
     numdiff_options = {} if numdiff_options in (None, False) else numdiff_options
+    numdiff_options = {"cache": EvaluationCache(), **numdiff_options}
 
     constraints = [] if constraints is None else constraints
 
@@ -202,6 +223,11 @@ def estimate_ml(
         params=params, constraints=constraints
     )
 
+    if jac_case == "numerical" and hess_case == "numerical":
+        base_steps = _get_shared_base_steps(estimates, constraints, numdiff_options)
+    else:
+        base_steps = None
+
     if jac_case == "pre-calculated":
         int_jac = deriv_to_internal(jacobian)
     elif jac_case == "closed-form":
@@ -212,6 +238,8 @@ def estimate_ml(
     elif jac_case == "numerical":
         options = numdiff_options.copy()
         options["key"] = "contributions"
+        if base_steps is not None:
+            options.update(base_steps=2 * base_steps, scaling_factor=1)
         deriv_res = get_internal_first_derivative(
             func=loglike,
             params=estimates,
@@ -231,8 +259,15 @@ def estimate_ml(
     if hess_case == "skip":
         int_hess = None
     elif hess_case == "numerical":
-        raise NotImplementedError("Numerical Hessian calculation is not yet supported.")
-        hess_numdiff_info = {}
+        deriv_res = get_internal_second_derivative(
+            func=loglike,
+            params=estimates,
+            constraints=constraints,
+            func_kwargs=loglike_kwargs,
+            numdiff_options=_get_hessian_numdiff_options(numdiff_options, base_steps),
+        )
+        int_hess = deriv_res["derivative"]
+        hess_numdiff_info = {k: v for k, v in deriv_res.items() if k != "derivative"}
     elif hess_case in ("closed-form", "pre-calculated") and constraints:
         raise NotImplementedError(
             "Closed-form or pre-calculated Hessians are not yet compatible with "
@@ -274,6 +309,7 @@ def estimate_ml(
             constraints=constraints,
             n_samples=n_samples,
             bounds_handling=bounds_handling,
+            method=transformation_method,
         )
         summary = calculate_inference_quantities(
             params=estimates,
@@ -318,6 +354,57 @@ def estimate_ml(
     return out
 
 
+def _get_hessian_numdiff_options(numdiff_options, base_steps=None):
+    """Adjust the numdiff_options for the Jacobian to the calculation of the Hessian."""
+    ignored = {"n_steps", "step_ratio", "sparsity", "richardson_tol"}
+    options = {k: v for k, v in numdiff_options.items() if k not in ignored}
+    method = options.get("method", "central")
+    if method in ("central", "complex"):
+        options["method"] = "central_cross"
+    options["key"] = "value"
+    if base_steps is not None:
+        options.update(base_steps=base_steps, scaling_factor=1)
+    return options
+
+
+def _get_shared_base_steps(params, constraints, numdiff_options):
+    """Get the base_steps of a Hessian that reuses the evaluations of the Jacobian.
+
+    The central_cross Hessian with base_steps h evaluates loglike at x +- h_j +- h_j on
+    its diagonal and a central Jacobian with base_steps 2 * h at x +- 2 * h_j. We use
+    the rule of thumb for second derivatives for h because it is also a good step size
+    for central first derivatives. The steps are rounded such that x + h is exactly
+    representable. Then both points are the same floating point number and can be
+    taken from the cache.
+
+    Returns:
+        numpy.ndarray or None: The base_steps of the Hessian in terms of internal
+            parameters, already multiplied with the scaling_factor, or None if the
+            user chose the steps or a method for which the steps cannot be shared.
+
+    """
+    is_central = numdiff_options.get("method", "central") == "central"
+    has_custom_steps = {"base_steps", "min_steps"} & set(numdiff_options)
+    if not is_central or has_custom_steps:
+        return None
+
+    to_internal, _ = get_reparametrize_functions(params, constraints)
+    x = to_internal(params)
+    steps = generate_steps(
+        x=x,
+        method="central",
+        n_steps=1,
+        target="second_derivative",
+        base_steps=None,
+        scaling_factor=numdiff_options.get("scaling_factor", 1),
+        lower_bounds=None,
+        upper_bounds=None,
+        step_ratio=2,
+        min_steps=None,
+    )
+    return (x + steps.pos[0]) - x
+
+
 def _get_cov_cases(jac_case, hess_case, design_info):
     if jac_case == "skip" and hess_case == "skip":
         raise ValueError("Jacobian and Hessian cannot both be False.")
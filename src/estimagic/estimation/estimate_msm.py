@@ -40,6 +40,7 @@ def estimate_msm(
     ci_level=0.95,
     n_samples=10_000,
     bounds_handling="raise",
+    transformation_method="sampling",
 ):
     """Do a method of simulated moments or indirect inference estimation.
 
@@ -128,6 +129,12 @@ def estimate_msm(
             Standard errors are only adjusted if a sampling step is necessary due to
             additional constraints. If "raise" and any lower or upper bound is binding,
             we raise an error. If "ignore", boundary problems are simply ignored.
+        transformation_method (str): One of "sampling" and "delta". Determines how
+            the covariance matrix of the internal parameters is transformed into the
+            covariance matrix of the external parameters if you have specified
+            constraints. "sampling" transforms n_samples draws. "delta" uses the
+            delta method with the jacobian of the transformation, which is
+            deterministic and much faster but ignores bounds_handling.
 
         Returns:
             dict: The estimated parameters, standard errors and sensitivity measures
@@ -240,6 +247,7 @@ def estimate_msm(
         constraints=constraints,
         n_samples=n_samples,
         bounds_handling=bounds_handling,
+        method=transformation_method,
     )
 
     summary = calculate_inference_quantities(
@@ -18,6 +18,7 @@ def bootstrap(
     n_cores=1,
     error_handling="continue",
     batch_evaluator=joblib_batch_evaluator,
+    share_data=False,
 ):
     """Calculate bootstrap estimates, standard errors and confidence intervals
     for statistic of interest in given original sample.
@@ -39,6 +40,10 @@ def bootstrap(
         batch_evaluator (str or Callable): Name of a pre-implemented batch evaluator
             (currently 'joblib' and 'pathos_mp') or Callable with the same interface
             as the estimagic batch_evaluators. See :ref:`batch_evaluators`.
+        share_data (bool): If True, the numeric columns of data are shared with all
+            processes through memory mapped files instead of being pickled once per
+            bootstrap draw. Recommended for large datasets and n_cores > 1. Default
+            False.
 
     Returns:
         results (pandas.DataFrame): DataFrame where k'th row contains mean estimate,
@@ -58,6 +63,7 @@ def bootstrap(
         n_cores=n_cores,
         error_handling=error_handling,
         batch_evaluator=batch_evaluator,
+        share_data=share_data,
     )
 
     out = bootstrap_from_outcomes(data, outcome, estimates, ci_method, alpha, n_cores)
@@ -1,5 +1,10 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
 from functools import partial
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from estimagic.batch_evaluators import joblib_batch_evaluator
 from estimagic.inference.bootstrap_helpers import check_inputs
@@ -16,6 +21,7 @@ def get_bootstrap_outcomes(
     n_cores=1,
     error_handling="continue",
     batch_evaluator=joblib_batch_evaluator,
+    share_data=False,
 ):
     """Draw bootstrap samples and calculate outcomes.
 
@@ -33,6 +39,11 @@ def get_bootstrap_outcomes(
         batch_evaluator (str or Callable): Name of a pre-implemented batch evaluator
             (currently 'joblib' and 'pathos_mp') or Callable with the same interface
             as the estimagic batch_evaluators. See :ref:`batch_evaluators`.
+        share_data (bool): If True, the numeric columns (and index levels) of data are
+            written once to memory mapped files that are shared by all processes of
+            the batch evaluator. Each bootstrap sample is then rebuilt from its
+            positional indices, i.e. data is not pickled once per draw. Non-numeric
+            columns are still sent with each draw. Default False.
 
     Returns:
         estimates (pandas.DataFrame): Outcomes for different bootstrap samples. The
@@ -59,6 +70,7 @@ def get_bootstrap_outcomes(
         n_cores=n_cores,
         error_handling=error_handling,
         batch_evaluator=batch_evaluator,
+        share_data=share_data,
     )
 
     return estimates
@@ -71,17 +83,33 @@ def _get_bootstrap_outcomes_from_indices(
     n_cores,
     error_handling,
     batch_evaluator,
+    share_data=False,
 ):
 
-    arguments = [{"data": data, "indices": ind, "outcome": outcome} for ind in indices]
-
-    raw_estimates = batch_evaluator(
-        _take_indices_and_calculate_outcome,
-        arguments,
-        n_cores=n_cores,
-        unpack_symbol="**",
-        error_handling=error_handling,
-    )
+    if share_data:
+        with _memory_mapped_data(data) as shared:
+            arguments = [
+                {"shared": shared, "indices": ind, "outcome": outcome}
+                for ind in indices
+            ]
+            raw_estimates = batch_evaluator(
+                _rebuild_sample_and_calculate_outcome,
+                arguments,
+                n_cores=n_cores,
+                unpack_symbol="**",
+                error_handling=error_handling,
+            )
+    else:
+        arguments = [
+            {"data": data, "indices": ind, "outcome": outcome} for ind in indices
+        ]
+        raw_estimates = batch_evaluator(
+            _take_indices_and_calculate_outcome,
+            arguments,
+            n_cores=n_cores,
+            unpack_symbol="**",
+            error_handling=error_handling,
+        )
 
     estimates = [est for est in raw_estimates if not isinstance(est, str)]
     tracebacks = [est for est in raw_estimates if isinstance(est, str)]
@@ -108,3 +136,88 @@ def _get_bootstrap_outcomes_from_indices(
 
 def _take_indices_and_calculate_outcome(indices, data, outcome):
     return outcome(data.iloc[indices])
+
+
+@contextmanager
+def _memory_mapped_data(data):
+    """Write the numeric columns of data to .npy files that can be memory mapped.
+
+    Index levels are treated like columns, unless data has a RangeIndex. The files are
+    deleted when the context is left.
+
+    Args:
+        data (pandas.DataFrame): original dataset.
+
+    Yields:
+        dict: Lightweight description of data that can be passed to
+            :func:`_rebuild_sample` together with positional indices.
+
+    """
+    if isinstance(data.index, pd.RangeIndex):
+        frame, index_columns = data, None
+    else:
+        frame = data.reset_index()
+        index_columns = list(frame.columns[: data.index.nlevels])
+
+    directory = Path(tempfile.mkdtemp(prefix="estimagic_bootstrap_"))
+    mapped = {}
+    not_mapped = []
+    for i, col in enumerate(frame.columns):
+        arr = frame[col].to_numpy()
+        if isinstance(frame[col].dtype, np.dtype) and arr.dtype.kind in "biufcmM":
+            path = directory / f"{i}.npy"
+            np.save(path, arr)
+            mapped[col] = str(path)
+        else:
+            not_mapped.append(col)
+
+    shared = {
+        "directory": str(directory),
+        "columns": list(frame.columns),
+        "mapped": mapped,
+        "not_mapped": frame[not_mapped] if not_mapped else None,
+        "range_index": data.index if index_columns is None else None,
+        "index_columns": index_columns,
+        "index_names": list(data.index.names),
+    }
+
+    try:
+        yield shared
+    finally:
+        _MEMORY_MAPS.clear()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+_MEMORY_MAPS = {}
+
+
+def _rebuild_sample(shared, indices):
+    if _MEMORY_MAPS.get("directory") != shared["directory"]:
+        _MEMORY_MAPS.clear()
+        _MEMORY_MAPS["directory"] = shared["directory"]
+        _MEMORY_MAPS["arrays"] = {
+            col: np.load(path, mmap_mode="r") for col, path in shared["mapped"].items()
+        }
+    arrays = _MEMORY_MAPS["arrays"]
+
+    if shared["not_mapped"] is not None:
+        not_mapped = shared["not_mapped"].iloc[indices]
+
+    columns = {}
+    for col in shared["columns"]:
+        if col in arrays:
+            columns[col] = np.asarray(arrays[col][indices])
+        else:
+            columns[col] = not_mapped[col].to_numpy()
+
+    sample = pd.DataFrame(columns, columns=shared["columns"])
+    if shared["index_columns"] is None:
+        sample.index = shared["range_index"][indices]
+    else:
+        sample = sample.set_index(shared["index_columns"])
+        sample.index.names = shared["index_names"]
+    return sample
+
+
+def _rebuild_sample_and_calculate_outcome(indices, shared, outcome):
+    return outcome(_rebuild_sample(shared, indices))
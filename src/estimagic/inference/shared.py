@@ -6,6 +6,8 @@ import pandas as pd
 import scipy
 from estimagic.decorators import numpy_interface
 from estimagic.differentiation.derivatives import first_derivative
+from estimagic.differentiation.derivatives import second_derivative
+from estimagic.parameters.parameter_conversion import get_derivative_conversion_function
 from estimagic.parameters.parameter_conversion import get_internal_bounds
 from estimagic.parameters.parameter_conversion import get_reparametrize_functions
 from estimagic.parameters.process_constraints import process_constraints
@@ -17,8 +19,9 @@ def transform_covariance(
     constraints,
     n_samples,
     bounds_handling,
+    method="sampling",
 ):
-    """Transform the internal covariance matrix to an external one, given constraints.
+    r"""Transform the internal covariance matrix to an external one, given constraints.
 
     Args:
         params (pd.DataFrame): DataFrame where the "value" column contains estimated
@@ -30,12 +33,21 @@ def transform_covariance(
             See .. _link: ../../docs/source/how_to_guides/how_to_use_constraints.ipynb
         n_samples (int): Number of samples used to transform the covariance matrix of
             the internal parameter vector into the covariance matrix of the external
-            parameters.
+            parameters. Only used if method is "sampling".
         bounds_handling (str): One of "clip", "raise", "ignore". Determines how bounds
             are handled. If "clip", confidence intervals are clipped at the bounds.
             Standard errors are only adjusted if a sampling step is necessary due to
             additional constraints. If "raise" and any lower or upper bound is binding,
             we raise an error. If "ignore", boundary problems are simply ignored.
+            Only used if method is "sampling".
+        method (str): One of "sampling" and "delta". If "sampling", n_samples draws
+            from a normal distribution with the internal covariance matrix are
+            transformed to external parameters and the covariance matrix of the
+            transformed draws is returned. If "delta", the delta method is used, i.e.
+            the covariance matrix is :math:`J \Sigma J^\top` where :math:`J` is the
+            jacobian of the transformation from internal to external parameters at
+            params. This is exact for linear transformations, deterministic and much
+            faster, but ignores bounds and the non-linearity of the transformation.
 
     Returns:
         pd.DataFrame: Quadratic DataFrame containing the covariance matrix of the free
@@ -44,13 +56,40 @@ def transform_covariance(
             index.
 
     """
+    if method not in ("sampling", "delta"):
+        raise ValueError(f"method must be 'sampling' or 'delta', not {method}.")
+
     processed_constraints, processed_params = process_constraints(constraints, params)
     free_index = processed_params.query("_internal_free").index
 
     if isinstance(internal_cov, pd.DataFrame):
         internal_cov = internal_cov.to_numpy()
 
-    if processed_constraints:
+    if processed_constraints and method == "delta":
+        _to_internal, _ = get_reparametrize_functions(
+            params=params,
+            constraints=constraints,
+            processed_params=processed_params,
+            processed_constraints=processed_constraints,
+        )
+        convert_derivative = get_derivative_conversion_function(
+            params=params,
+            constraints=constraints,
+            processed_params=processed_params,
+            processed_constraints=processed_constraints,
+        )
+        is_free = processed_params["_internal_free"].to_numpy()
+
+        # the jacobian of the internal to external transformation is the conversion
+        # of an identity matrix as external derivative
+        jacobian = convert_derivative(
+            external_derivative=np.eye(len(params)),
+            internal_values=_to_internal(params),
+        )
+        jacobian = np.atleast_2d(jacobian)[is_free]
+        free_cov = jacobian @ internal_cov @ jacobian.T
+
+    elif processed_constraints:
         _to_internal, _from_internal = get_reparametrize_functions(
             params=params, constraints=constraints
         )
@@ -67,21 +106,20 @@ def transform_covariance(
             cov=internal_cov,
             size=n_samples,
         )
-        transformed_free = []
-        for params_vec in sample:
-            if bounds_handling == "clip":
-                params_vec = np.clip(params_vec, a_min=lower_bounds, a_max=upper_bounds)
-            elif bounds_handling == "raise":
-                if (params_vec < lower_bounds).any() or (
-                    params_vec > upper_bounds
-                ).any():
-                    raise ValueError()
-
-            transformed = _from_internal(internal=params_vec)
-            transformed_free.append(transformed[is_free])
+        lower_bounds = lower_bounds.to_numpy()
+        upper_bounds = upper_bounds.to_numpy()
+        if bounds_handling == "clip":
+            sample = np.clip(sample, a_min=lower_bounds, a_max=upper_bounds)
+        elif bounds_handling == "raise":
+            if (sample < lower_bounds).any() or (sample > upper_bounds).any():
+                raise ValueError()
+
+        # all draws are transformed at once
+        transformed = _from_internal(internal=sample)
+        transformed_free = transformed[:, is_free]
 
         free_cov = np.cov(
-            np.array(transformed_free),
+            transformed_free,
             rowvar=False,
         )
 
@@ -189,6 +227,62 @@ def get_internal_first_derivative(
     return out
 
 
+def get_internal_second_derivative(
+    func, params, constraints=None, func_kwargs=None, numdiff_options=None
+):
+    """Get the second_derivative of func with respect to internal parameters.
+
+    If there are no constraints, we simply call the second_derivative function.
+
+    Args:
+        func (callable): Function to take the derivative of.
+        params (pandas.DataFrame): Data frame with external parameters. See
+            :ref:`params`.
+        constraints (list): Constraints that define how to convert between internal
+            and external parameters.
+        func_kwargs (dict): Additional keyword arguments for func.
+        numdiff_options (dict): Additional options for second_derivative.
+
+    Returns:
+        dict: See ``second_derivative`` for details. The only difference is that the
+            the "derivative" entry is always a numpy array instead of a DataFrame
+
+    """
+    numdiff_options = {} if numdiff_options is None else numdiff_options
+    func_kwargs = {} if func_kwargs is None else func_kwargs
+    _func = functools.partial(func, **func_kwargs)
+
+    if constraints is None:
+        out = second_derivative(
+            func=_func,
+            params=params,
+            **numdiff_options,
+        )
+    else:
+        lower_bounds, upper_bounds = get_internal_bounds(params, constraints)
+
+        _internal_func = numpy_interface(
+            func=_func, params=params, constraints=constraints
+        )
+
+        _to_internal, _ = get_reparametrize_functions(params, constraints)
+
+        _x = _to_internal(params)
+
+        out = second_derivative(
+            _internal_func,
+            _x,
+            lower_bounds=lower_bounds,
+            upper_bounds=upper_bounds,
+            **numdiff_options,
+        )
+
+    if isinstance(out["derivative"], (pd.DataFrame, pd.Series)):
+        out["derivative"] = out["derivative"].to_numpy()
+
+    return out
+
+
 def process_pandas_arguments(**kwargs):
     """Convert pandas objects to arrays and extract names of moments and parameters.
 
@@ -9,16 +9,26 @@ Therefore, users who simply want to read the database should use the functions i
 ``read_log.py`` instead.
 
 """
-import io
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
 import traceback
 import warnings
+from contextlib import contextmanager
 from pathlib import Path
 
-import cloudpickle
-import pandas as pd
-from estimagic.exceptions import get_traceback
 from estimagic.exceptions import TableExistsError
+from estimagic.logging.log_backends import is_arrow_path
+from estimagic.logging.log_backends import load_arrow_backend
+from estimagic.logging.log_backends import LogBackend
+from estimagic.logging.serialization import BinaryArrayPickler
+from estimagic.logging.serialization import loads_blob
+from estimagic.logging.serialization import RobustPickler
 from sqlalchemy import and_
+from sqlalchemy import bindparam
 from sqlalchemy import BLOB
 from sqlalchemy import Boolean
 from sqlalchemy import Column
@@ -26,10 +36,13 @@ from sqlalchemy import create_engine
 from sqlalchemy import event
 from sqlalchemy import Float
 from sqlalchemy import Integer
+from sqlalchemy import LargeBinary
 from sqlalchemy import MetaData
 from sqlalchemy import PickleType
+from sqlalchemy import select
 from sqlalchemy import String
 from sqlalchemy import Table
+from sqlalchemy import type_coerce
 from sqlalchemy import update
 from sqlalchemy.dialects.sqlite import DATETIME
 
@@ -47,6 +60,11 @@ def load_database(metadata=None, path=None, fast_logging=False):
     For speed reasons we do not make any checks that MetaData is compatible with the
     database stored under path.
 
+    If metadata is a :class:`~estimagic.logging.log_backends.LogBackend`, it is just
+    returned. If path has the suffix ".arrow", an
+    :class:`~estimagic.logging.log_backends.ArrowBackend` is returned instead of a
+    MetaData object. All functions in this module work with both.
+
     Args:
         metadata (sqlalchemy.MetaData): MetaData object that might or might not be
             bound to the database under path. In any case it needs to be compatible
@@ -62,7 +80,11 @@ def load_database(metadata=None, path=None, fast_logging=False):
     """
     path = Path(path) if isinstance(path, str) else path
 
-    if isinstance(metadata, MetaData):
+    if isinstance(metadata, LogBackend):
+        pass
+    elif metadata is None and is_arrow_path(path):
+        metadata = load_arrow_backend(path)
+    elif isinstance(metadata, MetaData):
         if metadata.bind is None:
             assert (
                 path is not None
@@ -86,25 +108,33 @@ def load_database(metadata=None, path=None, fast_logging=False):
     return metadata
 
 
-def make_optimization_iteration_table(database, first_eval, if_exists="extend"):
+def make_optimization_iteration_table(
+    database, first_eval, if_exists="extend", array_storage="pickle"
+):
     """Generate a table for information that is generated with each function evaluation.
 
     Args:
         database (sqlalchemy.MetaData): Bound metadata object.
         first_eval (dict): The inputs and output of the first criterion evaluation. Has
             the entries "internal_params", "external_params" and "output".
+        array_storage (str): One of "pickle" and "binary". If "binary", numeric numpy
+            arrays (and dicts of them, like the internal derivative) are stored as raw
+            bytes with dtype and shape information instead of pickling them. This
+            makes reading faster. Other objects are always pickled. Databases with
+            either storage can be read with both options.
 
     Returns:
         database (sqlalchemy.MetaData):Bound metadata object with added table.
 
     """
     table_name = "optimization_iterations"
-    _handle_existing_table(database, "optimization_iterations", if_exists)
+
+    pickler = _get_pickler(array_storage)
 
     columns = [
         Column("rowid", Integer, primary_key=True),
-        Column("params", PickleType(pickler=RobustPickler)),
-        Column("internal_derivative", PickleType(pickler=RobustPickler)),
+        Column("params", PickleType(pickler=pickler)),
+        Column("internal_derivative", PickleType(pickler=pickler)),
         Column("timestamp", DATETIME),
         Column("exceptions", String),
         Column("valid", Boolean),
@@ -117,20 +147,13 @@ def make_optimization_iteration_table(database, first_eval, if_exists="extend"):
         extra_columns = {x for x in first_eval["output"] if x != "value"}
         if "root_contributions" in extra_columns:
             extra_columns |= {"contributions"}
-        columns += [
-            Column(key, PickleType(pickler=RobustPickler)) for key in extra_columns
-        ]
+        columns += [Column(key, PickleType(pickler=pickler)) for key in extra_columns]
 
-    Table(
-        table_name, database, *columns, sqlite_autoincrement=True, extend_existing=True
-    )
-
-    database.create_all(database.bind)
+    _create_table(database, table_name, columns, if_exists)
 
 
 def make_steps_table(database, if_exists="extend"):
     table_name = "steps"
-    _handle_existing_table(database, table_name, if_exists)
     columns = [
         Column("rowid", Integer, primary_key=True),
         Column("type", String),  # e.g. optimization
@@ -138,15 +161,11 @@ def make_steps_table(database, if_exists="extend"):
         Column("n_iterations", Integer),  # optional
         Column("name", String),  # e.g. "optimization-1", "exploration", not unique
     ]
-    Table(
-        table_name, database, *columns, extend_existing=True, sqlite_autoincrement=True
-    )
-    database.create_all(database.bind)
+    _create_table(database, table_name, columns, if_exists)
 
 
 def make_optimization_problem_table(database, if_exists="extend"):
     table_name = "optimization_problem"
-    _handle_existing_table(database, table_name, if_exists)
 
     columns = [
         Column("rowid", Integer, primary_key=True),
@@ -162,11 +181,90 @@ def make_optimization_problem_table(database, if_exists="extend"):
         Column("constraints", PickleType(pickler=RobustPickler)),
     ]
 
-    Table(
-        table_name, database, *columns, extend_existing=True, sqlite_autoincrement=True
-    )
+    _create_table(database, table_name, columns, if_exists)
+
 
-    database.create_all(database.bind)
+def _create_table(database, table_name, columns, if_exists):
+    if isinstance(database, LogBackend):
+        database.create_table(table_name, columns, if_exists)
+    else:
+        _handle_existing_table(database, table_name, if_exists)
+        Table(
+            table_name,
+            database,
+            *columns,
+            extend_existing=True,
+            sqlite_autoincrement=True,
+        )
+        database.create_all(database.bind)
+
+
+def migrate_array_storage(
+    path, array_storage="binary", table_name="optimization_iterations"
+):
+    """Convert the storage of arrays in an existing database.
+
+    All pickled columns of the table are read and written again with the requested
+    array storage (see :func:`make_optimization_iteration_table`). This can be used to
+    shrink databases that were written with pickled arrays and to speed up reading
+    them. Entries that can not be read are left unchanged.
+
+    Args:
+        path (str or pathlib.Path): Location of the database file.
+        array_storage (str): One of "pickle" and "binary".
+        table_name (str): Name of the table that is converted.
+
+    """
+    pickler = _get_pickler(array_storage)
+    database = load_database(path=path)
+    if isinstance(database, LogBackend):
+        raise NotImplementedError("Only sqlite databases can be migrated.")
+    table = database.tables[table_name]
+    columns = [col.name for col in table.columns if isinstance(col.type, PickleType)]
+
+    if columns:
+        stmt = (
+            update(table)
+            .where(table.c.rowid == bindparam("_rowid"))
+            .values({col: bindparam(col, type_=LargeBinary) for col in columns})
+        )
+        with database.bind.begin() as connection:
+            raw_columns = [type_coerce(table.c[col], LargeBinary) for col in columns]
+            rows = connection.execute(select(table.c.rowid, *raw_columns))
+            new_rows = []
+            for rowid, *raw_values in rows:
+                new_row = {"_rowid": rowid}
+                for col, raw in zip(columns, raw_values):
+                    new_row[col] = _convert_blob(raw, pickler)
+                new_rows.append(new_row)
+            if new_rows:
+                connection.execute(stmt, new_rows)
+
+
+def _convert_blob(raw, pickler):
+    """Re-encode raw bytes with pickler; keep them if they can't be decoded."""
+    if raw is None:
+        out = None
+    else:
+        try:
+            out = pickler.dumps(loads_blob(raw))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            out = raw
+    return out
+
+
+def _get_pickler(array_storage):
+    if array_storage == "pickle":
+        pickler = RobustPickler
+    elif array_storage == "binary":
+        pickler = BinaryArrayPickler
+    else:
+        raise ValueError(
+            f"array_storage must be 'pickle' or 'binary', not {array_storage}."
+        )
+    return pickler
 
 
 def _handle_existing_table(database, table_name, if_exists):
@@ -179,16 +277,34 @@ def _handle_existing_table(database, table_name, if_exists):
             raise TableExistsError(f"The table {table_name} already exists.")
 
 
-def update_row(data, rowid, table_name, database, path, fast_logging):
+def flush_database(database):
+    """Write all rows that a log backend keeps in memory; no-op for sqlite."""
+    if isinstance(database, LogBackend):
+        database.flush()
+
+
+def update_row(data, rowid, table_name, database, path, fast_logging, log_queue=None):
+    writer = _get_buffered_writer(path)
+    if writer is not None:
+        writer.update(data, rowid, table_name)
+        return
+    elif log_queue is not None:
+        log_queue.put(("update", table_name, rowid, data))
+        return
+
     database = load_database(database, path, fast_logging)
 
+    if isinstance(database, LogBackend):
+        database.update_row(table_name, rowid, data)
+        return
+
     table = database.tables[table_name]
     stmt = update(table).where(table.c.rowid == rowid).values(**data)
 
     _execute_write_statement(stmt, database, path, table_name, data)
 
 
-def append_row(data, table_name, database, path, fast_logging):
+def append_row(data, table_name, database, path, fast_logging, log_queue=None):
     """
 
     Args:
@@ -198,12 +314,28 @@ def append_row(data, table_name, database, path, fast_logging):
         path (str or pathlib.Path): Path to the database file. Using a path is much
             slower than a MetaData object and we advise to only use it as a fallback.
         fast_logging (bool)
+        log_queue (multiprocessing.Queue, optional): Queue of a
+            :class:`BufferedWriter` in another process. If provided and writes are
+            not buffered in the current process, the row is sent to that writer
+            instead of being written directly.
 
     """
+    writer = _get_buffered_writer(path)
+    if writer is not None:
+        writer.append(data, table_name)
+        return
+    elif log_queue is not None:
+        log_queue.put(("append", table_name, None, data))
+        return
+
     # this is necessary because database.bind gets lost when the database is pickled.
     # it has no cost when database.bind is set.
     database = load_database(database, path, fast_logging)
 
+    if isinstance(database, LogBackend):
+        database.append_rows(table_name, [data])
+        return
+
     stmt = database.tables[table_name].insert().values(**data)
 
     _execute_write_statement(stmt, database, path, table_name, data)
@@ -224,6 +356,235 @@ def _execute_write_statement(statement, database, path, table_name, data):
         )
 
 
+_BUFFERED_WRITERS = {}
+
+
+@contextmanager
+def buffered_logging(
+    database,
+    path,
+    fast_logging,
+    buffer_size=1000,
+    interval=0.1,
+    collect_from_workers=False,
+):
+    """Buffer all writes to the database at path in a background thread.
+
+    While the context is active, :func:`append_row` and :func:`update_row` calls for
+    the database at ``path`` that happen in the current process only put the row
+    into a queue. A writer thread collects the rows and writes them with one bulk
+    insert per table and one transaction every ``buffer_size`` rows or ``interval``
+    seconds, whichever comes first. Reading functions of this module flush the
+    buffer before they read. All buffered rows are written when the context is left,
+    also if an exception is raised.
+
+    If ``collect_from_workers`` is True, the writer receives rows through a queue
+    that can be sent to worker processes (e.g. for parallel numerical
+    differentiation or multistart optimizations). Workers that pass this queue as
+    ``log_queue`` to :func:`append_row` and :func:`update_row` send their rows to
+    the writer, which is then the only process that writes to the database.
+    Otherwise, writes from other processes are not buffered.
+
+    Args:
+        database (sqlalchemy.MetaData): Bound metadata object.
+        path (str or pathlib.Path): Location of the database file.
+        fast_logging (bool)
+        buffer_size (int): Maximum number of rows that are collected before they are
+            written to the database.
+        interval (float): Maximum time in seconds before collected rows are written.
+        collect_from_workers (bool): Whether rows from worker processes are collected
+            through :attr:`BufferedWriter.log_queue`.
+
+    Yields:
+        BufferedWriter
+
+    """
+    key = _get_writer_key(path)
+    if key in _BUFFERED_WRITERS:
+        raise ValueError(f"Writes to {path} are already buffered.")
+    writer = BufferedWriter(
+        database=database,
+        path=path,
+        fast_logging=fast_logging,
+        buffer_size=buffer_size,
+        interval=interval,
+        collect_from_workers=collect_from_workers,
+    )
+    _BUFFERED_WRITERS[key] = writer
+    try:
+        yield writer
+    finally:
+        del _BUFFERED_WRITERS[key]
+        writer.close()
+
+
+class BufferedWriter:
+    """Write rows to a database from a background thread.
+
+    Rows are written in the order in which they were submitted. Consecutive
+    insertions into the same table are written with one ``executemany`` call.
+
+    Use :func:`buffered_logging` instead of instantiating this class directly.
+
+    Attributes:
+        log_queue (multiprocessing.Queue or None): Picklable queue through which
+            worker processes can send rows to the writer. None if the writer does
+            not collect rows from workers.
+
+    """
+
+    def __init__(
+        self,
+        database,
+        path,
+        fast_logging,
+        buffer_size,
+        interval,
+        collect_from_workers=False,
+    ):
+        self.database = load_database(database, path, fast_logging)
+        self.buffer_size = max(1, int(buffer_size))
+        self.interval = float(interval)
+        self._pid = os.getpid()
+        self._flush_events = {}
+        if collect_from_workers:
+            self._manager = multiprocessing.Manager()
+            self._queue = self._manager.Queue()
+            self.log_queue = self._queue
+        else:
+            self._manager = None
+            self._queue = queue.Queue()
+            self.log_queue = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def append(self, data, table_name):
+        self._queue.put(("append", table_name, None, dict(data)))
+
+    def update(self, data, rowid, table_name):
+        self._queue.put(("update", table_name, rowid, dict(data)))
+
+    def flush(self):
+        """Block until all rows that were submitted so far are written."""
+        if self._thread.is_alive():
+            done = threading.Event()
+            # only the id is sent because the queue might pickle its items
+            self._flush_events[id(done)] = done
+            self._queue.put(("flush", None, None, id(done)))
+            done.wait()
+
+    def close(self):
+        """Write all remaining rows and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(("stop", None, None, None))
+            self._thread.join()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _run(self):
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.time(), 0)
+            try:
+                kind, table_name, rowid, data = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                kind = "timeout"
+
+            if kind in ["append", "update"]:
+                pending.append((kind, table_name, rowid, data))
+                if deadline is None:
+                    deadline = time.time() + self.interval
+                if len(pending) < self.buffer_size:
+                    continue
+
+            self._write(pending)
+            pending, deadline = [], None
+
+            if kind == "flush":
+                self._flush_events.pop(data).set()
+            elif kind == "stop":
+                break
+
+    def _write(self, pending):
+        if not pending:
+            return
+
+        def group_key(entry):
+            kind, table_name, _, data = entry
+            if kind == "update":
+                return id(entry), None
+            return table_name, tuple(data)
+
+        if isinstance(self.database, LogBackend):
+            self._write_to_backend(pending)
+            return
+
+        try:
+            with self.database.bind.begin() as connection:
+                for (table_name, columns), group in itertools.groupby(
+                    pending, key=group_key
+                ):
+                    group = list(group)
+                    if columns is None:
+                        _, table_name, rowid, data = group[0]
+                        table = self.database.tables[table_name]
+                        stmt = update(table).where(table.c.rowid == rowid)
+                        connection.execute(stmt.values(**data))
+                    else:
+                        table = self.database.tables[table_name]
+                        connection.execute(table.insert(), [e[3] for e in group])
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            exception_info = traceback.format_exc()
+            warnings.warn(
+                f"Unable to write to database. The traceback was:\n\n{exception_info}"
+            )
+
+    def _write_to_backend(self, pending):
+        try:
+            for (kind, table_name), group in itertools.groupby(
+                pending, key=lambda entry: entry[:2]
+            ):
+                group = list(group)
+                if kind == "append":
+                    self.database.append_rows(table_name, [e[3] for e in group])
+                else:
+                    for _, _, rowid, data in group:
+                        self.database.update_row(table_name, rowid, data)
+            self.database.flush()
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            exception_info = traceback.format_exc()
+            warnings.warn(
+                f"Unable to write to database. The traceback was:\n\n{exception_info}"
+            )
+
+
+def _get_writer_key(path):
+    return str(Path(path).resolve())
+
+
+def _get_buffered_writer(path):
+    """Get the writer that buffers writes to path in the current process, if any."""
+    writer = None
+    if _BUFFERED_WRITERS and path is not None:
+        writer = _BUFFERED_WRITERS.get(_get_writer_key(path))
+        # forked processes inherit the registry but not the writer thread
+        if writer is not None and writer._pid != os.getpid():
+            writer = None
+    return writer
+
+
+def _flush_buffered_writer(path):
+    writer = _get_buffered_writer(path)
+    if writer is not None:
+        writer.flush()
+
+
 def read_new_rows(
     database,
     table_name,
@@ -256,23 +617,29 @@ def read_new_rows(
         int: The new last_retrieved value.
 
     """
+    _flush_buffered_writer(path)
     database = load_database(database, path, fast_logging)
     last_retrieved = int(last_retrieved)
     limit = int(limit) if limit is not None else limit
 
-    table = database.tables[table_name]
-    stmt = table.select().where(table.c.rowid > last_retrieved).limit(limit)
-    conditions = [table.c.rowid > last_retrieved]
+    if isinstance(database, LogBackend):
+        columns, raw_result = database.read_new_rows(
+            table_name, last_retrieved, limit=limit, stride=stride, step=step
+        )
+        data = _format_rows(columns, raw_result, return_type)
+    else:
+        table = database.tables[table_name]
+        conditions = [table.c.rowid > last_retrieved]
 
-    if stride != 1:
-        conditions.append(table.c.rowid % stride == 0)
+        if stride != 1:
+            conditions.append(table.c.rowid % stride == 0)
 
-    if step is not None:
-        conditions.append(table.c.step == int(step))
+        if step is not None:
+            conditions.append(table.c.step == int(step))
 
-    stmt = table.select().where(and_(*conditions)).limit(limit)
+        stmt = table.select().where(and_(*conditions)).limit(limit)
 
-    data = _execute_read_statement(database, table_name, stmt, return_type)
+        data = _execute_read_statement(database, table_name, stmt, return_type)
 
     if return_type == "list_of_dicts":
         new_last = data[-1]["rowid"] if data else last_retrieved
@@ -312,9 +679,16 @@ def read_last_rows(
         result (return_type): the last rows of the `table_name` table as `return_type`.
 
     """
+    _flush_buffered_writer(path)
     database = load_database(database, path, fast_logging)
     n_rows = int(n_rows)
 
+    if isinstance(database, LogBackend):
+        columns, raw_result = database.read_last_rows(
+            table_name, n_rows, stride=stride, step=step
+        )
+        return _format_rows(columns, raw_result, return_type)
+
     table = database.tables[table_name]
 
     conditions = []
@@ -363,19 +737,29 @@ def read_specific_row(
         dict or list: The requested row from the database.
 
     """
+    _flush_buffered_writer(path)
     database = load_database(database, path, fast_logging)
     rowid = int(rowid)
-    table = database.tables[table_name]
-    stmt = table.select().where(table.c.rowid == rowid)
-    data = _execute_read_statement(database, table_name, stmt, return_type)
+    if isinstance(database, LogBackend):
+        columns, raw_result = database.read_specific_row(table_name, rowid)
+        data = _format_rows(columns, raw_result, return_type)
+    else:
+        table = database.tables[table_name]
+        stmt = table.select().where(table.c.rowid == rowid)
+        data = _execute_read_statement(database, table_name, stmt, return_type)
     return data
 
 
 def read_table(database, table_name, return_type, path=None, fast_logging=False):
+    _flush_buffered_writer(path)
     database = load_database(database, path, fast_logging)
-    table = database.tables[table_name]
-    stmt = table.select()
-    data = _execute_read_statement(database, table_name, stmt, return_type)
+    if isinstance(database, LogBackend):
+        columns, raw_result = database.read_table(table_name)
+        data = _format_rows(columns, raw_result, return_type)
+    else:
+        table = database.tables[table_name]
+        stmt = table.select()
+        data = _execute_read_statement(database, table_name, stmt, return_type)
     return data
 
 
@@ -397,6 +781,10 @@ def _execute_read_statement(database, table_name, statement, return_type):
 
     columns = database.tables[table_name].columns.keys()
 
+    return _format_rows(columns, raw_result, return_type)
+
+
+def _format_rows(columns, raw_result, return_type):
     if return_type == "list_of_dicts":
         result = [dict(zip(columns, row)) for row in raw_result]
 
@@ -512,40 +900,3 @@ def _configure_reflect():
     def _setup_pickletype(inspector, table, column_info):
         if isinstance(column_info["type"], BLOB):
             column_info["type"] = PickleType(pickler=RobustPickler)
-
-
-class RobustPickler:
-    @staticmethod
-    def loads(data, fix_imports=True, encoding="ASCII", errors="strict", buffers=None):
-        """Robust pickle loading
-
-        We first try to unpickle the object with pd.read_pickle. This makes no
-        difference for non-pandas objects but makes the de-serialization
-        of pandas objects more robust across pandas versions. If that fails, we use
-        cloudpickle. If that fails, we return None but do not raise an error.
-
-        See: https://github.com/pandas-dev/pandas/issues/16474
-
-        """
-        try:
-            res = pd.read_pickle(io.BytesIO(data), compression=None)
-        except (KeyboardInterrupt, SystemExit):
-            raise
-        except Exception:
-            try:
-                res = cloudpickle.loads(data)
-            except (KeyboardInterrupt, SystemExit):
-                raise
-            except Exception:
-                res = None
-                tb = get_traceback()
-                warnings.warn(
-                    f"Unable to read PickleType column from database:\n{tb}\n "
-                    "The entry was replaced by None."
-                )
-
-        return res
-
-    @staticmethod
-    def dumps(obj, protocol=None, *, fix_imports=True, buffer_callback=None):
-        return cloudpickle.dumps(obj, protocol=protocol)
@@ -0,0 +1,444 @@
+"""Storage backends for the optimization log.
+
+By default, estimagic logs to an sqlite database that is accessed through sqlalchemy.
+The functions in ``database_utilities.py`` accept any object that implements the
+:class:`LogBackend` interface instead of a bound ``sqlalchemy.MetaData`` object and
+dispatch to its methods. Thus, all readers (e.g. ``read_optimization_histories`` or
+the dashboard) work with every backend.
+
+:class:`ArrowBackend` is an append-only columnar backend that is used for all log
+paths with the suffix ".arrow". Each table is a directory of Arrow IPC files. Rows are
+collected in memory and written in batches, which is much faster than writing row by
+row for very fast criterion functions. Written files are never changed and read with
+memory mapping.
+
+"""
+import abc
+import json
+import multiprocessing.util
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import weakref
+from pathlib import Path
+
+import cloudpickle
+import numpy as np
+from estimagic.config import IS_PYARROW_INSTALLED
+from estimagic.exceptions import TableExistsError
+from estimagic.logging.serialization import BinaryArrayPickler
+from estimagic.logging.serialization import RobustPickler
+from sqlalchemy import Boolean
+from sqlalchemy import DateTime
+from sqlalchemy import Float
+from sqlalchemy import Integer
+from sqlalchemy import PickleType
+from sqlalchemy import String
+
+if IS_PYARROW_INSTALLED:
+    import pyarrow as pa
+
+
+class LogBackend(abc.ABC):
+    """Interface of storage backends for the optimization log.
+
+    All tables have an implicit integer column "rowid" that starts at 1 and
+    increases by one with each appended row. Read methods return the names of all
+    columns (starting with "rowid") and a list of tuples with one entry per column.
+
+    Subclasses have to implement all methods except ``flush``.
+
+    """
+
+    @abc.abstractmethod
+    def create_table(self, table_name, columns, if_exists):
+        """Create a table.
+
+        Args:
+            table_name (str): Name of the table.
+            columns (list): List of sqlalchemy.Column objects that describe the
+                columns of the table. The primary key column is ignored.
+            if_exists (str): One of "replace", "extend", "raise".
+
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def append_rows(self, table_name, rows):
+        """Append rows, given as a list of dicts, to a table."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_row(self, table_name, rowid, data):
+        """Overwrite the entries in data of the row with rowid."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_new_rows(
+        self, table_name, last_retrieved, limit=None, stride=1, step=None
+    ):
+        """Read up to limit rows with a rowid larger than last_retrieved."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_last_rows(self, table_name, n_rows, stride=1, step=None):
+        """Read the last n_rows rows in ascending order."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_specific_row(self, table_name, rowid):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_table(self, table_name):
+        raise NotImplementedError
+
+    def flush(self):
+        """Make sure that all appended rows are written."""
+
+
+def is_arrow_path(path):
+    return path is not None and Path(path).suffix == ".arrow"
+
+
+_ARROW_BACKENDS = weakref.WeakValueDictionary()
+
+
+def load_arrow_backend(path, buffer_size=1000, interval=1.0):
+    """Get the ArrowBackend for path; instances are shared within a process."""
+    key = str(Path(path).resolve())
+    backend = _ARROW_BACKENDS.get(key)
+    if backend is None or backend._pid != os.getpid():
+        backend = ArrowBackend(path, buffer_size=buffer_size, interval=interval)
+        _ARROW_BACKENDS[key] = backend
+    return backend
+
+
+class ArrowBackend(LogBackend):
+    """Append-only log backend based on Arrow IPC files.
+
+    Rows are buffered until ``buffer_size`` rows are collected, a row is appended
+    more than ``interval`` seconds after the first buffered row, data is read, the
+    backend is garbage collected or the process exits. Then they are written as a new
+    file. Updates of rows are stored as separate files and applied when reading.
+    Several processes can write to the same table. The rowids are determined by the
+    order of the files, whose names are claimed atomically.
+
+    Args:
+        path (str or pathlib.Path): Directory in which the tables are stored.
+        buffer_size (int): Maximum number of buffered rows.
+        interval (float): Number of seconds after the first buffered row from which
+            on the next append writes the buffer. There is no timer, so rows are only
+            written when the next row is appended, data is read or the process exits.
+
+    """
+
+    def __init__(self, path, buffer_size=1000, interval=1.0):
+        if not IS_PYARROW_INSTALLED:
+            raise NotImplementedError(
+                "To log to .arrow files, install pyarrow with "
+                "conda install -c conda-forge pyarrow."
+            )
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.buffer_size = max(1, int(buffer_size))
+        self.interval = float(interval)
+        self._pid = os.getpid()
+        self._buffer = _RowBuffer(self.path)
+        self._readers = {}
+        # unlike weakref.finalize, this also runs when a worker process of a
+        # multiprocessing pool exits, which does not call atexit handlers
+        multiprocessing.util.Finalize(self, self._buffer.flush, exitpriority=10)
+
+    def __getstate__(self):
+        return {
+            "path": self.path,
+            "buffer_size": self.buffer_size,
+            "interval": self.interval,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def tables(self):
+        return {
+            p.name: _read_columns(p)
+            for p in sorted(self.path.iterdir())
+            if (p / "columns.json").exists()
+        }
+
+    def create_table(self, table_name, columns, if_exists):
+        assert if_exists in ["replace", "extend", "raise"]
+        directory = self.path / table_name
+        exists = (directory / "columns.json").exists()
+        if exists and if_exists == "raise":
+            raise TableExistsError(f"The table {table_name} already exists.")
+        elif exists and if_exists == "replace":
+            self._buffer.discard(table_name)
+            self._readers.pop(table_name, None)
+            shutil.rmtree(directory)
+            exists = False
+
+        if not exists:
+            spec = [_column_spec(col) for col in columns if not col.primary_key]
+            (directory / "updates").mkdir(parents=True, exist_ok=True)
+            tmp = directory / f"columns.json.{os.getpid()}"
+            tmp.write_text(json.dumps(spec))
+            os.replace(tmp, directory / "columns.json")
+
+    def append_rows(self, table_name, rows):
+        self._buffer.append(table_name, rows)
+        n_rows, first = self._buffer.size()
+        if n_rows >= self.buffer_size or time.time() - first >= self.interval:
+            self._buffer.flush()
+
+    def update_row(self, table_name, rowid, data):
+        self._buffer.flush()
+        directory = self.path / table_name / "updates"
+        batch = pa.table(
+            {
+                "rowid": pa.array([int(rowid)], type=pa.int64()),
+                "data": pa.array([cloudpickle.dumps(dict(data))], type=pa.binary()),
+            }
+        )
+        _write_segment(directory, batch)
+
+    def flush(self):
+        self._buffer.flush()
+
+    def read_new_rows(
+        self, table_name, last_retrieved, limit=None, stride=1, step=None
+    ):
+        reader = self._get_reader(table_name)
+        rowids = reader.select(stride=stride, step=step)
+        rowids = rowids[rowids > last_retrieved]
+        if limit is not None:
+            rowids = rowids[:limit]
+        return reader.columns, reader.rows(rowids)
+
+    def read_last_rows(self, table_name, n_rows, stride=1, step=None):
+        reader = self._get_reader(table_name)
+        rowids = reader.select(stride=stride, step=step)
+        rowids = rowids[len(rowids) - n_rows :] if n_rows > 0 else rowids[:0]
+        return reader.columns, reader.rows(rowids)
+
+    def read_specific_row(self, table_name, rowid):
+        reader = self._get_reader(table_name)
+        rowids = reader.select()
+        return reader.columns, reader.rows(rowids[rowids == rowid])
+
+    def read_table(self, table_name):
+        reader = self._get_reader(table_name)
+        return reader.columns, reader.rows(reader.select())
+
+    def _get_reader(self, table_name):
+        self._buffer.flush()
+        if table_name not in self._readers:
+            self._readers[table_name] = _TableReader(self.path / table_name)
+        reader = self._readers[table_name]
+        reader.refresh()
+        return reader
+
+
+class _RowBuffer:
+    """Rows that are not yet written; kept separate so it can be flushed on exit."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = {}
+        self.first = None
+
+    def append(self, table_name, rows):
+        if self.first is None:
+            self.first = time.time()
+        self.rows.setdefault(table_name, []).extend(rows)
+
+    def size(self):
+        return sum(len(rows) for rows in self.rows.values()), self.first
+
+    def discard(self, table_name):
+        self.rows.pop(table_name, None)
+
+    def flush(self):
+        for table_name, rows in self.rows.items():
+            if rows:
+                directory = self.path / table_name
+                columns = _read_columns(directory)
+                _write_segment(directory, _rows_to_table(rows, columns))
+        self.rows = {}
+        self.first = None
+
+
+class _TableReader:
+    """Memory mapped view on the files of one table.
+
+    Files are immutable once they are written. Thus, only files that were added
+    since the last refresh have to be read.
+
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        spec = _read_columns(directory)
+        self.columns = ["rowid"] + [name for name, _ in spec]
+        self.kinds = dict(spec)
+        self.chunks = []
+        self.n_files = 0
+        self.n_update_files = 0
+        self.updates = {}
+        self.table = None
+
+    def refresh(self):
+        new, n_files = _read_segments(self.directory, self.n_files)
+        self.n_files += n_files
+        if new or self.table is None:
+            self.chunks += new
+            if self.chunks:
+                self.table = pa.concat_tables(self.chunks)
+            else:
+                self.table = _rows_to_table([], list(self.kinds.items()))
+
+        updates, n_files = _read_segments(
+            self.directory / "updates", self.n_update_files
+        )
+        self.n_update_files += n_files
+        for segment in updates:
+            for rowid, data in zip(segment["rowid"].to_pylist(), segment["data"]):
+                self.updates.setdefault(rowid, {}).update(
+                    cloudpickle.loads(data.as_py())
+                )
+
+    def select(self, stride=1, step=None):
+        rowids = np.arange(1, self.table.num_rows + 1)
+        keep = np.full(len(rowids), True)
+        if stride != 1:
+            keep &= rowids % stride == 0
+        if step is not None:
+            steps = self.table["step"].to_numpy(zero_copy_only=False)
+            keep &= steps == int(step)
+        return rowids[keep]
+
+    def rows(self, rowids):
+        selected = self.table.take(pa.array(np.asarray(rowids) - 1, type=pa.int64()))
+        columns = [rowids.tolist()]
+        for name in self.columns[1:]:
+            values = selected[name].to_pylist()
+            if self.kinds[name].startswith("object"):
+                values = [None if v is None else RobustPickler.loads(v) for v in values]
+            columns.append(values)
+        rows = [list(row) for row in zip(*columns)]
+        for row in rows:
+            for key, val in self.updates.get(row[0], {}).items():
+                if key in self.kinds:
+                    row[self.columns.index(key)] = val
+        return [tuple(row) for row in rows]
+
+
+def _column_spec(column):
+    type_ = column.type
+    if isinstance(type_, PickleType):
+        binary = type_.pickler is BinaryArrayPickler
+        kind = "object_binary" if binary else "object"
+    elif isinstance(type_, Boolean):
+        kind = "bool"
+    elif isinstance(type_, Integer):
+        kind = "int"
+    elif isinstance(type_, Float):
+        kind = "float"
+    elif isinstance(type_, DateTime):
+        kind = "datetime"
+    elif isinstance(type_, String):
+        kind = "string"
+    else:
+        raise NotImplementedError(f"Columns of type {type_} are not supported.")
+    return [column.name, kind]
+
+
+def _read_columns(directory):
+    return [tuple(col) for col in json.loads((directory / "columns.json").read_text())]
+
+
+def _arrow_type(kind):
+    types = {
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "datetime": pa.timestamp("us"),
+        "string": pa.string(),
+        "object": pa.binary(),
+        "object_binary": pa.binary(),
+    }
+    return types[kind]
+
+
+def _rows_to_table(rows, columns):
+    names = {name for name, _ in columns}
+    unknown = {key for row in rows for key in row} - names
+    if unknown:
+        warnings.warn(f"The following columns do not exist and are ignored: {unknown}")
+
+    arrays = {}
+    for name, kind in columns:
+        values = [row.get(name) for row in rows]
+        if kind == "object":
+            values = [None if v is None else RobustPickler.dumps(v) for v in values]
+        elif kind == "object_binary":
+            values = [
+                None if v is None else BinaryArrayPickler.dumps(v) for v in values
+            ]
+        elif kind in ["int", "float", "bool"]:
+            values = [
+                None if v is None else v.item() if hasattr(v, "item") else v
+                for v in values
+            ]
+        arrays[name] = pa.array(values, type=_arrow_type(kind))
+    return pa.table(arrays)
+
+
+def _write_segment(directory, table):
+    """Write table to the next free file in directory.
+
+    The data is written to a temporary file first, which is then hard linked to the
+    next free file name. Linking fails if the name exists, so each name is claimed
+    atomically by exactly one complete file and the order of rows never changes.
+
+    """
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        i = len(list(directory.glob("*.arrow")))
+        while True:
+            try:
+                os.link(tmp, directory / f"{i:012d}.arrow")
+                break
+            except FileExistsError:
+                i += 1
+    finally:
+        os.remove(tmp)
+
+
+def _read_segments(directory, start):
+    """Read all files of directory, starting with the start-th file.
+
+    Empty files can only be left over by an interrupted write of an earlier version
+    and are skipped.
+
+    Returns:
+        list: The tables in the files that are not empty.
+        int: The number of files that were looked at.
+
+    """
+    paths = sorted(directory.glob("*.arrow"))[start:]
+    segments = []
+    for path in paths:
+        if path.stat().st_size > 0:
+            with pa.memory_map(str(path)) as source:
+                segments.append(pa.ipc.open_file(source).read_all())
+    return segments, len(paths)
@@ -7,14 +7,21 @@ When using them internally (e.g. in the dashboard), make sure to supply a databa
 path_or_database. Otherwise, the functions may be very slow.
 
 """
+import traceback
+import warnings
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from estimagic.logging.database_utilities import load_database
 from estimagic.logging.database_utilities import read_last_rows
 from estimagic.logging.database_utilities import read_new_rows
 from estimagic.logging.database_utilities import read_specific_row
+from estimagic.logging.log_backends import LogBackend
+from sqlalchemy import and_
+from sqlalchemy import bindparam
 from sqlalchemy import MetaData
+from sqlalchemy import select
 
 
 def read_optimization_iteration(path_or_database, iteration, include_internals=False):
@@ -141,11 +148,163 @@ def read_optimization_histories(path_or_database):
     return histories
 
 
+class OptimizationHistoryReader:
+    """Incrementally read the optimization history as NumPy arrays.
+
+    In contrast to the other functions in this module, the reader binds the database
+    only once and remembers the last rowid it has returned. Each call of
+    :meth:`read_new_rows` only fetches the iterations that were logged since the
+    previous call and only the columns that are needed. This makes it cheap to
+    poll a running optimization, e.g. in the dashboard or in monitoring scripts.
+
+    Args:
+        path_or_database (pathlib.Path, str, sqlalchemy.MetaData or LogBackend)
+        last_retrieved (int): The rowid after which to start reading. Default 0.
+        stride (int): Only return every n-th row. Default is every row (stride=1).
+        step (int): Only return iterations that belong to step.
+
+    Examples:
+
+    >>> reader = OptimizationHistoryReader("log.db")  # doctest: +SKIP
+    >>> new = reader.read_new_rows(limit=100)  # doctest: +SKIP
+    >>> new["params"].shape  # doctest: +SKIP
+    (100, 3)
+
+    """
+
+    def __init__(self, path_or_database, last_retrieved=0, stride=1, step=None):
+        self.database = load_database(**_process_path_or_database(path_or_database))
+        self.last_retrieved = int(last_retrieved)
+        self.stride = int(stride)
+        self.step = None if step is None else int(step)
+        self._n_params = None
+        if isinstance(self.database, LogBackend):
+            self._statement = None
+        else:
+            self._statement = _build_history_statement(
+                self.database, self.stride, self.step
+            )
+
+    def reset(self, last_retrieved=0):
+        """Move the cursor such that the next read starts after last_retrieved."""
+        self.last_retrieved = int(last_retrieved)
+
+    def read_new_rows(self, limit=None):
+        """Read the iterations that were logged after the last retrieved one.
+
+        Args:
+            limit (int): Maximum number of rows to read. Default None means all.
+
+        Returns:
+            dict: Dictionary with the following entries:
+                - "rowid" (np.ndarray): 1d integer array with the rowids.
+                - "value" (np.ndarray): 1d array with criterion values. Rows that do
+                  not contain a criterion value (e.g. pure derivative evaluations)
+                  are NaN.
+                - "params" (np.ndarray): 2d array of shape (n_rows, n_params) with the
+                  external parameter vectors.
+                - "timestamp" (np.ndarray): 1d array of dtype datetime64[ns].
+
+        """
+        if isinstance(self.database, LogBackend):
+            columns, raw_result = self.database.read_new_rows(
+                "optimization_iterations",
+                self.last_retrieved,
+                limit=limit,
+                stride=self.stride,
+                step=self.step,
+            )
+            positions = [columns.index(col) for col in _HISTORY_COLUMNS]
+            raw_result = [[row[pos] for pos in positions] for row in raw_result]
+        else:
+            raw_result = self._execute(limit)
+
+        if self._n_params is None:
+            self._n_params = _infer_n_params(raw_result)
+
+        arrays = _history_rows_to_arrays(raw_result, self._n_params)
+        if len(arrays["rowid"]) > 0:
+            self.last_retrieved = int(arrays["rowid"][-1])
+        return arrays
+
+    def _execute(self, limit):
+        # -1 means no limit in SQLite
+        parameters = {
+            "last_retrieved": self.last_retrieved,
+            "limit": -1 if limit is None else int(limit),
+        }
+        try:
+            with self.database.bind.begin() as connection:
+                raw_result = list(connection.execute(self._statement, parameters))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            exception_info = traceback.format_exc()
+            warnings.warn(
+                "Unable to read optimization_iterations from database. Try again "
+                f"later. The traceback was: \n\n{exception_info}"
+            )
+            raw_result = []
+        return raw_result
+
+
+_HISTORY_COLUMNS = ["rowid", "value", "params", "timestamp"]
+
+
+def _build_history_statement(database, stride, step):
+    table = database.tables["optimization_iterations"]
+    conditions = [table.c.rowid > bindparam("last_retrieved")]
+    if stride != 1:
+        conditions.append(table.c.rowid % stride == 0)
+    if step is not None:
+        conditions.append(table.c.step == step)
+
+    stmt = (
+        select([table.c[col] for col in _HISTORY_COLUMNS])
+        .where(and_(*conditions))
+        .order_by(table.c.rowid)
+        .limit(bindparam("limit"))
+    )
+    return stmt
+
+
+def _infer_n_params(raw_result):
+    for row in raw_result:
+        if row[2] is not None:
+            return len(row[2])
+    return None
+
+
+def _history_rows_to_arrays(raw_result, n_params):
+    n_rows = len(raw_result)
+    rowids = np.empty(n_rows, dtype=np.int64)
+    values = np.full(n_rows, np.nan)
+    params = np.full((n_rows, n_params or 0), np.nan)
+    timestamps = np.full(n_rows, np.datetime64("NaT"), dtype="datetime64[ns]")
+
+    for i, (rowid, value, row_params, timestamp) in enumerate(raw_result):
+        rowids[i] = rowid
+        if value is not None:
+            values[i] = value
+        if row_params is not None:
+            params[i] = row_params
+        if timestamp is not None:
+            timestamps[i] = timestamp
+
+    arrays = {
+        "rowid": rowids,
+        "value": values,
+        "params": params,
+        "timestamp": timestamps,
+    }
+    return arrays
+
+
 def _process_path_or_database(path_or_database):
     """Make inputs for load_database out of path_or_database.
 
     Args:
-        path_or_database (pathlib.Path, str or sqlalchemy.MetaData)
+        path_or_database (pathlib.Path, str, sqlalchemy.MetaData or LogBackend)
 
     Returns:
         dict: The keys are "path", "metadata" and "fast_logging"
@@ -159,7 +318,7 @@ def _process_path_or_database(path_or_database):
 
     """
     res = {"path": None, "metadata": None, "fast_logging": False}
-    if isinstance(path_or_database, MetaData):
+    if isinstance(path_or_database, (MetaData, LogBackend)):
         res["metadata"] = path_or_database
     elif isinstance(path_or_database, (Path, str)):
         res["path"] = Path(path_or_database).resolve()
@@ -0,0 +1,144 @@
+"""Serialization of objects that are stored in the log.
+
+Everything that is not a number, string or timestamp is stored as binary blob. By
+default such objects are pickled. :class:`BinaryArrayPickler` stores numeric numpy
+arrays (and dicts of them) as raw bytes instead.
+
+"""
+import io
+import struct
+import warnings
+
+import cloudpickle
+import numpy as np
+import pandas as pd
+from estimagic.exceptions import get_traceback
+
+
+class RobustPickler:
+    @staticmethod
+    def loads(data, fix_imports=True, encoding="ASCII", errors="strict", buffers=None):
+        """Robust pickle loading
+
+        We first try to unpickle the object with pd.read_pickle. This makes no
+        difference for non-pandas objects but makes the de-serialization
+        of pandas objects more robust across pandas versions. If that fails, we use
+        cloudpickle. If that fails, we return None but do not raise an error.
+
+        Arrays that were stored by :class:`BinaryArrayPickler` are recognized and
+        read without unpickling.
+
+        See: https://github.com/pandas-dev/pandas/issues/16474
+
+        """
+        try:
+            res = loads_blob(data)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            res = None
+            tb = get_traceback()
+            warnings.warn(
+                f"Unable to read PickleType column from database:\n{tb}\n "
+                "The entry was replaced by None."
+            )
+
+        return res
+
+    @staticmethod
+    def dumps(obj, protocol=None, *, fix_imports=True, buffer_callback=None):
+        return cloudpickle.dumps(obj, protocol=protocol)
+
+
+class BinaryArrayPickler(RobustPickler):
+    @staticmethod
+    def dumps(obj, protocol=None, *, fix_imports=True, buffer_callback=None):
+        """Store numeric arrays and dicts of them as raw bytes; pickle anything else.
+
+        An array is stored as a header with dtype and shape followed by its data. A
+        dict is stored as its number of entries followed by the length prefixed keys
+        and arrays. All headers start with a zero byte, which is never the first byte
+        of a pickle.
+
+        """
+        if _is_numeric_array(obj):
+            res = _dump_array(obj)
+        elif (
+            isinstance(obj, dict)
+            and obj
+            and all(isinstance(key, str) for key in obj)
+            and all(_is_numeric_array(val) for val in obj.values())
+        ):
+            parts = [_DICT_HEADER, struct.pack("<I", len(obj))]
+            for key, val in obj.items():
+                encoded_key = key.encode("utf-8")
+                encoded_val = _dump_array(val)
+                parts.append(struct.pack("<I", len(encoded_key)) + encoded_key)
+                parts.append(struct.pack("<Q", len(encoded_val)) + encoded_val)
+            res = b"".join(parts)
+        else:
+            res = cloudpickle.dumps(obj, protocol=protocol)
+        return res
+
+
+_ARRAY_HEADER = b"\x00EA1"
+_DICT_HEADER = b"\x00ED1"
+
+
+def _is_numeric_array(obj):
+    return isinstance(obj, np.ndarray) and obj.dtype.kind in "biufc"
+
+
+def _dump_array(arr):
+    dtype = arr.dtype.str.encode("ascii")
+    header = struct.pack(
+        f"<B{len(dtype)}sB{arr.ndim}q", len(dtype), dtype, arr.ndim, *arr.shape
+    )
+    return _ARRAY_HEADER + header + np.ascontiguousarray(arr).tobytes()
+
+
+def _load_array(data):
+    pos = len(_ARRAY_HEADER)
+    (dtype_len,) = struct.unpack_from("<B", data, pos)
+    pos += 1
+    dtype = np.dtype(data[pos : pos + dtype_len].decode("ascii"))
+    pos += dtype_len
+    (ndim,) = struct.unpack_from("<B", data, pos)
+    pos += 1
+    shape = struct.unpack_from(f"<{ndim}q", data, pos)
+    pos += 8 * ndim
+    return np.frombuffer(data, dtype=dtype, offset=pos).reshape(shape).copy()
+
+
+def _load_dict_of_arrays(data):
+    pos = len(_DICT_HEADER)
+    (n_entries,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    res = {}
+    for _ in range(n_entries):
+        (key_len,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        key = data[pos : pos + key_len].decode("utf-8")
+        pos += key_len
+        (val_len,) = struct.unpack_from("<Q", data, pos)
+        pos += 8
+        res[key] = _load_array(data[pos : pos + val_len])
+        pos += val_len
+    return res
+
+
+def loads_blob(data):
+    """Load binary arrays or pickled objects; raise an error if that fails."""
+    data = bytes(data)
+    if data.startswith(_ARRAY_HEADER):
+        res = _load_array(data)
+    elif data.startswith(_DICT_HEADER):
+        res = _load_dict_of_arrays(data)
+    else:
+        try:
+            res = pd.read_pickle(io.BytesIO(data), compression=None)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            res = cloudpickle.loads(data)
+    return res
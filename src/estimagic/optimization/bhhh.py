@@ -15,7 +15,7 @@ def bhhh(
     For details, see :ref:`_own_algorithms`.
     """
     algorithm_info = {
-        "primary_criterion_entry": "root_contributions",
+        "primary_criterion_entry": "contributions",
         "parallelizes": False,
         "needs_scaling": False,
         "name": "bhhh",
@@ -30,7 +30,8 @@ def get_algorithm(
             algorithm. Entries that are not used by the algorithm are ignored with a
             warning.
         logging (bool): Whether the algorithm should do logging.
-        db_kwargs (dict): Dict with the entries "database", "path" and "fast_logging"
+        db_kwargs (dict): Dict with the entries "database", "path", "fast_logging" and
+            "log_queue"
 
     Returns:
         callable: The algorithm.
@@ -105,7 +106,8 @@ def _algorithm_with_logging_template(
         logging (bool): Whether logging is used.
         algorithm (callable): The internal algorithm where all argument except for
             ``x`` and ``criterion_and_derivative`` are already partialled in.
-        db_kwargs (dict): Dict with the entries "database", "path" and "fast_logging"
+        db_kwargs (dict): Dict with the entries "database", "path", "fast_logging" and
+            "log_queue"
 
 
     Returns:
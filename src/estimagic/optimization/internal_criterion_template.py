@@ -2,6 +2,9 @@ import datetime
 import warnings
 
 import numpy as np
+from estimagic.decorators import batch_criterion
+from estimagic.decorators import get_batch_function
+from estimagic.decorators import takes_numpy_params
 from estimagic.differentiation.derivatives import first_derivative
 from estimagic.exceptions import get_traceback
 from estimagic.logging.database_utilities import append_row
@@ -23,6 +26,10 @@ CRITERION_ERROR_MESSAGE = (
 )
 
 
+# key under which the state of Broyden updated Jacobians is stored in the cache
+BROYDEN_CACHE_KEY = "broyden_state"
+
+
 NO_PRIMARY_MESSAGE = (
     "The primary criterion entry of the {} algorithm is {} but the output of your "
     "criterion function only contains the entries:\n{}"
@@ -60,15 +67,23 @@ def internal_criterion_and_derivative_template(
     That is the reason why this function is called a template.
 
     Args:
-        x (np.ndarray): 1d numpy array with internal parameters.
+        x (np.ndarray): 1d numpy array with internal parameters. If task is "criterion"
+            it can also be a 2d numpy array with one internal parameter vector per row.
+            In that case a list with one output per row is returned and batch criteria
+            (see :func:`~estimagic.decorators.batch_criterion`) are evaluated in one
+            vectorized call.
         task (str): One of "criterion", "derivative" and "criterion_and_derivative".
         direction (str): One of "maximize" or "minimize"
         criterion (callable): (partialed) user provided criterion function that takes a
             parameter dataframe as only argument and returns a scalar, an array like
-            object or a dictionary. See :ref:`criterion`.
+            object or a dictionary. See :ref:`criterion`. If it is decorated with
+            :func:`~estimagic.decorators.numpy_params`, it takes a numpy array with
+            the external parameter values instead. The same holds for derivative and
+            criterion_and_derivative.
         params (pd.DataFrame): see :ref:`params`
         reparametrize_from_internal (callable): Function that takes x and returns a
-            numpy array with the values of the external parameters.
+            numpy array with the values of the external parameters. It also accepts
+            2d arrays with one parameter vector per row.
         convert_derivative (callable): Function that takes the derivative of criterion
             at the external version of x and x and returns the derivative
             of the internal criterion.
@@ -92,9 +107,13 @@ def internal_criterion_and_derivative_template(
             the same as the output of derivative.
         numdiff_options (dict): Keyword arguments for the calculation of numerical
             derivatives. See :ref:`first_derivative` for details. Note that the default
-            method is changed to "forward" for speed reasons.
+            method is changed to "forward" for speed reasons. The additional entry
+            "n_broyden_updates" is the maximal number of consecutive Broyden updates
+            of the Jacobian of least-squares criteria before it is recomputed
+            numerically. Default 0.
         logging (bool): Wether logging is used.
-        db_kwargs (dict): Dictionary with entries "database", "path" and "fast_logging".
+        db_kwargs (dict): Dictionary with entries "database", "path", "fast_logging"
+            and "log_queue".
         error_handling (str): Either "raise" or "continue". Note that "continue" does
             not absolutely guarantee that no error is raised but we try to handle as
             many errors as possible in that case without aborting the optimization.
@@ -121,6 +140,29 @@ def internal_criterion_and_derivative_template(
             If task=="criterion_and_derivative" it returns both as a tuple.
 
     """
+    if np.ndim(x) == 2:
+        return _internal_criterion_batch(
+            x,
+            task=task,
+            direction=direction,
+            criterion=criterion,
+            params=params,
+            reparametrize_from_internal=reparametrize_from_internal,
+            convert_derivative=convert_derivative,
+            algorithm_info=algorithm_info,
+            derivative=derivative,
+            criterion_and_derivative=criterion_and_derivative,
+            numdiff_options=numdiff_options,
+            logging=logging,
+            db_kwargs=db_kwargs,
+            error_handling=error_handling,
+            error_penalty=error_penalty,
+            first_criterion_evaluation=first_criterion_evaluation,
+            cache=cache,
+            cache_size=cache_size,
+            fixed_log_data=fixed_log_data,
+        )
+
     if algorithm_info["primary_criterion_entry"] == "root_contributions":
         if direction == "maximize":
             msg = (
@@ -136,31 +178,86 @@ def internal_criterion_and_derivative_template(
 
     caught_exceptions = []
     new_criterion, new_derivative, new_external_derivative = None, None, None
-    current_params = params.copy()
     external_x = reparametrize_from_internal(x)
-    current_params["value"] = external_x
 
     if to_dos == []:
         pass
     elif "numerical_criterion_and_derivative" in to_dos:
 
-        def func(x):
-            external_x = reparametrize_from_internal(x)
-            p = params.copy()
-            p["value"] = external_x
-            return criterion(p)
+        if takes_numpy_params(criterion):
+
+            def func(x):
+                return criterion(reparametrize_from_internal(x))
+
+        else:
+
+            def func(x):
+                p = params.copy()
+                p["value"] = reparametrize_from_internal(x)
+                return criterion(p)
+
+        batch_func = get_batch_function(criterion)
+        if batch_func is not None:
+            func = batch_criterion(
+                func,
+                batch_func=lambda xs: batch_func(
+                    reparametrize_from_internal(np.array(xs))
+                ),
+            )
 
         options = numdiff_options.copy()
-        options["key"] = algorithm_info["primary_criterion_entry"]
+        n_broyden_updates = options.pop("n_broyden_updates", 0)
+        primary = algorithm_info["primary_criterion_entry"]
+        options["key"] = primary
         options["f0"] = cache_entry.get("criterion", None)
         options["return_func_value"] = True
 
+        # Jacobians of least-squares problems can be updated with the steps the
+        # optimizer took instead of being recomputed by finite differences
+        uses_broyden = (
+            n_broyden_updates > 0
+            and not algorithm_info["parallelizes"]
+            and primary in ("contributions", "root_contributions")
+        )
+        broyden_state = cache.get(BROYDEN_CACHE_KEY) if uses_broyden else None
+        # the cache is shared by all local optimizations of a multistart optimization
+        # but the last Jacobian is only a good start for the optimization it belongs to
+        step = fixed_log_data.get("step")
+        if broyden_state is not None and broyden_state["step"] != step:
+            broyden_state = None
+
         try:
-            derivative_dict = first_derivative(func, x, **options)
-            new_derivative = {
-                algorithm_info["primary_criterion_entry"]: derivative_dict["derivative"]
-            }
-            new_criterion = derivative_dict["func_value"]
+            if (
+                broyden_state is not None
+                and broyden_state["n_updates"] < n_broyden_updates
+            ):
+                if options["f0"] is None:
+                    options["f0"] = func(x)
+                f_new = np.asarray(options["f0"][primary], dtype=float)
+                jacobian = _broyden_update(broyden_state, x, f_new)
+                if jacobian is not None:
+                    new_derivative = {primary: jacobian}
+                    new_criterion = options["f0"]
+                    cache[BROYDEN_CACHE_KEY] = {
+                        "x": x.copy(),
+                        "f": f_new,
+                        "jacobian": jacobian,
+                        "n_updates": broyden_state["n_updates"] + 1,
+                        "step": step,
+                    }
+
+            if new_derivative is None:
+                derivative_dict = first_derivative(func, x, **options)
+                new_derivative = {primary: derivative_dict["derivative"]}
+                new_criterion = derivative_dict["func_value"]
+                if uses_broyden:
+                    cache[BROYDEN_CACHE_KEY] = {
+                        "x": x.copy(),
+                        "f": np.asarray(new_criterion[primary], dtype=float),
+                        "jacobian": np.asarray(new_derivative[primary]),
+                        "n_updates": 0,
+                        "step": step,
+                    }
         except (KeyboardInterrupt, SystemExit):
             raise
         except Exception as e:
@@ -171,7 +268,7 @@ def internal_criterion_and_derivative_template(
     elif "criterion_and_derivative" in to_dos:
         try:
             new_criterion, new_external_derivative = criterion_and_derivative(
-                current_params
+                _get_params(criterion_and_derivative, external_x, params)
             )
         except (KeyboardInterrupt, SystemExit):
             raise
@@ -183,7 +280,7 @@ def internal_criterion_and_derivative_template(
     else:
         if "criterion" in to_dos:
             try:
-                new_criterion = criterion(current_params)
+                new_criterion = criterion(_get_params(criterion, external_x, params))
             except (KeyboardInterrupt, SystemExit):
                 raise
             except Exception as e:
@@ -193,7 +290,9 @@ def internal_criterion_and_derivative_template(
 
         if "derivative" in to_dos:
             try:
-                new_external_derivative = derivative(current_params)
+                new_external_derivative = derivative(
+                    _get_params(derivative, external_x, params)
+                )
             except (KeyboardInterrupt, SystemExit):
                 raise
             except Exception as e:
@@ -248,6 +347,74 @@ def internal_criterion_and_derivative_template(
     return res
 
 
+def _get_params(func, external_x, params):
+    """Get the parameters in the format that is expected by func.
+
+    Functions decorated with :func:`~estimagic.decorators.numpy_params` receive the
+    external parameter vector directly, which avoids copying the params DataFrame.
+
+    """
+    if takes_numpy_params(func):
+        out = external_x
+    else:
+        out = params.copy()
+        out["value"] = external_x
+    return out
+
+
+def _internal_criterion_batch(
+    xs, *, task, criterion, reparametrize_from_internal, **kwargs
+):
+    """Evaluate the internal criterion at each row of xs.
+
+    If criterion is a batch criterion, it is evaluated at all rows in one vectorized
+    call and the outputs are passed on to the usual processing (caching, logging,
+    sign switching, ...) of each row. If the vectorized call fails, each row is
+    evaluated separately such that errors are handled as usual.
+
+    """
+    if task != "criterion":
+        raise ValueError("2d parameter arrays are only supported for task 'criterion'")
+
+    kwargs = {
+        "task": task,
+        "reparametrize_from_internal": reparametrize_from_internal,
+        **kwargs,
+    }
+
+    batch_func = get_batch_function(criterion)
+    outputs = None
+    if batch_func is not None:
+        external = reparametrize_from_internal(np.array(xs))
+        try:
+            outputs = list(batch_func(external))
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            pass
+
+    if outputs is None:
+        res = [
+            internal_criterion_and_derivative_template(x, criterion=criterion, **kwargs)
+            for x in xs
+        ]
+    else:
+        res = [
+            internal_criterion_and_derivative_template(
+                x, criterion=_constant_function(out), **kwargs
+            )
+            for x, out in zip(xs, outputs)
+        ]
+    return res
+
+
+def _constant_function(value):
+    def constant(*args, **kwargs):
+        return value
+
+    return constant
+
+
 def _determine_to_dos(task, cache_entry, derivative, criterion_and_derivative):
     """Determine which functions have to be evaluated at the new parameters.
 
@@ -347,11 +514,43 @@ def _penalty_root_contributions_derivative(x, constant, slope, x0, dim_out):
     return np.full((dim_out, len(x)), row)
 
 
+def _broyden_update(state, x, f):
+    """Update the last Jacobian with the secant condition of the step to x.
+
+    This is Broyden's rank-one update J + (y - J s) s' / (s' s) with the step s and
+    the change of the function output y. The update is rejected if the last Jacobian
+    predicted y worse than assuming no change at all, which indicates that the
+    linear model degraded.
+
+    Args:
+        state (dict): Dict with the entries "x", "f" and "jacobian" of the last point
+            at which the Jacobian was calculated or updated.
+        x (np.ndarray): 1d numpy array with the new internal parameters.
+        f (np.ndarray): 1d numpy array with the function output at x.
+
+    Returns:
+        np.ndarray or None: The updated Jacobian or None if the update was rejected.
+
+    """
+    step = x - state["x"]
+    change = f - state["f"]
+    residual = change - state["jacobian"] @ step
+
+    step_norm = step @ step
+    if step_norm == 0 or not np.isfinite(residual).all():
+        return None
+    if np.linalg.norm(residual) > np.linalg.norm(change):
+        return None
+
+    return state["jacobian"] + np.outer(residual, step) / step_norm
+
+
 def _cache_new_evaluations(new_criterion, new_derivative, x_hash, cache, cache_size):
     cache_entry = cache.get(x_hash, {}).copy()
-    if len(cache) >= cache_size:
+    evaluation_keys = [key for key in cache if key != BROYDEN_CACHE_KEY]
+    if len(evaluation_keys) >= cache_size:
         # list(dict) returns keys in insertion order: https://tinyurl.com/o464nrz
-        oldest_entry = list(cache)[0]
+        oldest_entry = evaluation_keys[0]
         del cache[oldest_entry]
     if new_criterion is not None:
         cache_entry["criterion"] = new_criterion
@@ -117,9 +117,14 @@ def neldermead_parallel(
         )
 
     # calculate criterion values for the initial simplex
-    f_s = np.array(batch_evaluator(func=criterion, arguments=s, n_cores=n_cores))[
-        :, None
-    ]
+    f_s = np.array(
+        batch_evaluators.evaluate_batch(
+            func=criterion,
+            arguments=s,
+            batch_evaluator=batch_evaluator,
+            n_cores=n_cores,
+        )
+    )[:, None]
 
     # parallelized function
     def func_parallel(args):
@@ -244,9 +249,10 @@ def neldermead_parallel(
             # and remaining points
             # evaluate function at new simplex
             f_s = np.array(
-                batch_evaluator(
+                batch_evaluators.evaluate_batch(
                     func=criterion,
                     arguments=s,
+                    batch_evaluator=batch_evaluator,
                     n_cores=n_cores,
                 )
             )[:, None]
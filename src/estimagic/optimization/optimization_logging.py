@@ -12,7 +12,8 @@ def log_scheduled_steps_and_get_ids(steps, logging, db_kwargs):
     Args:
         steps (list): List of dicts with entries for the steps table.
         logging (bool): Whether to actually write to the databes.
-        db_kwargs (dict): Dict with the entries "database", "path" and "fast_logging"
+        db_kwargs (dict): Dict with the entries "database", "path", "fast_logging" and
+            "log_queue"
 
     Returns:
         list: List of integers with the step ids.
@@ -33,7 +34,9 @@ def log_scheduled_steps_and_get_ids(steps, logging, db_kwargs):
             table_name="steps",
             n_rows=len(steps),
             return_type="dict_of_lists",
-            **db_kwargs,
+            database=db_kwargs["database"],
+            path=db_kwargs["path"],
+            fast_logging=db_kwargs["fast_logging"],
         )["rowid"]
     else:
         step_ids = list(range(len(steps)))
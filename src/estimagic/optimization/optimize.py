@@ -1,4 +1,6 @@
+import contextlib
 import functools
+import shutil
 import warnings
 from pathlib import Path
 
@@ -7,7 +9,12 @@ import pandas as pd
 from estimagic import batch_evaluators as be
 from estimagic.config import CRITERION_PENALTY_CONSTANT
 from estimagic.config import CRITERION_PENALTY_SLOPE
+from estimagic.decorators import batch_criterion
+from estimagic.decorators import get_batch_function
+from estimagic.decorators import takes_numpy_params
 from estimagic.logging.database_utilities import append_row
+from estimagic.logging.database_utilities import buffered_logging
+from estimagic.logging.database_utilities import flush_database
 from estimagic.logging.database_utilities import load_database
 from estimagic.logging.database_utilities import make_optimization_iteration_table
 from estimagic.logging.database_utilities import make_optimization_problem_table
@@ -94,9 +101,18 @@ def maximize(
             criterion and derivative.
         numdiff_options (dict): Keyword arguments for the calculation of numerical
             derivatives. See :ref:`first_derivative` for details. Note that the default
-            method is changed to "forward" for speed reasons.
+            method is changed to "forward" for speed reasons. For optimizers that
+            exploit a least-squares structure, the additional entry
+            "n_broyden_updates" (int) allows to update the last numerical Jacobian
+            with Broyden's rank-one formula from the steps the optimizer took. This
+            needs one criterion evaluation per new point instead of one per parameter.
+            The Jacobian is recomputed numerically after n_broyden_updates consecutive
+            updates or if the update degrades. Default 0, i.e. no updates.
         logging (pathlib.Path, str or False): Path to sqlite3 file (which typically has
             the file extension ``.db``. If the file does not exist, it will be created.
+            If the path has the extension ``.arrow``, the log is stored in an
+            append-only directory of Arrow files instead, which is faster for very
+            many evaluations and requires pyarrow.
             When doing parallel optimizations and logging is provided, you have to
             provide a different path for each optimization you are running. You can
             disable logging completely by setting it to False, but we highly recommend
@@ -113,6 +129,19 @@ def maximize(
             do if the tables we want to write to already exist. Default "extend".
             - "if_database_exists": (str): One of "extend", "replace", "raise". What to
             do if the database we want to write to already exists. Default "extend".
+            - "buffered_logging": A boolean that determines if writes to the database
+            are done in a background thread. Rows are then written in bulk every
+            "buffer_size" rows (default 1000) or "buffer_interval" seconds (default
+            0.1), which removes most of the logging overhead for fast criterion
+            functions. All rows are written before the optimization returns or
+            raises. If n_cores is larger than one in the numdiff_options,
+            algo_options or multistart_options, worker processes send their rows to
+            this background thread, which is then the only writer of the database.
+            Default False.
+            - "array_storage": (str): One of "pickle" and "binary". With "binary",
+            parameter vectors, derivatives and other numeric arrays are stored as raw
+            bytes instead of pickles, which makes the database faster to read for
+            problems with many parameters. Default "pickle".
         error_handling (str): Either "raise" or "continue". Note that "continue" does
             not absolutely guarantee that no error is raised but we try to handle as
             many errors as possible in that case without aborting the optimization.
@@ -183,6 +212,18 @@ def maximize(
             discarded from the sample.
             - optimization_error_handling (str): One of "raise" or "continue". Default
             is continue, which means that failed optimizations are simply discarded.
+            - scheduling (str): One of "synchronous" or "asynchronous". With
+            "synchronous" scheduling, local optimizations are run in batches of
+            ``batch_size`` and all starting points of a batch are calculated from the
+            same currently best point. With "asynchronous" scheduling, a new local
+            optimization is started in a separate process as soon as one of
+            ``n_cores`` workers becomes idle, using the best point known at that time,
+            and the convergence state is updated after each finished optimization. In
+            that case ``batch_size`` is ignored and the local optimizations are run
+            in a ``concurrent.futures.ProcessPoolExecutor`` instead of the
+            ``batch_evaluator``, which is only used for the exploration stage. A
+            warning is raised if ``batch_evaluator`` is specified together with
+            asynchronous scheduling. Default "synchronous".
 
     """
     return _optimize(
@@ -270,9 +311,18 @@ def minimize(
             criterion and derivative.
         numdiff_options (dict): Keyword arguments for the calculation of numerical
             derivatives. See :ref:`first_derivative` for details. Note that the default
-            method is changed to "forward" for speed reasons.
+            method is changed to "forward" for speed reasons. For optimizers that
+            exploit a least-squares structure, the additional entry
+            "n_broyden_updates" (int) allows to update the last numerical Jacobian
+            with Broyden's rank-one formula from the steps the optimizer took. This
+            needs one criterion evaluation per new point instead of one per parameter.
+            The Jacobian is recomputed numerically after n_broyden_updates consecutive
+            updates or if the update degrades. Default 0, i.e. no updates.
         logging (pathlib.Path, str or False): Path to sqlite3 file (which typically has
             the file extension ``.db``. If the file does not exist, it will be created.
+            If the path has the extension ``.arrow``, the log is stored in an
+            append-only directory of Arrow files instead, which is faster for very
+            many evaluations and requires pyarrow.
             When doing parallel optimizations and logging is provided, you have to
             provide a different path for each optimization you are running. You can
             disable logging completely by setting it to False, but we highly recommend
@@ -289,6 +339,19 @@ def minimize(
             do if the tables we want to write to already exist. Default "extend".
             - "if_database_exists": (str): One of "extend", "replace", "raise". What to
             do if the database we want to write to already exists. Default "extend".
+            - "buffered_logging": A boolean that determines if writes to the database
+            are done in a background thread. Rows are then written in bulk every
+            "buffer_size" rows (default 1000) or "buffer_interval" seconds (default
+            0.1), which removes most of the logging overhead for fast criterion
+            functions. All rows are written before the optimization returns or
+            raises. If n_cores is larger than one in the numdiff_options,
+            algo_options or multistart_options, worker processes send their rows to
+            this background thread, which is then the only writer of the database.
+            Default False.
+            - "array_storage": (str): One of "pickle" and "binary". With "binary",
+            parameter vectors, derivatives and other numeric arrays are stored as raw
+            bytes instead of pickles, which makes the database faster to read for
+            problems with many parameters. Default "pickle".
         error_handling (str): Either "raise" or "continue". Note that "continue" does
             not absolutely guarantee that no error is raised but we try to handle as
             many errors as possible in that case without aborting the optimization.
@@ -359,6 +422,18 @@ def minimize(
             discarded from the sample.
             - optimization_error_handling (str): One of "raise" or "continue". Default
             is continue, which means that failed optimizations are simply discarded.
+            - scheduling (str): One of "synchronous" or "asynchronous". With
+            "synchronous" scheduling, local optimizations are run in batches of
+            ``batch_size`` and all starting points of a batch are calculated from the
+            same currently best point. With "asynchronous" scheduling, a new local
+            optimization is started in a separate process as soon as one of
+            ``n_cores`` workers becomes idle, using the best point known at that time,
+            and the convergence state is updated after each finished optimization. In
+            that case ``batch_size`` is ignored and the local optimizations are run
+            in a ``concurrent.futures.ProcessPoolExecutor`` instead of the
+            ``batch_evaluator``, which is only used for the exploration stage. A
+            warning is raised if ``batch_evaluator`` is specified together with
+            asynchronous scheduling. Default "synchronous".
 
     """
     return _optimize(
@@ -566,7 +641,9 @@ def _optimize(
     first_eval = {
         "internal_params": x,
         "external_params": params,
-        "output": criterion(params),
+        "output": criterion(
+            params["value"].to_numpy() if takes_numpy_params(criterion) else params
+        ),
     }
 
     # fill numdiff_options with defaults
@@ -583,9 +660,21 @@ def _optimize(
             "database": database,
             "path": logging,
             "fast_logging": log_options.get("fast_logging", False),
+            "log_queue": None,
         }
     else:
-        db_kwargs = {"database": None, "path": None, "fast_logging": False}
+        db_kwargs = {
+            "database": None,
+            "path": None,
+            "fast_logging": False,
+            "log_queue": None,
+        }
+
+    # all batch evaluations share one pool of worker processes if "pool" is requested
+    pool = be.PoolBatchEvaluator()
+    numdiff_options = _replace_pool_batch_evaluator(numdiff_options, pool)
+    algo_options = _replace_pool_batch_evaluator(algo_options, pool)
+    multistart_options = _replace_pool_batch_evaluator(multistart_options, pool)
 
     # get the algorithm
     internal_algorithm = get_algorithm(
@@ -628,45 +717,80 @@ def _optimize(
         **always_partialled,
     )
 
-    # do actual optimizations
-    if not multistart:
-
-        steps = [{"type": "optimization", "name": "optimization"}]
-
-        step_ids = log_scheduled_steps_and_get_ids(
-            steps=steps,
-            logging=logging,
-            db_kwargs=db_kwargs,
-        )
-        internal_criterion_and_derivative = functools.partial(
+    # the internal criterion can evaluate 2d arrays of parameters in one call
+    if get_batch_function(criterion) is not None:
+        internal_criterion_and_derivative = batch_criterion(
             internal_criterion_and_derivative,
-            error_handling=error_handling,
-            error_penalty=error_penalty,
+            batch_func=internal_criterion_and_derivative,
         )
-        raw_res = internal_algorithm(internal_criterion_and_derivative, x, step_ids[0])
-    else:
-
-        lower, upper = get_internal_sampling_bounds(params, constraints)
 
-        multistart_options = _fill_multistart_options_with_defaults(
-            options=multistart_options,
-            params=params,
-            x=x,
-            params_to_internal=params_to_internal,
+    # buffer writes to the database in a background thread if requested
+    if logging and log_options.get("buffered_logging", False):
+        log_context = buffered_logging(
+            database=db_kwargs["database"],
+            path=db_kwargs["path"],
+            fast_logging=db_kwargs["fast_logging"],
+            buffer_size=log_options.get("buffer_size", 1000),
+            interval=log_options.get("buffer_interval", 0.1),
+            collect_from_workers=_uses_worker_processes(
+                numdiff_options, algo_options, multistart_options, multistart
+            ),
         )
+    else:
+        log_context = contextlib.nullcontext()
 
-        raw_res = run_multistart_optimization(
-            local_algorithm=internal_algorithm,
-            criterion_and_derivative=internal_criterion_and_derivative,
-            x=x,
-            lower_bounds=lower,
-            upper_bounds=upper,
-            options=multistart_options,
-            logging=logging,
-            db_kwargs=db_kwargs,
-            error_handling=error_handling,
-            error_penalty=error_penalty,
-        )
+    # do actual optimizations
+    try:
+        with log_context as log_writer:
+            # worker processes send their rows to the writer in this process. Since
+            # db_kwargs is shared by all partialled functions, they all see the queue.
+            if log_writer is not None:
+                db_kwargs["log_queue"] = log_writer.log_queue
+
+            if not multistart:
+
+                steps = [{"type": "optimization", "name": "optimization"}]
+
+                step_ids = log_scheduled_steps_and_get_ids(
+                    steps=steps,
+                    logging=logging,
+                    db_kwargs=db_kwargs,
+                )
+                internal_criterion_and_derivative = functools.partial(
+                    internal_criterion_and_derivative,
+                    error_handling=error_handling,
+                    error_penalty=error_penalty,
+                )
+                raw_res = internal_algorithm(
+                    internal_criterion_and_derivative, x, step_ids[0]
+                )
+            else:
+
+                lower, upper = get_internal_sampling_bounds(params, constraints)
+
+                multistart_options = _fill_multistart_options_with_defaults(
+                    options=multistart_options,
+                    params=params,
+                    x=x,
+                    params_to_internal=params_to_internal,
+                )
+
+                raw_res = run_multistart_optimization(
+                    local_algorithm=internal_algorithm,
+                    criterion_and_derivative=internal_criterion_and_derivative,
+                    x=x,
+                    lower_bounds=lower,
+                    upper_bounds=upper,
+                    options=multistart_options,
+                    logging=logging,
+                    db_kwargs=db_kwargs,
+                    error_handling=error_handling,
+                    error_penalty=error_penalty,
+                )
+    finally:
+        pool.close()
+        if logging:
+            flush_database(db_kwargs["database"])
 
     res = process_internal_optimizer_result(
         raw_res,
@@ -677,6 +801,16 @@ def _optimize(
     return res
 
 
+def _uses_worker_processes(
+    numdiff_options, algo_options, multistart_options, multistart
+):
+    """Check if criterion evaluations might be logged from worker processes."""
+    candidates = [numdiff_options, algo_options]
+    if multistart:
+        candidates.append(multistart_options)
+    return any(options.get("n_cores", 1) > 1 for options in candidates)
+
+
 def _fill_error_penalty_with_defaults(error_penalty, first_eval, direction):
     error_penalty = error_penalty.copy()
     first_value = first_eval["output"]
@@ -716,7 +850,10 @@ def _create_and_initialize_database(logging, log_options, first_eval, problem_da
                 "'if_database_exists' is set to 'raise'"
             )
         elif if_database_exists == "replace":
-            logging.unlink()
+            if logging.is_dir():
+                shutil.rmtree(logging)
+            else:
+                logging.unlink()
 
     database = load_database(path=path, fast_logging=fast_logging)
 
@@ -725,6 +862,7 @@ def _create_and_initialize_database(logging, log_options, first_eval, problem_da
         database=database,
         first_eval=first_eval,
         if_exists=if_table_exists,
+        array_storage=log_options.get("array_storage", "pickle"),
     )
 
     # create and initialize the steps table; This is alway extended if it exists.
@@ -764,6 +902,8 @@ def _fill_numdiff_options_with_defaults(numdiff_options, lower_bounds, upper_bou
         "upper_bounds",
         "step_ratio",
         "min_steps",
+        "richardson_tol",
+        "n_broyden_updates",
         "n_cores",
         "error_handling",
         "batch_evaluator",
@@ -794,6 +934,13 @@ def _fill_numdiff_options_with_defaults(numdiff_options, lower_bounds, upper_bou
     return numdiff_options
 
 
+def _replace_pool_batch_evaluator(options, pool):
+    """Replace the batch_evaluator "pool" in an option dictionary by pool."""
+    if options.get("batch_evaluator") in ("pool", "pool_batch_evaluator"):
+        options = {**options, "batch_evaluator": pool}
+    return options
+
+
 def _add_name_and_group_columns_to_params(params):
     """Add a group and name column to the params.
 
@@ -848,6 +995,7 @@ def _fill_multistart_options_with_defaults(options, params, x, params_to_interna
         "seed": None,
         "exploration_error_handling": "continue",
         "optimization_error_handling": "continue",
+        "scheduling": "synchronous",
     }
 
     options = {k.replace(".", "_"): v for k, v in options.items()}
@@ -864,6 +1012,19 @@ def _fill_multistart_options_with_defaults(options, params, x, params_to_interna
             be, f"{out['batch_evaluator']}_batch_evaluator"
         )
 
+    if out["scheduling"] not in ("synchronous", "asynchronous"):
+        raise ValueError(
+            "scheduling must be 'synchronous' or 'asynchronous', not "
+            f"{out['scheduling']}."
+        )
+
+    if out["scheduling"] == "asynchronous" and "batch_evaluator" in options:
+        warnings.warn(
+            "The multistart option 'batch_evaluator' is only used for the "
+            "exploration stage if scheduling is 'asynchronous'. The local "
+            "optimizations are run in a ProcessPoolExecutor with n_cores workers."
+        )
+
     if isinstance(out["mixing_weight_method"], str):
         out["mixing_weight_method"] = WEIGHT_FUNCTIONS[out["mixing_weight_method"]]
 
@@ -896,6 +1057,6 @@ def process_multistart_sample(raw_sample, params, params_to_internal):
             )
         sample = raw_sample
 
-    sample = np.array([params_to_internal(x) for x in sample])
+    sample = params_to_internal(np.asarray(sample, dtype=float))
 
     return sample
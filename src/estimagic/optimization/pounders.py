@@ -174,6 +174,8 @@ def internal_solve_pounders(
             - "trust-constr" (default)
             - "L-BFGS-B"
             - "SLSQP"
+            - "gpcg", a gradient projection conjugate gradient method that uses
+              the exact square terms of the main model.
         ftol_sub (float): Tolerance for f, the criterion function value.
             Stopping criterion for the subproblem.
         xtol_sub (float): Tolerance for solution vector x.
@@ -218,7 +220,9 @@ def internal_solve_pounders(
         x1[i] += delta
         xs.append(x1)
 
-    residuals = batch_evaluator(criterion, arguments=xs, n_cores=n_cores)
+    residuals = be.evaluate_batch(
+        criterion, arguments=xs, batch_evaluator=batch_evaluator, n_cores=n_cores
+    )
 
     history.add_entries(xs, residuals)
     accepted_index = history.get_best_index()
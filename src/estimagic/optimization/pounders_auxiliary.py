@@ -3,8 +3,10 @@ from functools import partial
 
 import numpy as np
 from scipy.linalg import qr_multiply
+from scipy.linalg import solve_triangular
 from scipy.optimize import Bounds
 from scipy.optimize import minimize
+from scipy.optimize import OptimizeResult
 
 
 def update_initial_residual_model(
@@ -186,6 +188,8 @@ def solve_subproblem(
             - "trust-constr"
             - "L-BFGS-B"
             - "SLSQP"
+            Moreover, "gpcg" is a gradient projection conjugate gradient method that
+            uses the exact square terms of the main model.
         lower_bounds (np.ndarray): Lower bounds for the subproblem.
             Must have same length as the initial guess of the
             parameter vector. Equal to -1 if not provided by the user.
@@ -221,34 +225,45 @@ def solve_subproblem(
     if np.max(x0 - upper_bounds) > 1e-10:
         raise ValueError("Initial guess > upper bounds in subproblem.")
 
-    bounds = Bounds(lower_bounds, upper_bounds)
-
-    if solver == "trust-constr":
-        solver_args = {"hess": "2-point"}
-        options = {"xtol": xtol, "gtol": gtol}
-    elif solver == "L-BFGS-B":
-        solver_args = {}
-        options = {"ftol": ftol, "gtol": gtol}
-    elif solver == "SLSQP":
-        solver_args = {}
-        options = {"ftol": ftol}
+    if solver == "gpcg":
+        rslt = _minimize_bounded_quadratic_gpcg(
+            x0=x0,
+            lower_bounds=lower_bounds,
+            upper_bounds=upper_bounds,
+            ftol=ftol,
+            xtol=xtol,
+            gtol=gtol,
+            **main_model,
+        )
     else:
-        raise ValueError("Subproblem solver is not supported.")
-
-    evaluate_main_model = partial(
-        _evaluate_main_model,
-        **main_model,
-    )
+        bounds = Bounds(lower_bounds, upper_bounds)
+
+        if solver == "trust-constr":
+            solver_args = {"hess": "2-point"}
+            options = {"xtol": xtol, "gtol": gtol}
+        elif solver == "L-BFGS-B":
+            solver_args = {}
+            options = {"ftol": ftol, "gtol": gtol}
+        elif solver == "SLSQP":
+            solver_args = {}
+            options = {"ftol": ftol}
+        else:
+            raise ValueError("Subproblem solver is not supported.")
+
+        evaluate_main_model = partial(
+            _evaluate_main_model,
+            **main_model,
+        )
 
-    rslt = minimize(
-        evaluate_main_model,
-        x0,
-        method=solver,
-        jac=True,
-        bounds=bounds,
-        **solver_args,
-        options=options,
-    )
+        rslt = minimize(
+            evaluate_main_model,
+            x0,
+            method=solver,
+            jac=True,
+            bounds=bounds,
+            **solver_args,
+            options=options,
+        )
 
     # Test bounds post-solution
     if np.max(lower_bounds - rslt.x) > 1e-5:
@@ -453,67 +468,85 @@ def get_interpolation_matrices_residual_model(
         - n_modelpoints (int): Current number of model points.
     """
     n = x_accepted.shape[0]
+    n_quadratic = n * (n + 1) // 2
 
     x_sample_monomial_basis = np.zeros((n_maxinterp, n + 1))
     x_sample_monomial_basis[:, 0] = 1
-    monomial_basis = np.zeros((n_maxinterp, int(n * (n + 1) / 2)))
+    monomial_basis = np.zeros((n_maxinterp, n_quadratic))
 
     center_info = {"x": x_accepted, "radius": delta}
+    centered_xs = history.get_centered_xs(center_info)
     for i in range(n + 1):
-        x_sample_monomial_basis[i, 1:] = history.get_centered_xs(
-            center_info, index=model_indices[i]
-        )
+        x_sample_monomial_basis[i, 1:] = centered_xs[model_indices[i]]
         monomial_basis[i, :] = _get_monomial_basis(x_sample_monomial_basis[i, 1:])
 
+    # A point is accepted if the smallest singular value of the monomial basis,
+    # projected onto the null space of the linear part of the sample, exceeds theta2.
+    # Each accepted point adds one orthonormal null space direction and thus one row
+    # to the projected basis. Instead of factorizing the projected basis for each
+    # candidate, we update the Cholesky factors of the Gram matrix of the linear part
+    # and of the shifted Gram matrix of the projected basis by one row.
+    linear_factor = np.linalg.qr(x_sample_monomial_basis[: n + 1], mode="r")
+    n_max_projected = n_maxinterp - n - 1
+    projected_basis = np.zeros((n_max_projected, n_quadratic))
+    projected_factor = np.zeros((n_max_projected, n_max_projected))
+
+    in_model = set(model_indices[: n + 1].tolist())
+    candidate_norms = np.linalg.norm(centered_xs, axis=1)
+
     # Now we add points until we have n_maxinterp starting with the most recent ones
     point = history.get_n_fun() - 1
     n_modelpoints = n + 1
 
     while (n_modelpoints < n_maxinterp) and (point >= 0):
-        reject = False
-
-        # Reject any points already in the model
-        for i in range(n + 1):
-            if point == model_indices[i]:
-                reject = True
-                break
-
-        if reject is False:
-            candidate_x = history.get_centered_xs(center_info, index=point)
-            candidate_norm = np.linalg.norm(candidate_x)
-
-            if candidate_norm > c2:
-                reject = True
-
-        if reject is True:
+        # Reject any points already in the model or too far away
+        if point in in_model or candidate_norms[point] > c2:
             point -= 1
             continue
 
-        x_sample_monomial_basis[n_modelpoints, 1:] = history.get_centered_xs(
-            center_info, index=point
-        )
-        monomial_basis[n_modelpoints, :] = _get_monomial_basis(
-            x_sample_monomial_basis[n_modelpoints, 1:]
-        )
+        x_sample_monomial_basis[n_modelpoints, 1:] = centered_xs[point]
+        monomial_basis[n_modelpoints, :] = _get_monomial_basis(centered_xs[point])
 
-        x_sample_full_with_zeros = np.zeros((n_maxinterp, n_maxinterp))
-        x_sample_full_with_zeros[:n_maxinterp, : n + 1] = x_sample_monomial_basis
+        null_space_direction = _get_new_null_space_direction(
+            x_sample_monomial_basis[: n_modelpoints + 1], linear_factor
+        )
+        new_row = null_space_direction @ monomial_basis[: n_modelpoints + 1]
 
-        lower_triangular_temporary, _ = qr_multiply(
-            x_sample_full_with_zeros[: n_modelpoints + 1, :],
-            monomial_basis.T[: int(n * (n + 1) / 2), : n_modelpoints + 1],
+        n_projected = n_modelpoints - n - 1
+        border = solve_triangular(
+            projected_factor[:n_projected, :n_projected],
+            projected_basis[:n_projected] @ new_row,
+            lower=True,
         )
-        beta = np.linalg.svd(lower_triangular_temporary.T[n + 1 :], compute_uv=False)
+        pivot = new_row @ new_row - theta2**2 - border @ border
 
-        if beta[min(n_modelpoints - n, int(n * (n + 1) / 2)) - 1] > theta2:
+        if pivot > 0:
             # Accept point
             model_indices[n_modelpoints] = point
-            lower_triangular = lower_triangular_temporary
+            projected_basis[n_projected] = new_row
+            projected_factor[n_projected, :n_projected] = border
+            projected_factor[n_projected, n_projected] = np.sqrt(pivot)
+            linear_factor = np.linalg.qr(
+                np.vstack([linear_factor, x_sample_monomial_basis[n_modelpoints]]),
+                mode="r",
+            )
 
             n_modelpoints += 1
 
         point -= 1
 
+    x_sample_full_with_zeros = np.zeros((n_maxinterp, n_maxinterp))
+    x_sample_full_with_zeros[:n_maxinterp, : n + 1] = x_sample_monomial_basis
+
+    if n_modelpoints == (n + 1):
+        lower_triangular = np.zeros((n_maxinterp, n_quadratic))
+        lower_triangular[:n, :n] = np.eye(n)
+    else:
+        lower_triangular, _ = qr_multiply(
+            x_sample_full_with_zeros[:n_modelpoints, :],
+            monomial_basis.T[:, :n_modelpoints],
+        )
+
     # Orthogonal basis for the null space of M, where M is the
     # sample of xs forming the monomial basis
     basis_null_space, _ = qr_multiply(
@@ -522,10 +555,6 @@ def get_interpolation_matrices_residual_model(
     )
     basis_null_space = basis_null_space[:, n + 1 : n_modelpoints]
 
-    if n_modelpoints == (n + 1):
-        lower_triangular = np.zeros((n_maxinterp, int(n * (n + 1) / 2)))
-        lower_triangular[:n, :n] = np.eye(n)
-
     return (
         x_sample_monomial_basis,
         monomial_basis,
@@ -535,6 +564,31 @@ def get_interpolation_matrices_residual_model(
     )
 
 
+def _get_new_null_space_direction(x_sample, linear_factor):
+    """Get the null space direction that is added by the last point of the sample.
+
+    The direction is orthogonal to the null space of the transposed sample without
+    its last point (padded with a zero), such that both together form an
+    orthonormal basis for the null space of the transposed sample.
+
+    Args:
+        x_sample (np.ndarray): The linear part of the sample, i.e. a column of ones
+            and the centered xs. Shape (n_points, n + 1).
+        linear_factor (np.ndarray): Upper triangular factor of the QR decomposition
+            of all but the last row of x_sample. Shape (n + 1, n + 1).
+
+    Returns:
+        np.ndarray: Direction of shape (n_points,).
+
+    """
+    coefficients = solve_triangular(
+        linear_factor,
+        solve_triangular(linear_factor, x_sample[-1], trans="T"),
+    )
+    direction = np.append(-x_sample[:-1] @ coefficients, 1)
+    return direction / np.linalg.norm(direction)
+
+
 def interpolate_f(
     history,
     interpolation_set,
@@ -708,15 +762,179 @@ def _get_monomial_basis(x):
         (np.ndarray): Monomial basis of x wof shape (n * (n + 1) / 2,).
     """
     n = x.shape[0]
-    monomial_basis = np.zeros(int(n * (n + 1) / 2))
+    rows, cols = np.triu_indices(n)
+    monomial_basis = x[rows] * x[cols] / np.sqrt(2)
+    monomial_basis[rows == cols] = 0.5 * x**2
 
-    j = 0
-    for i in range(n):
-        monomial_basis[j] = 0.5 * x[i] ** 2
-        j += 1
+    return monomial_basis
 
-        for k in range(i + 1, n):
-            monomial_basis[j] = x[i] * x[k] / np.sqrt(2)
-            j += 1
 
-    return monomial_basis
+def _minimize_bounded_quadratic_gpcg(
+    x0,
+    linear_terms,
+    square_terms,
+    lower_bounds,
+    upper_bounds,
+    ftol,
+    xtol,
+    gtol,
+):
+    """Minimize a quadratic function on a box.
+
+    This is the gradient projection conjugate gradient method of Moré and Toraldo
+    (1991). Each iteration makes a projected gradient step to identify the active
+    bounds. Afterwards, the quadratic is minimized on the face of the box that contains
+    the current point with conjugate gradients on the exact square terms. Both steps
+    are followed by a projected search along the path that is bent into the box.
+
+    The square terms do not have to be positive definite. Directions of negative
+    curvature are followed until the projected search stops at the bounds.
+
+    Args:
+        x0 (np.ndarray): Feasible start vector of shape (n,).
+        linear_terms (np.ndarray): Linear terms of the quadratic of shape (n,).
+        square_terms (np.ndarray): Square terms of the quadratic of shape (n, n).
+        lower_bounds (np.ndarray): Finite lower bounds of shape (n,).
+        upper_bounds (np.ndarray): Finite upper bounds of shape (n,).
+        ftol (float): Stop if the relative decrease of the criterion is below ftol.
+        xtol (float): Stop if the norm of the step is below xtol.
+        gtol (float): Stop if the norm of the projected gradient is below gtol.
+
+    Returns:
+        scipy.optimize.OptimizeResult: Result with the entries "x", "fun", "jac",
+            "nit" and "success".
+
+    """
+    n = x0.shape[0]
+    evaluate = partial(
+        _evaluate_main_model, linear_terms=linear_terms, square_terms=square_terms
+    )
+
+    x = np.clip(x0, lower_bounds, upper_bounds)
+    criterion, gradient = evaluate(x)
+    success = False
+
+    for niter in range(1, 10 * n + 1):
+        projected_gradient = x - np.clip(x - gradient, lower_bounds, upper_bounds)
+        if np.linalg.norm(projected_gradient) <= gtol:
+            success = True
+            break
+
+        x_new = _projected_search(
+            x=x,
+            direction=-gradient,
+            gradient=gradient,
+            criterion=criterion,
+            evaluate=evaluate,
+            square_terms=square_terms,
+            lower_bounds=lower_bounds,
+            upper_bounds=upper_bounds,
+        )
+        criterion_new, gradient_new = evaluate(x_new)
+
+        free = ~(
+            ((x_new <= lower_bounds) & (gradient_new > 0))
+            | ((x_new >= upper_bounds) & (gradient_new < 0))
+        )
+        if free.any():
+            direction = np.zeros(n)
+            direction[free] = _truncated_conjugate_gradient(
+                square_terms[free][:, free], gradient_new[free], gtol
+            )
+            x_new = _projected_search(
+                x=x_new,
+                direction=direction,
+                gradient=gradient_new,
+                criterion=criterion_new,
+                evaluate=evaluate,
+                square_terms=square_terms,
+                lower_bounds=lower_bounds,
+                upper_bounds=upper_bounds,
+            )
+            criterion_new, gradient_new = evaluate(x_new)
+
+        decrease = criterion - criterion_new
+        step_norm = np.linalg.norm(x_new - x)
+        x, criterion, gradient = x_new, criterion_new, gradient_new
+
+        if decrease <= ftol * max(abs(criterion), 1) or step_norm <= xtol:
+            success = True
+            break
+
+    return OptimizeResult(x=x, fun=criterion, jac=gradient, nit=niter, success=success)
+
+
+def _projected_search(
+    x,
+    direction,
+    gradient,
+    criterion,
+    evaluate,
+    square_terms,
+    lower_bounds,
+    upper_bounds,
+):
+    """Backtrack along the projection of x + alpha * direction onto the box.
+
+    The first trial step minimizes the quadratic along the unprojected direction or
+    goes to the last bound that is hit along the direction if the curvature is not
+    positive. The step is halved until the sufficient decrease condition holds.
+
+    Returns:
+        np.ndarray: The new point or x if no decrease was found.
+
+    """
+    slope = gradient @ direction
+    if slope >= 0:
+        return x
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        breakpoints = np.where(
+            direction > 0,
+            (upper_bounds - x) / direction,
+            np.where(direction < 0, (lower_bounds - x) / direction, 0),
+        )
+    alpha_max = breakpoints.max()
+
+    curvature = direction @ square_terms @ direction
+    alpha = min(-slope / curvature, alpha_max) if curvature > 0 else alpha_max
+
+    for _ in range(50):
+        x_new = np.clip(x + alpha * direction, lower_bounds, upper_bounds)
+        criterion_new, _ = evaluate(x_new)
+        if criterion_new <= criterion + 1e-4 * gradient @ (x_new - x):
+            return x_new
+        alpha /= 2
+
+    return x
+
+
+def _truncated_conjugate_gradient(square_terms, gradient, gtol):
+    """Minimize gradient @ d + 0.5 * d @ square_terms @ d with conjugate gradients.
+
+    Iterations stop at a direction of non-positive curvature. Then the steepest
+    descent direction is returned if no step was made yet and the current iterate
+    otherwise.
+
+    """
+    direction = np.zeros_like(gradient)
+    residual = gradient.copy()
+    conjugate = -residual
+
+    for _ in range(len(gradient)):
+        if np.linalg.norm(residual) <= gtol:
+            break
+        hessian_conjugate = square_terms @ conjugate
+        curvature = conjugate @ hessian_conjugate
+        if curvature <= 0:
+            if not direction.any():
+                direction = conjugate
+            break
+        alpha = residual @ residual / curvature
+        direction = direction + alpha * conjugate
+        residual_new = residual + alpha * hessian_conjugate
+        beta = residual_new @ residual_new / (residual @ residual)
+        conjugate = -residual_new + beta * conjugate
+        residual = residual_new
+
+    return direction
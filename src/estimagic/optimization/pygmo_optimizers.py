@@ -1202,9 +1202,10 @@ def _create_problem(func, bounds, gradient_, dim, batch_evaluator, n_cores):
 
         def batch_fitness(self, dvs):
             dv_list = dvs.reshape(-1, dim)
-            eval_list = batch_evaluator(
+            eval_list = batch_evaluators.evaluate_batch(
                 func=func,
                 arguments=dv_list,
+                batch_evaluator=batch_evaluator,
                 n_cores=n_cores,
                 # Error handling is done on a higher level
                 error_handling="raise",
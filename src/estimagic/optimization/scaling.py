@@ -10,6 +10,7 @@ from internal: internal * scaling_factor + scaling_offset
 
 """
 import numpy as np
+from estimagic.decorators import takes_numpy_params
 from estimagic.differentiation.derivatives import first_derivative
 from estimagic.parameters.parameter_conversion import get_internal_bounds
 from estimagic.parameters.parameter_conversion import get_reparametrize_functions
@@ -58,8 +59,11 @@ def calculate_scaling_factor_and_offset(
         numdiff_options = {**default_numdiff_options, **numdiff_options}
 
         def func(x):
-            p = params.copy(deep=True)
-            p["value"] = from_internal(x)
+            if takes_numpy_params(criterion):
+                p = from_internal(x)
+            else:
+                p = params.copy(deep=True)
+                p["value"] = from_internal(x)
             crit = criterion(p)
             if isinstance(crit, dict):
                 crit = crit["value"]
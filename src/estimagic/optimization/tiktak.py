@@ -10,13 +10,20 @@ First implemented in Python by Alisdair McKay
 
 """
 import warnings
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
 from functools import partial
 
 import chaospy
+import cloudpickle
 import numpy as np
 from chaospy.distributions import Triangle
 from chaospy.distributions import Uniform
 from estimagic import batch_evaluators as be
+from estimagic.decorators import batch_criterion
+from estimagic.decorators import catch
+from estimagic.decorators import get_batch_function
 from estimagic.optimization.optimization_logging import log_scheduled_steps_and_get_ids
 from estimagic.optimization.optimization_logging import update_step_status
 from estimagic.parameters.parameter_conversion import get_internal_bounds
@@ -103,12 +110,6 @@ def run_multistart_optimization(
                     db_kwargs=db_kwargs,
                 )
 
-    batched_sample = get_batched_optimization_sample(
-        sorted_sample=sorted_sample,
-        n_optimizations=n_optimizations,
-        batch_size=options["batch_size"],
-    )
-
     state = {
         "best_x": sorted_sample[0],
         "best_y": sorted_values[0],
@@ -130,7 +131,7 @@ def run_multistart_optimization(
         error_penalty=error_penalty,
     )
 
-    batch_evaluator = options["batch_evaluator"]
+    local_algorithm = partial(_run_local_optimization, local_algorithm=local_algorithm)
 
     weight_func = partial(
         options["mixing_weight_method"],
@@ -138,11 +139,88 @@ def run_multistart_optimization(
         max_weight=options["mixing_weight_bounds"][1],
     )
 
+    if options["scheduling"] == "asynchronous":
+        state, skipped_steps = _run_asynchronous_optimizations(
+            local_algorithm=local_algorithm,
+            criterion_and_derivative=criterion_and_derivative,
+            sample=sorted_sample[:n_optimizations],
+            scheduled_steps=scheduled_steps,
+            state=state,
+            weight_func=weight_func,
+            convergence_criteria=convergence_criteria,
+            n_cores=options["n_cores"],
+            error_handling=options["optimization_error_handling"],
+        )
+    else:
+        state, skipped_steps = _run_batched_optimizations(
+            local_algorithm=local_algorithm,
+            criterion_and_derivative=criterion_and_derivative,
+            sample=sorted_sample[:n_optimizations],
+            scheduled_steps=scheduled_steps,
+            state=state,
+            weight_func=weight_func,
+            convergence_criteria=convergence_criteria,
+            batch_evaluator=options["batch_evaluator"],
+            batch_size=options["batch_size"],
+            n_cores=options["n_cores"],
+            error_handling=options["optimization_error_handling"],
+        )
+
+    if logging:
+        for step in skipped_steps:
+            update_step_status(
+                step=step,
+                new_status="skipped",
+                db_kwargs=db_kwargs,
+            )
+
+    raw_res = state["best_res"]
+    raw_res["multistart_info"] = {
+        "start_parameters": state["start_history"],
+        "local_optima": state["result_history"],
+        "exploration_sample": sorted_sample,
+        "exploration_results": exploration_res["sorted_criterion_outputs"],
+    }
+
+    return raw_res
+
+
+def _run_batched_optimizations(
+    local_algorithm,
+    criterion_and_derivative,
+    sample,
+    scheduled_steps,
+    state,
+    weight_func,
+    convergence_criteria,
+    batch_evaluator,
+    batch_size,
+    n_cores,
+    error_handling,
+):
+    """Run the local optimizations in batches of starting points.
+
+    All starting points of one batch are calculated from the same currently best
+    point and the next batch is only started once all optimizations of the current
+    batch have finished.
+
+    Returns:
+        dict: The final convergence state.
+        list: The ids of steps that were skipped due to convergence.
+
+    """
+    n_optimizations = len(sample)
+    batched_sample = get_batched_optimization_sample(
+        sorted_sample=sample,
+        n_optimizations=n_optimizations,
+        batch_size=batch_size,
+    )
+
     opt_counter = 0
     for batch in batched_sample:
 
         weight = weight_func(opt_counter, n_optimizations)
-        starts = [weight * state["best_x"] + (1 - weight) * x for x in batch]
+        starts = list(weight * state["best_x"] + (1 - weight) * np.array(batch))
 
         arguments = [
             (criterion_and_derivative, x, step)
@@ -153,8 +231,8 @@ def run_multistart_optimization(
             func=local_algorithm,
             arguments=arguments,
             unpack_symbol="*",
-            n_cores=options["n_cores"],
-            error_handling=options["optimization_error_handling"],
+            n_cores=n_cores,
+            error_handling=error_handling,
         )
 
         state, is_converged = update_convergence_state(
@@ -166,24 +244,98 @@ def run_multistart_optimization(
         opt_counter += len(batch)
         scheduled_steps = scheduled_steps[len(batch) :]
         if is_converged:
-            if logging:
-                for step in scheduled_steps:
-                    update_step_status(
-                        step=step,
-                        new_status="skipped",
-                        db_kwargs=db_kwargs,
-                    )
             break
 
-    raw_res = state["best_res"]
-    raw_res["multistart_info"] = {
-        "start_parameters": state["start_history"],
-        "local_optima": state["result_history"],
-        "exploration_sample": sorted_sample,
-        "exploration_results": exploration_res["sorted_criterion_outputs"],
-    }
+    return state, list(scheduled_steps)
 
-    return raw_res
+
+def _run_asynchronous_optimizations(
+    local_algorithm,
+    criterion_and_derivative,
+    sample,
+    scheduled_steps,
+    state,
+    weight_func,
+    convergence_criteria,
+    n_cores,
+    error_handling,
+):
+    """Run the local optimizations from a work queue.
+
+    A new local optimization is started as soon as a worker becomes idle. Its
+    starting point is calculated from the best point known at that time and the
+    convergence state is updated whenever a local optimization finishes. Thus, the
+    workers never wait for the slowest optimization of a batch.
+
+    Optimizations that are already running when convergence is detected are still
+    collected and added to the convergence state.
+
+    Returns:
+        dict: The final convergence state.
+        list: The ids of steps that were skipped due to convergence.
+
+    """
+    n_optimizations = len(sample)
+    n_cores = max(1, int(n_cores))
+
+    algorithm = catch(
+        local_algorithm,
+        default="__traceback__",
+        reraise=error_handling == "raise",
+    )
+
+    executor = ProcessPoolExecutor(max_workers=n_cores) if n_cores > 1 else None
+
+    running = {}
+    opt_counter = 0
+    is_converged = False
+    try:
+        while True:
+            while (
+                not is_converged
+                and opt_counter < n_optimizations
+                and len(running) < n_cores
+            ):
+                weight = weight_func(opt_counter, n_optimizations)
+                start = weight * state["best_x"] + (1 - weight) * sample[opt_counter]
+                args = (criterion_and_derivative, start, scheduled_steps[opt_counter])
+                if executor is None:
+                    running[opt_counter] = (start, algorithm(*args))
+                else:
+                    payload = cloudpickle.dumps((algorithm, args))
+                    future = executor.submit(_evaluate_pickled_task, payload)
+                    running[future] = (start, None)
+                opt_counter += 1
+
+            if not running:
+                break
+
+            if executor is None:
+                finished = list(running)
+            else:
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+
+            for key in finished:
+                start, res = running.pop(key)
+                if executor is not None:
+                    res = cloudpickle.loads(key.result())
+                state, converged = update_convergence_state(
+                    current_state=state,
+                    starts=[start],
+                    results=[res],
+                    convergence_criteria=convergence_criteria,
+                )
+                is_converged = is_converged or converged
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    return state, list(scheduled_steps[opt_counter:])
+
+
+def _evaluate_pickled_task(payload):
+    func, args = cloudpickle.loads(payload)
+    return cloudpickle.dumps(func(*args))
 
 
 def determine_steps(n_samples, n_optimizations):
@@ -373,14 +525,20 @@ def run_explorations(func, sample, batch_evaluator, n_cores, step_id, error_hand
     if isinstance(batch_evaluator, str):
         batch_evaluator = getattr(be, f"{batch_evaluator}_batch_evaluator")
 
-    criterion_outputs = batch_evaluator(
-        _func,
-        arguments=arguments,
-        n_cores=n_cores,
-        unpack_symbol="**",
-        # If desired, errors are caught inside criterion function.
-        error_handling="raise",
-    )
+    batch_func = get_batch_function(_func)
+    if batch_func is not None:
+        criterion_outputs = batch_func(
+            x=np.atleast_2d(sample), fixed_log_data={"step": int(step_id)}
+        )
+    else:
+        criterion_outputs = batch_evaluator(
+            _func,
+            arguments=arguments,
+            n_cores=n_cores,
+            unpack_symbol="**",
+            # If desired, errors are caught inside criterion function.
+            error_handling="raise",
+        )
 
     raw_values = np.array([critval["value"] for critval in criterion_outputs])
 
@@ -439,6 +597,48 @@ def get_batched_optimization_sample(sorted_sample, n_optimizations, batch_size):
     return batched
 
 
+def _run_local_optimization(criterion_and_derivative, x, step_id, local_algorithm):
+    """Run a local optimization and add the primary criterion entry to its result.
+
+    The primary criterion entry is taken from the algorithm_info with which the local
+    algorithm calls criterion_and_derivative. It determines how the solution_criterion
+    of the local optimization is compared with other function values.
+
+    """
+    algorithm_info = {}
+
+    def _record_algorithm_info(func):
+        def recording_func(*args, **kwargs):
+            algorithm_info.update(kwargs.get("algorithm_info", {}))
+            return func(*args, **kwargs)
+
+        return recording_func
+
+    func = _record_algorithm_info(criterion_and_derivative)
+    batch_func = get_batch_function(criterion_and_derivative)
+    if batch_func is not None:
+        func = batch_criterion(func, batch_func=_record_algorithm_info(batch_func))
+
+    res = local_algorithm(func, x, step_id)
+    res["primary_criterion_entry"] = algorithm_info.get(
+        "primary_criterion_entry", "value"
+    )
+    return res
+
+
+def _get_scalar_criterion(res):
+    """Aggregate the solution_criterion of a local optimization to a scalar."""
+    criterion = np.asarray(res["solution_criterion"], dtype=float)
+    primary = res.get("primary_criterion_entry", "value")
+    if primary == "root_contributions" and criterion.ndim == 1:
+        out = criterion @ criterion
+    elif primary == "contributions" and criterion.ndim == 1:
+        out = criterion.sum()
+    else:
+        out = float(criterion)
+    return out
+
+
 def update_convergence_state(current_state, starts, results, convergence_criteria):
     """Update the state of all quantities related to convergence.
 
@@ -474,7 +674,10 @@ def update_convergence_state(current_state, starts, results, convergence_criteri
     valid_starts = [starts[i] for i in valid_indices]
 
     valid_new_x = [res["solution_x"] for res in valid_results]
-    valid_new_y = [res["solution_criterion"] for res in valid_results]
+    valid_new_y = [_get_scalar_criterion(res) for res in valid_results]
+
+    if not valid_results:
+        return current_state, False
 
     best_index = np.argmin(valid_new_y)
     if valid_new_y[best_index] < best_y:
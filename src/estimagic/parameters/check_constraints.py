@@ -3,6 +3,7 @@
 See the module docstring of process_constraints for naming conventions.
 """
 import warnings
+from functools import partial
 
 import numpy as np
 from estimagic.utilities import cov_params_to_matrix
@@ -28,57 +29,62 @@ def check_constraints_are_satisfied(pc, params):
 
     """
 
+    values = params["value"].to_numpy()
     if params["value"].notnull().any():
         for constr in pc:
             typ = constr["type"]
-            subset = params.iloc[constr["index"]]["value"]
-            msg = f"{{}}:\n{subset.to_frame()}"
+            subset = values[constr["index"]]
+            msg = partial(_violation_message, params=params, index=constr["index"])
             if typ == "covariance":
                 cov = cov_params_to_matrix(subset)
                 e, v = np.linalg.eigh(cov)
                 if not np.all(e > -1e-8):
-                    raise ValueError(msg.format("Invalid covariance parameters."))
+                    raise ValueError(msg("Invalid covariance parameters."))
             elif typ == "sdcorr":
                 cov = sdcorr_params_to_matrix(subset)
                 dim = len(cov)
-                if (subset.iloc[:dim] < 0).any():
-                    raise ValueError(msg.format("Invalid standard deviations."))
-                if ((subset.iloc[dim:] < -1) | (subset.iloc[dim:] > 1)).any():
-                    raise ValueError(msg.format("Invalid correlations."))
+                if (subset[:dim] < 0).any():
+                    raise ValueError(msg("Invalid standard deviations."))
+                if ((subset[dim:] < -1) | (subset[dim:] > 1)).any():
+                    raise ValueError(msg("Invalid correlations."))
                 e, v = np.linalg.eigh(cov)
                 if not np.all(e > -1e-8):
-                    raise ValueError(msg.format("Invalid sdcorr parameters."))
+                    raise ValueError(msg("Invalid sdcorr parameters."))
             elif typ == "probability":
                 if not np.isclose(subset.sum(), 1, rtol=0.01):
-                    raise ValueError(msg.format("Probabilities do not sum to 1"))
+                    raise ValueError(msg("Probabilities do not sum to 1"))
                 if np.any(subset < 0):
-                    raise ValueError(msg.format("Negative Probability."))
+                    raise ValueError(msg("Negative Probability."))
                 if np.any(subset > 1):
-                    raise ValueError(msg.format("Probability larger than 1."))
+                    raise ValueError(msg("Probability larger than 1."))
             elif typ == "increasing":
                 if np.any(np.diff(subset) < 0):
-                    raise ValueError(msg.format("Increasing constraint violated."))
+                    raise ValueError(msg("Increasing constraint violated."))
             elif typ == "decreasing":
                 if np.any(np.diff(subset) > 0):
-                    raise ValueError(msg.format("Decreasing constraint violated"))
+                    raise ValueError(msg("Decreasing constraint violated"))
             elif typ == "linear":
-                # using sr.dot is important in case weights are a series in wrong order
-                wsum = subset.dot(constr["weights"])
+                # the weights are aligned with the selected parameters by
+                # _process_linear_weights
+                wsum = subset @ constr["weights"].to_numpy()
                 if "lower_bound" in constr and wsum < constr["lower_bound"]:
                     raise ValueError(
-                        msg.format("Lower bound of linear constraint is violated")
+                        msg("Lower bound of linear constraint is violated")
                     )
                 elif "upper_bound" in constr and wsum > constr["upper_bound"]:
-                    raise ValueError(
-                        msg.format("Upper bound of linear constraint violated")
-                    )
+                    raise ValueError(msg("Upper bound of linear constraint violated"))
                 elif "value" in constr and not np.isclose(wsum, constr["value"]):
                     raise ValueError(
-                        msg.format("Equality condition of linear constraint violated")
+                        msg("Equality condition of linear constraint violated")
                     )
             elif typ == "equality":
-                if len(subset.unique()) != 1:
-                    raise ValueError(msg.format("Equality constraint violated."))
+                if len(np.unique(subset)) != 1:
+                    raise ValueError(msg("Equality constraint violated."))
+
+
+def _violation_message(text, params, index):
+    # printing the parameters is expensive, so this is only done when raising
+    return f"{text}:\n{params.iloc[index][['value']]}"
 
 
 def check_types(constraints):
@@ -40,9 +40,8 @@ def consolidate_constraints(pc, params):
     pp["_fixed_value"] = fixed_value
     pp["_is_fixed_to_value"] = pp["_fixed_value"].notnull()
 
-    other_pc = [
-        c for c in other_pc if not pp.iloc[c["index"]]["_is_fixed_to_value"].all()
-    ]
+    is_fixed_to_value = pp["_is_fixed_to_value"].to_numpy()
+    other_pc = [c for c in other_pc if not is_fixed_to_value[c["index"]].all()]
 
     other_pc, pp = simplify_covariance_and_sdcorr_constraints(other_pc, pp)
 
@@ -93,44 +92,49 @@ def _consolidate_equality_constraints(equality_pc):
 def _join_overlapping_lists(candidates):
     """Bundle all candidates with with non-empty intersection.
 
+    Overlapping candidates are joined with a union-find structure, such that the
+    runtime is almost linear in the total length of the candidates.
+
     Args:
         candidates (list): List of potentially overlapping lists.
 
     Returns:
         bundles (list): List of lists where all overlapping lists have been joined
-            and sorted.
+            and sorted. The bundles are ordered by the first candidate they contain.
 
     """
-    bundles = []
-
-    while len(candidates) > 0:
-        new_candidates = _unite_first_with_all_intersecting_elements(candidates)
-        if len(candidates) == len(new_candidates):
-            bundles.append(sorted(new_candidates[0]))
-            candidates = candidates[1:]
-        else:
-            candidates = new_candidates
+    parents = {}
+    for candidate in candidates:
+        candidate = list(candidate)
+        for element in candidate:
+            parents.setdefault(element, element)
+        for element in candidate[1:]:
+            _union(parents, candidate[0], element)
 
-    return bundles
+    bundles = {}
+    for i, candidate in enumerate(candidates):
+        candidate = list(candidate)
+        key = _find(parents, candidate[0]) if candidate else ("empty", i)
+        bundles.setdefault(key, set()).update(candidate)
 
+    return [sorted(bundle) for bundle in bundles.values()]
 
-def _unite_first_with_all_intersecting_elements(indices):
-    """Helper function to bundle overlapping indices.
 
-    Args:
-        indices (list): A list lists with indices.
+def _find(parents, element):
+    """Find the representative of element and compress the path to it."""
+    root = element
+    while parents[root] != root:
+        root = parents[root]
+    while parents[element] != root:
+        parents[element], element = root, parents[element]
+    return root
 
-    """
-    first = set(indices[0])
-    new_first = first
-    new_others = []
-    for idx in indices[1:]:
-        if len(first.intersection(idx)) > 0:
-            new_first = new_first.union(idx)
-        else:
-            new_others.append(idx)
 
-    return [new_first] + new_others
+def _union(parents, first, second):
+    """Join the sets that contain first and second."""
+    first_root, second_root = _find(parents, first), _find(parents, second)
+    if first_root != second_root:
+        parents[second_root] = first_root
 
 
 def _consolidate_fixes_with_equality_constraints(fixed_pc, equality_pc, params):
@@ -149,22 +153,24 @@ def _consolidate_fixes_with_equality_constraints(fixed_pc, equality_pc, params):
             are fixed and np.nan everywhere else. Has the same index as params.
 
     """
-    fixed_value = pd.Series(index=params.index, data=np.nan)
+    values = params["value"].to_numpy()
+    fixed_value = np.full(len(params), np.nan)
     for fix in fixed_pc:
         if "value" in fix:
-            fixed_value.iloc[fix["index"]] = fix["value"]
+            fixed_value[fix["index"]] = fix["value"]
         else:
-            fixed_value.iloc[fix["index"]] = params["value"].iloc[fix["index"]]
+            fixed_value[fix["index"]] = values[fix["index"]]
 
     for eq in equality_pc:
-        if fixed_value.iloc[eq["index"]].notnull().any():
-            valcounts = fixed_value.iloc[eq["index"]].value_counts(dropna=True)
+        eq_fixed_value = fixed_value[eq["index"]]
+        eq_fixed_value = np.unique(eq_fixed_value[~np.isnan(eq_fixed_value)])
+        if len(eq_fixed_value) > 0:
             assert (
-                len(valcounts) == 1
+                len(eq_fixed_value) == 1
             ), "Equality constrained parameters cannot be fixed to different values."
-            fixed_value.iloc[eq["index"]] = valcounts.index[0]
+            fixed_value[eq["index"]] = eq_fixed_value[0]
 
-    return fixed_value
+    return pd.Series(fixed_value, index=params.index)
 
 
 def _consolidate_bounds_with_equality_constraints(equality_pc, params):
@@ -183,11 +189,11 @@ def _consolidate_bounds_with_equality_constraints(equality_pc, params):
 
     """
     pp = params.copy()
-    lower = pp["lower_bound"].copy()
-    upper = pp["upper_bound"].copy()
+    lower = pp["lower_bound"].to_numpy(dtype=float, copy=True)
+    upper = pp["upper_bound"].to_numpy(dtype=float, copy=True)
     for eq in equality_pc:
-        lower.iloc[eq["index"]] = lower.iloc[eq["index"]].max()
-        upper.iloc[eq["index"]] = upper.iloc[eq["index"]].min()
+        lower[eq["index"]] = lower[eq["index"]].max()
+        upper[eq["index"]] = upper[eq["index"]].min()
 
     pp["lower_bound"] = lower
     pp["upper_bound"] = upper
@@ -270,25 +276,28 @@ def _plug_equality_constraints_into_selectors(equality_pc, other_pc, params):
 
     """
     pp = params.copy()
-    is_equal_to = pd.Series(index=params.index, data=-1, dtype=int)
+    is_equal_to = np.full(len(params), -1, dtype=int)
     for eq in equality_pc:
-        is_equal_to.iloc[sorted(eq["index"])[1:]] = sorted(eq["index"])[0]
+        index = sorted(eq["index"])
+        is_equal_to[index[1:]] = index[0]
     pp["_post_replacements"] = is_equal_to
     pp["_is_fixed_to_other"] = is_equal_to >= 0
-    helper = pp["_post_replacements"].reset_index(drop=True)
-    replace_dict = helper[helper >= 0].to_dict()
+    free_position = np.where(is_equal_to >= 0, is_equal_to, np.arange(len(params)))
 
     plugged_in = []
     for constr in other_pc:
         new = constr.copy()
-        new["index"] = pd.Series(constr["index"]).replace(replace_dict).tolist()
+        new["index"] = free_position[constr["index"]].tolist()
         plugged_in.append(new)
 
     linear_constraints, others = _split_constraints(plugged_in, "linear")
 
     pc = []
+    seen = set()
     for constr in others:
-        if not _is_redundant(constr, pc):
+        key = (constr["type"], tuple(constr["index"]))
+        if key not in seen:
+            seen.add(key)
             pc.append(constr)
 
     pc += linear_constraints
@@ -434,18 +443,20 @@ def _plug_fixes_into_linear_weights_and_rhs(
         new_weighs (pd.DataFrame)
         new_rhs (pd.DataFrame)
     """
-    ilocs = pd.Series(data=range(len(fixed_value)), index=fixed_value.index)
-    fixed_ilocs = ilocs[is_fixed_to_value].tolist()
+    fixed_ilocs = np.flatnonzero(is_fixed_to_value.to_numpy())
     new_rhs = rhs.copy()
     new_weights = weights.copy()
 
     if len(fixed_ilocs) > 0:
         fixed_values = fixed_value.iloc[fixed_ilocs].to_numpy()
-        fixed_contribution = weights[fixed_ilocs] @ fixed_values
+        fixed_contribution = weights.to_numpy()[:, fixed_ilocs] @ fixed_values
         for column in ["lower_bound", "upper_bound", "value"]:
             new_rhs[column] = new_rhs[column] - fixed_contribution
-        for i in fixed_ilocs:
-            new_weights[i] = 0
+        plugged = weights.to_numpy(copy=True)
+        plugged[:, fixed_ilocs] = 0
+        new_weights = pd.DataFrame(
+            plugged, index=weights.index, columns=weights.columns
+        )
 
     return new_weights, new_rhs
 
@@ -644,20 +655,3 @@ def _get_kernel_transformation_matrices(weights):
     from_internal = np.linalg.inv(to_internal)
 
     return to_internal, from_internal
-
-
-def _is_redundant(candidate, others):
-    """Check if a constraint is redundant given other constraints.
-
-    Applicable to all but linear constraints.
-
-    """
-    assert candidate["type"] != "linear"
-    if len(others) == 0:
-        is_redundant = False
-    else:
-        same_type, _ = _split_constraints(others, candidate["type"])
-        duplicates = [c for c in same_type if c["index"] == candidate["index"]]
-        is_redundant = len(duplicates) > 0
-
-    return is_redundant
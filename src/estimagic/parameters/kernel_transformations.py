@@ -14,6 +14,15 @@ duplication matrix, and fulfills :math:`D \text{vech}(A) = \text{vec}(A)`. At
 last we define the so called commutation matrix :math:`K` which is given by the
 property that :math:`K \text{vec}(A) = \text{vec}(A^\top)`.
 
+Remarks on batched evaluation:
+------------------------------
+
+The transformations (but not their jacobians) also accept arrays with more than one
+dimension. The last axis then contains the parameters of one block and all leading
+axes are batch dimensions, e.g. an array of shape (n_draws, n_blocks, block_length).
+All blocks are transformed at once, except for the cholesky factorizations in
+``covariance_to_internal`` and ``sdcorr_to_internal``.
+
 Remarks on reference literature:
 --------------------------------
 
@@ -28,17 +37,22 @@ specific cases we refer to posts on math.stackexchange.com.
    https://google.github.io/styleguide/pyguide.html
 
 """
+import functools
+
 import numpy as np
+import scipy.linalg
 from estimagic.utilities import chol_params_to_lower_triangular_matrix
-from estimagic.utilities import cov_matrix_to_sdcorr_params
 from estimagic.utilities import cov_params_to_matrix
 from estimagic.utilities import dimension_to_number_of_triangular_elements
+from estimagic.utilities import number_of_triangular_elements_to_dimension
 from estimagic.utilities import robust_cholesky
 from estimagic.utilities import sdcorr_params_to_matrix
 
 
 def covariance_to_internal(external_values, constr):
     """Do a cholesky reparametrization."""
+    if np.ndim(external_values) > 1:
+        return np.apply_along_axis(covariance_to_internal, -1, external_values, constr)
     cov = cov_params_to_matrix(external_values)
     chol = robust_cholesky(cov)
     return chol[np.tril_indices(len(cov))]
@@ -72,15 +86,19 @@ def covariance_to_internal_jacobian(external_values, constr):
     internal = chol[np.tril_indices(len(chol))]
 
     deriv = covariance_from_internal_jacobian(internal, constr=None)
-    deriv = np.linalg.pinv(deriv)
+    # the jacobian of covariance_from_internal is lower triangular
+    if np.all(np.diag(deriv) != 0):
+        deriv = scipy.linalg.solve_triangular(deriv, np.eye(len(deriv)), lower=True)
+    else:
+        deriv = np.linalg.pinv(deriv)
     return deriv
 
 
 def covariance_from_internal(internal_values, constr):
     """Undo a cholesky reparametrization."""
-    chol = chol_params_to_lower_triangular_matrix(internal_values)
-    cov = chol @ chol.T
-    return cov[np.tril_indices(len(chol))]
+    cov = _covariance_matrices_from_internal(internal_values)
+    rows, cols = np.tril_indices(cov.shape[-1])
+    return cov[..., rows, cols]
 
 
 def covariance_from_internal_jacobian(internal_values, constr):
@@ -112,6 +130,14 @@ def covariance_from_internal_jacobian(internal_values, constr):
 
     where :math:`c := \text{external}` and :math:`x := \text{internal}`.
 
+    Instead of forming the Kronecker products, we evaluate the entries of the result
+    directly. Since :math:`S_{ij} = \sum_m X_{im} X_{jm}`, the entry in the row of
+    :math:`S_{ij}` and the column of :math:`X_{kl}` is
+
+    .. math::
+        \frac{\partial S_{ij}}{\partial X_{kl}} =
+            \delta_{ik} X_{jl} + \delta_{jk} X_{il} \,.
+
     Args:
         internal_values (np.ndarray): Cholesky factors stored in an "internal"
             format.
@@ -121,22 +147,16 @@ def covariance_from_internal_jacobian(internal_values, constr):
 
     """
     chol = chol_params_to_lower_triangular_matrix(internal_values)
-    dim = len(chol)
-
-    K = _commutation_matrix(dim)
-    L = _elimination_matrix(dim)
-
-    left = np.eye(dim**2) + K
-    right = np.kron(chol, np.eye(dim))
+    (i, j), (k, l) = _jacobian_index_grids(len(chol))
 
-    intermediate = left @ right
-
-    deriv = L @ intermediate @ L.T
+    deriv = (i == k) * chol[j, l] + (j == k) * chol[i, l]
     return deriv
 
 
 def sdcorr_to_internal(external_values, constr):
     """Convert sdcorr to cov and do a cholesky reparametrization."""
+    if np.ndim(external_values) > 1:
+        return np.apply_along_axis(sdcorr_to_internal, -1, external_values, constr)
     cov = sdcorr_params_to_matrix(external_values)
     chol = robust_cholesky(cov)
     return chol[np.tril_indices(len(cov))]
@@ -172,15 +192,30 @@ def sdcorr_to_internal_jacobian(external_values, constr):
     internal = chol[np.tril_indices(len(chol))]
 
     deriv = sdcorr_from_internal_jacobian(internal, constr=None)
-    deriv = np.linalg.pinv(deriv)
+    try:
+        deriv = np.linalg.inv(deriv)
+    except np.linalg.LinAlgError:
+        deriv = np.linalg.pinv(deriv)
     return deriv
 
 
 def sdcorr_from_internal(internal_values, constr):
     """Undo a cholesky reparametrization."""
-    chol = chol_params_to_lower_triangular_matrix(internal_values)
-    cov = chol @ chol.T
-    return cov_matrix_to_sdcorr_params(cov)
+    cov = _covariance_matrices_from_internal(internal_values)
+    sds = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+    corr = cov / (sds[..., :, None] * sds[..., None, :])
+    rows, cols = np.tril_indices(cov.shape[-1], k=-1)
+    return np.concatenate([sds, corr[..., rows, cols]], axis=-1)
+
+
+def _covariance_matrices_from_internal(internal_values):
+    """Build covariance matrices from the last axis of internal cholesky parameters."""
+    internal_values = np.asarray(internal_values)
+    dim = number_of_triangular_elements_to_dimension(internal_values.shape[-1])
+    chol = np.zeros(internal_values.shape[:-1] + (dim, dim), internal_values.dtype)
+    rows, cols = np.tril_indices(dim)
+    chol[..., rows, cols] = internal_values
+    return chol @ np.swapaxes(chol, -1, -2)
 
 
 def sdcorr_from_internal_jacobian(internal_values, constr):
@@ -224,6 +259,20 @@ def sdcorr_from_internal_jacobian(internal_values, constr):
     .. math::
         \frac{\mathrm{d}p}{\mathrm{d}x} = T \frac{\mathrm{d}p'}{\mathrm{d}x'} D
 
+    Instead of forming the Kronecker products, we evaluate the entries of the result
+    directly. Let :math:`s_i := \sqrt{S_{ii}} = ||x_i||` and
+    :math:`R_{ij} := S_{ij} / (s_i s_j)`. With the derivatives of the covariance
+    matrix (see ``covariance_from_internal_jacobian``) we get
+
+    .. math::
+        \frac{\partial s_i}{\partial X_{kl}} = \delta_{ik} \frac{X_{il}}{s_i}
+        \quad \text{and} \quad
+        \frac{\partial R_{ij}}{\partial X_{kl}} =
+            \frac{\delta_{ik} X_{jl} + \delta_{jk} X_{il}}{s_i s_j} -
+            R_{ij} \left(
+                \frac{\delta_{ik} X_{il}}{s_i^2} + \frac{\delta_{jk} X_{jl}}{s_j^2}
+            \right) \,.
+
     Args:
         internal_values (np.ndarray): Cholesky factors stored in an "internal"
             format.
@@ -234,42 +283,62 @@ def sdcorr_from_internal_jacobian(internal_values, constr):
     """
     X = chol_params_to_lower_triangular_matrix(internal_values)
     dim = len(X)
+    (i, j), (k, l) = _jacobian_index_grids(dim, sdcorr_rows=True)
 
-    identity = np.eye(dim)
-    S = X @ X.T
+    sds = np.sqrt((X**2).sum(axis=1))
+    corr = (X @ X.T) / np.outer(sds, sds)
 
-    #  the wrong formulation in the tinyurl stated: A = np.multiply(I, X)
-    A = np.sqrt(np.multiply(identity, S))
+    d_cov = (i == k) * X[j, l] + (j == k) * X[i, l]
+    d_sd_i = (i == k) * X[i, l] / sds[i]
+    d_sd_j = (j == k) * X[j, l] / sds[j]
 
-    V = np.linalg.inv(A)
+    d_corr = d_cov / (sds[i] * sds[j]) - corr[i, j] * (
+        d_sd_i / sds[i] + d_sd_j / sds[j]
+    )
 
-    K = _commutation_matrix(dim)
-    Y = np.diag(identity.ravel("F"))
+    # the first dim rows contain the standard deviations
+    deriv = np.where(i == j, d_sd_i, d_corr)
+    return deriv
 
-    #  with the wrong formulation in the tinyurl we would have had U = Y
-    norms = np.sqrt((X**2).sum(axis=1).reshape(-1, 1))
-    XX = X / norms
-    U = Y @ np.kron(identity, XX) @ K
 
-    N = np.kron(identity, X) @ K + np.kron(X, identity)
+@functools.lru_cache(maxsize=None)
+def _jacobian_index_grids(dim, sdcorr_rows=False):
+    """Return broadcastable row and column indices of a kernel jacobian.
 
-    VS = V @ S
-    B = np.kron(V, V)
-    H = np.kron(VS, identity)
-    J = np.kron(identity, VS)
+    The columns of the jacobians of covariance_from_internal and
+    sdcorr_from_internal correspond to the elements :math:`X_{kl}` of the Cholesky
+    factor in the order of the row-wise half-vectorization. The rows correspond to
+    the elements :math:`S_{ij}` of the covariance matrix in the same order or, if
+    sdcorr_rows is True, to the diagonal elements followed by the lower triangular
+    elements without diagonal.
 
-    intermediate = U + B @ N - (H + J) @ B @ U
+    Args:
+        dim (int): The dimension of the covariance matrix.
+        sdcorr_rows (bool): Whether the rows are ordered as sdcorr params.
 
-    T = _transformation_matrix(dim)
-    D = _duplication_matrix(dim)
+    Returns:
+        tuple: (i, j), (k, l) where i and j are integer arrays of shape (n, 1) and k
+            and l integer arrays of shape (1, n), with n the number of lower
+            triangular elements.
 
-    deriv = T @ intermediate @ D
-    return deriv
+    """
+    if sdcorr_rows:
+        diag = np.arange(dim)
+        lower_i, lower_j = np.tril_indices(dim, k=-1)
+        rows = (np.concatenate([diag, lower_i]), np.concatenate([diag, lower_j]))
+    else:
+        rows = np.tril_indices(dim)
+    cols = np.tril_indices(dim)
+
+    out = ((rows[0][:, None], rows[1][:, None]), (cols[0][None, :], cols[1][None, :]))
+    for arr in (*out[0], *out[1]):
+        arr.flags.writeable = False
+    return out
 
 
 def probability_to_internal(external_values, constr):
     """Reparametrize probability constrained parameters to internal."""
-    return external_values / external_values[-1]
+    return external_values / external_values[..., -1:]
 
 
 def probability_to_internal_jacobian(external_values, constr):
@@ -308,7 +377,7 @@ def probability_to_internal_jacobian(external_values, constr):
 
 def probability_from_internal(internal_values, constr):
     """Reparametrize probability constrained parameters from internal."""
-    return internal_values / internal_values.sum()
+    return internal_values / internal_values.sum(axis=-1, keepdims=True)
 
 
 def probability_from_internal_jacobian(internal_values, constr):
@@ -343,7 +412,7 @@ def probability_from_internal_jacobian(internal_values, constr):
 
 def linear_to_internal(external_values, constr):
     """Reparametrize linear constraint to internal."""
-    return constr["to_internal"] @ external_values
+    return external_values @ constr["to_internal"].T
 
 
 def linear_to_internal_jacobian(external_values, constr):
@@ -352,13 +421,14 @@ def linear_to_internal_jacobian(external_values, constr):
 
 def linear_from_internal(internal_values, constr):
     """Reparametrize linear constraint from internal."""
-    return constr["from_internal"] @ internal_values
+    return internal_values @ constr["from_internal"].T
 
 
 def linear_from_internal_jacobian(internal_values, constr):
     return constr["from_internal"]
 
 
+@functools.lru_cache(maxsize=None)
 def _elimination_matrix(dim):
     r"""Construct (row-wise) elimination matrix.
 
@@ -398,9 +468,11 @@ def _elimination_matrix(dim):
     columns = [_unit_vector_or_zeros(i, n) for i in counter.ravel("F")]
 
     eliminator = np.column_stack(columns)
+    eliminator.flags.writeable = False
     return eliminator
 
 
+@functools.lru_cache(maxsize=None)
 def _duplication_matrix(dim):
     r"""Return duplication matrix.
 
@@ -440,6 +512,7 @@ def _duplication_matrix(dim):
     return duplicator
 
 
+@functools.lru_cache(maxsize=None)
 def _transformation_matrix(dim):
     r"""Return transformation matrix.
 
@@ -493,9 +566,11 @@ def _transformation_matrix(dim):
     rows = [_unit_vector_or_zeros(i, dim**2) for i in indices]
 
     transformer = np.row_stack(rows)
+    transformer.flags.writeable = False
     return transformer
 
 
+@functools.lru_cache(maxsize=None)
 def _commutation_matrix(dim):
     r"""Return commutation matrix.
 
@@ -528,6 +603,7 @@ def _commutation_matrix(dim):
     col = row.reshape((dim, dim), order="F").ravel()
     commuter = np.zeros((dim**2, dim**2), dtype=np.int8)
     commuter[row, col] = 1
+    commuter.flags.writeable = False
     return commuter
 
 
@@ -15,6 +15,7 @@ from estimagic.parameters.kernel_transformations import scale_to_internal
 from estimagic.parameters.parameter_preprocessing import add_default_bounds_to_params
 from estimagic.parameters.parameter_preprocessing import check_params_are_valid
 from estimagic.parameters.process_constraints import process_constraints
+from estimagic.parameters.reparametrize import compile_reparametrization_plan
 from estimagic.parameters.reparametrize import convert_external_derivative_to_internal
 from estimagic.parameters.reparametrize import post_replace_jacobian
 from estimagic.parameters.reparametrize import pre_replace_jacobian
@@ -79,12 +80,15 @@ def get_reparametrize_functions(
         # get partialed reparametrize to internal
         internal_free = processed_params["_internal_free"].to_numpy()
 
+        plan = compile_reparametrization_plan(processed_constraints)
+
         partialed_to_internal = functools.partial(
             reparametrize_to_internal,
             internal_free=internal_free,
             processed_constraints=processed_constraints,
             scaling_factor=scaling_factor,
             scaling_offset=scaling_offset,
+            plan=plan,
         )
 
         partialed_from_internal = functools.partial(
@@ -96,6 +100,7 @@ def get_reparametrize_functions(
             params=params,
             scaling_factor=scaling_factor,
             scaling_offset=scaling_offset,
+            plan=plan,
         )
 
     return partialed_to_internal, partialed_from_internal
@@ -150,9 +155,11 @@ def get_derivative_conversion_function(
         dim_internal = int(processed_params["_internal_free"].sum())
 
         pre_replace_jac = pre_replace_jacobian(
-            pre_replacements=pre_replacements, dim_in=dim_internal
+            pre_replacements=pre_replacements, dim_in=dim_internal, sparse=True
+        )
+        post_replace_jac = post_replace_jacobian(
+            post_replacements=post_replacements, sparse=True
         )
-        post_replace_jac = post_replace_jacobian(post_replacements=post_replacements)
 
         convert_derivative = functools.partial(
             convert_external_derivative_to_internal,
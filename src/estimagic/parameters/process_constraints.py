@@ -28,7 +28,11 @@ If only few columns of processed params are used in a function, it is better to
 pass them as Series, to make the flow of information more explicit.
 
 """
+import copy
+import hashlib
+import pickle
 import warnings
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
@@ -41,10 +45,18 @@ from estimagic.parameters.kernel_transformations import scale_to_internal
 from estimagic.parameters.parameter_preprocessing import add_default_bounds_to_params
 from estimagic.utilities import number_of_triangular_elements_to_dimension
 
+_CACHE_SIZE = 16
+_PROCESSED_CONSTRAINTS_CACHE = OrderedDict()
+
 
 def process_constraints(constraints, params, scaling_factor=None, scaling_offset=None):
     """Process, consolidate and check constraints.
 
+    The results are cached, such that processing the same constraints for the same
+    params again, e.g. in ``minimize`` and later in ``estimate_ml`` or
+    ``transform_covariance``, is almost free. Warnings that were raised while the
+    constraints were processed are raised again for cached results.
+
     Args:
         constraints (list): List of dictionaries where each dictionary is a constraint.
         params (pd.DataFrame): see :ref:`params`.
@@ -77,6 +89,28 @@ def process_constraints(constraints, params, scaling_factor=None, scaling_offset
               parameter
 
     """
+    key = _get_cache_key(constraints, params, scaling_factor, scaling_offset)
+    if key is not None and key in _PROCESSED_CONSTRAINTS_CACHE:
+        _PROCESSED_CONSTRAINTS_CACHE.move_to_end(key)
+        pc, pp, caught = _PROCESSED_CONSTRAINTS_CACHE[key]
+    else:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            pc, pp = _process_constraints(
+                constraints, params, scaling_factor, scaling_offset
+            )
+        if key is not None:
+            _PROCESSED_CONSTRAINTS_CACHE[key] = (copy.deepcopy(pc), pp, caught)
+            if len(_PROCESSED_CONSTRAINTS_CACHE) > _CACHE_SIZE:
+                _PROCESSED_CONSTRAINTS_CACHE.popitem(last=False)
+
+    for warning in caught:
+        warnings.warn(warning.message, warning.category, stacklevel=2)
+
+    return copy.deepcopy(pc), pp.copy(deep=True)
+
+
+def _process_constraints(constraints, params, scaling_factor, scaling_offset):
     params = add_default_bounds_to_params(params)
     with warnings.catch_warnings():
         warnings.filterwarnings(
@@ -118,6 +152,26 @@ def process_constraints(constraints, params, scaling_factor=None, scaling_offset
         return pc, pp
 
 
+def _get_cache_key(constraints, params, scaling_factor, scaling_offset):
+    """Hash the inputs of process_constraints.
+
+    Returns:
+        str or None: The hash or None if the inputs cannot be hashed, in which case
+            the result is not cached.
+
+    """
+    scaling = [
+        None if arr is None else np.asarray(arr, dtype=float)
+        for arr in (scaling_factor, scaling_offset)
+    ]
+    try:
+        hashed_params = pd.util.hash_pandas_object(params, index=True).to_numpy()
+        to_hash = pickle.dumps((constraints, list(params.columns), scaling))
+    except Exception:
+        return None
+    return hashlib.sha256(to_hash + hashed_params.tobytes()).hexdigest()
+
+
 def _process_selectors(constraints, params):
     """Convert the query and loc field of the constraint into position based indices.
 
@@ -134,6 +188,12 @@ def _process_selectors(constraints, params):
     """
     pc = []
 
+    positions = pd.Series(data=np.arange(len(params)), index=params.index)
+    label_to_position = (
+        dict(zip(params.index, range(len(params)))) if params.index.is_unique else {}
+    )
+    query_results = {}
+
     for constr in constraints:
         new_constr = constr.copy()
 
@@ -144,19 +204,20 @@ def _process_selectors(constraints, params):
             locs = new_constr.pop("locs", [])
             queries = new_constr.pop("queries", [])
 
-        positions = pd.Series(data=np.arange(len(params)), index=params.index)
-
         indices = []
         for loc in locs:
-            index = positions.loc[loc].astype(int).tolist()
-            index = [index] if not isinstance(index, list) else index
+            index = _get_positions_of_labels(loc, label_to_position)
+            if index is None:
+                index = positions.loc[loc].astype(int).tolist()
+                index = [index] if not isinstance(index, list) else index
             assert len(set(index)) == len(index), "Duplicates in loc are not allowed."
             indices.append(index)
         for query in queries:
-            loc = params.query(query).index
-            index = positions.loc[loc].astype(int).tolist()
-            index = [index] if not isinstance(index, list) else index
-            indices.append(index)
+            if query not in query_results:
+                loc = params.query(query).index
+                index = positions.loc[loc].astype(int).tolist()
+                query_results[query] = [index] if not isinstance(index, list) else index
+            indices.append(list(query_results[query]))
 
         if constr["type"] == "pairwise_equality":
             assert (
@@ -184,6 +245,35 @@ def _process_selectors(constraints, params):
     return pc
 
 
+def _get_positions_of_labels(loc, label_to_position):
+    """Look up the positions of a loc that consists of complete index labels.
+
+    This is much faster than ``.loc`` for long lists of labels, in particular if
+    params has a MultiIndex.
+
+    Args:
+        loc: A loc selector of a constraint.
+        label_to_position (dict): Maps the labels of a unique params index to their
+            positions.
+
+    Returns:
+        list or None: The positions of the selected parameters or None if loc is
+            anything else than a label or a list of labels, e.g. a slice, a boolean
+            mask or a partial label of a MultiIndex.
+
+    """
+    labels = loc if isinstance(loc, list) else [loc]
+    try:
+        if all(
+            not isinstance(label, (bool, np.bool_)) and label in label_to_position
+            for label in labels
+        ):
+            return [label_to_position[label] for label in labels]
+    except TypeError:
+        pass
+    return None
+
+
 def _replace_pairwise_equality_by_equality(pc):
     """Rewrite pairwise equality constraints to equality constraints.
 
@@ -223,12 +313,14 @@ def _process_linear_weights(pc, params):
             raw_weights = constr["weights"]
             params_subset = params.iloc[constr["index"]]
 
-            msg = f"Weights must be same length as selected parameters: {params_subset}"
             if isinstance(raw_weights, pd.Series):
                 weights = raw_weights.loc[params_subset.index].to_numpy()
             elif isinstance(raw_weights, (np.ndarray, list, tuple)):
                 if len(raw_weights) != len(params_subset):
-                    raise ValueError(msg)
+                    raise ValueError(
+                        "Weights must be same length as selected parameters: "
+                        f"{params_subset}"
+                    )
                 weights = np.asarray(raw_weights)
             elif isinstance(raw_weights, (float, int)):
                 weights = np.full(len(params_subset), float(raw_weights))
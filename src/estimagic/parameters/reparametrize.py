@@ -33,10 +33,20 @@ The reparametrization from internal can be broken down into three separate steps
 In the following, let n_external be the length of th external parameter vector and
 n_internal the length of the internal parameter vector.
 
+All steps also work on 2d arrays where each row is one parameter vector. This allows
+to reparametrize many parameter vectors, e.g. a sample of draws, at once.
+
+The transformation step can be compiled into a plan with
+``compile_reparametrization_plan``. This is done once per problem and avoids to
+look up and apply the kernel transformations constraint by constraint.
+
 """
+import functools
+
 import estimagic.parameters.kernel_transformations as kt
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 
 
 def reparametrize_to_internal(
@@ -45,12 +55,14 @@ def reparametrize_to_internal(
     processed_constraints,
     scaling_factor=None,
     scaling_offset=None,
+    plan=None,
 ):
     """Convert a params DataFrame into a numpy array of internal parameters.
 
     Args:
         external (np.ndarray or pandas.DataFrmae): 1d array with of external parameter
-            values or params DataFrame.
+            values or params DataFrame. Can also be a 2d array where each row is one
+            external parameter vector.
         internal_free (np.ndarray): 1d array of lenth n_external that determines
             which parameters are free.
         processed_constraints (list): Processed and consolidated constraints. The
@@ -58,23 +70,29 @@ def reparametrize_to_internal(
             to be done.
         scaling_factor (np.ndarray or None): If None, no scaling factor is used.
         scaling_offset (np.ndarray or None): If None, no scaling offset is used.
+        plan (list or None): Output of ``compile_reparametrization_plan``. If None,
+            the plan is compiled from processed_constraints.
 
     Returns:
         internal_params (numpy.ndarray): 1d numpy array of free reparametrized
-            parameters.
+            parameters. 2d if external was 2d.
 
     """
     if isinstance(external, pd.DataFrame):
         external = external["value"].to_numpy()
 
-    with_internal_values = external.copy()
+    if plan is None:
+        plan = compile_reparametrization_plan(processed_constraints)
 
-    for constr in processed_constraints:
-        func = getattr(kt, f"{constr['type']}_to_internal")
+    with_internal_values = external.copy()
 
-        with_internal_values[constr["index"]] = func(external[constr["index"]], constr)
+    for step in plan:
+        index = step["index"]
+        with_internal_values[..., index] = step["to_internal"](
+            external[..., index], step
+        )
 
-    internal = with_internal_values[internal_free]
+    internal = with_internal_values[..., internal_free]
 
     scaled = kt.scale_to_internal(
         internal, scaling_factor=scaling_factor, scaling_offset=scaling_offset
@@ -93,11 +111,14 @@ def reparametrize_from_internal(
     return_numpy=True,
     scaling_factor=None,
     scaling_offset=None,
+    plan=None,
 ):
     """Convert a numpy array of internal parameters to a params DataFrame.
 
     Args:
-        internal (numpy.ndarray): 1d numpy array with internal parameters
+        internal (numpy.ndarray): 1d numpy array with internal parameters. Can also be
+            a 2d array where each row is one internal parameter vector. This is only
+            supported if return_numpy is True.
         fixed_values (numpy.ndarray): 1d numpy array of length n_external. It contains
             NaN for parameters that are not fixed and an internal representation of the
             value to which a parameter has been fixed for all others.
@@ -116,9 +137,11 @@ def reparametrize_from_internal(
             of the external parameter vector.
         scaling_factor (np.ndarray or None): If None, no scaling factor is used.
         scaling_offset (np.ndarray or None): If None, no scaling offset is used.
+        plan (list or None): Output of ``compile_reparametrization_plan``. If None,
+            the plan is compiled from processed_constraints.
 
     Returns:
-        numpy.ndarray: Array with external parameters
+        numpy.ndarray: Array with external parameters. 2d if internal was 2d.
 
     """
     # undo scaling
@@ -130,10 +153,13 @@ def reparametrize_from_internal(
     external_values = pre_replace(internal, fixed_values, pre_replacements)
 
     # do transformations
-    for constr in processed_constraints:
-        func = getattr(kt, f"{constr['type']}_from_internal")
-        external_values[constr["index"]] = func(
-            external_values[constr["index"]], constr
+    if plan is None:
+        plan = compile_reparametrization_plan(processed_constraints)
+
+    for step in plan:
+        index = step["index"]
+        external_values[..., index] = step["from_internal"](
+            external_values[..., index], step
         )
 
     # do post-replacements
@@ -148,6 +174,82 @@ def reparametrize_from_internal(
     return out
 
 
+def compile_reparametrization_plan(processed_constraints):
+    """Compile processed constraints into a plan for the transformation step.
+
+    Constraints of the same type whose blocks have the same length are grouped into
+    one step. The positions of all blocks in a step are stored in one 2d index array,
+    such that the parameters of a step can be gathered and scattered with a single
+    indexing operation. The kernel transformations are looked up once and applied to
+    all blocks of a step (and all parameter vectors of a batch) at once.
+
+    Grouping changes the order in which the constraints are applied. This is only
+    done if no parameter is affected by more than one constraint, which is always
+    the case for consolidated constraints. Otherwise, each constraint gets its own
+    step and the order is kept.
+
+    Args:
+        processed_constraints (list): List of processed and consolidated constraint
+            dictionaries. Can have the types "linear", "probability", "covariance"
+            and "sdcorr".
+
+    Returns:
+        list: List of dictionaries, one per step, with the entries "type", "index",
+            "constraints", "from_internal" and "to_internal". "index" is an integer
+            array of shape (n_blocks, block_length). "from_internal" and
+            "to_internal" are functions that take an array of shape
+            (..., n_blocks, block_length) with parameter values and the step and
+            return the transformed values.
+
+    """
+    indices = [
+        np.asarray(constr["index"], dtype=int) for constr in processed_constraints
+    ]
+    n_indices = sum(len(index) for index in indices)
+    is_disjoint = n_indices == len(np.unique(np.concatenate([[], *indices])))
+
+    groups = {}
+    for i, (constr, index) in enumerate(zip(processed_constraints, indices)):
+        key = (constr["type"], len(index)) if is_disjoint else i
+        groups.setdefault(key, []).append((constr, index))
+
+    plan = []
+    for group in groups.values():
+        constraints = [constr for constr, _ in group]
+        typ = constraints[0]["type"]
+        step = {
+            "type": typ,
+            "index": np.stack([index for _, index in group]),
+            "constraints": constraints,
+        }
+        if typ == "linear":
+            for direction in ["from_internal", "to_internal"]:
+                step[f"{direction}_matrices"] = np.stack(
+                    [constr[direction] for constr in constraints]
+                )
+                step[direction] = functools.partial(
+                    _linear_transformation_of_blocks, direction=direction
+                )
+        else:
+            # the other kernel transformations do not depend on the constraint
+            for direction in ["from_internal", "to_internal"]:
+                step[direction] = functools.partial(
+                    _kernel_transformation_of_blocks,
+                    kernel=getattr(kt, f"{typ}_{direction}"),
+                )
+        plan.append(step)
+
+    return plan
+
+
+def _kernel_transformation_of_blocks(values, step, kernel):
+    return kernel(values, constr=None)
+
+
+def _linear_transformation_of_blocks(values, step, direction):
+    return np.einsum("bij,...bj->...bi", step[f"{direction}_matrices"], values)
+
+
 def convert_external_derivative_to_internal(
     external_derivative,
     internal_values,
@@ -197,8 +299,14 @@ def convert_external_derivative_to_internal(
             element contains the position a parameter in the transformed parameter
             vector that has to be copied to duplicated and copied to the i_th position
             of the external parameter vector.
-        pre_replace_jac (np.ndarray): 2d Array with the jacobian of pre_replace
-        post_replacment_jacobian (np.ndarray): 2d Array with the jacobian post_replace
+        pre_replace_jac (np.ndarray or scipy.sparse.spmatrix): 2d Array with the
+            jacobian of pre_replace. Should be precomputed with
+            ``pre_replace_jacobian(..., sparse=True)`` if the conversion is done
+            repeatedly.
+        post_replace_jac (np.ndarray or scipy.sparse.spmatrix): 2d Array with the
+            jacobian of post_replace. Should be precomputed with
+            ``post_replace_jacobian(..., sparse=True)`` if the conversion is done
+            repeatedly.
         scaling_factor (np.ndarray or None): If None, no scaling factor is used.
         scaling_offset (np.ndarray or None): If None, no_scaling_factor is used.
 
@@ -222,12 +330,16 @@ def convert_external_derivative_to_internal(
         )
 
     if pre_replace_jac is None:
-        pre_replace_jac = pre_replace_jacobian(pre_replacements, dim_in)
+        pre_replace_jac = pre_replace_jacobian(pre_replacements, dim_in, sparse=True)
 
     if post_replace_jac is None:
-        post_replace_jac = post_replace_jacobian(post_replacements)
+        post_replace_jac = post_replace_jacobian(post_replacements, sparse=True)
 
-    transform_jac = transformation_jacobian(processed_constraints, pre_replaced)
+    # all matrices except the external derivative are sparse, such that only the
+    # kernel jacobians of the constrained blocks enter the chain as dense matrices
+    transform_jac = transformation_jacobian(
+        processed_constraints, pre_replaced, sparse=True
+    )
 
     external_derivative = np.atleast_2d(external_derivative)
     tall_external = external_derivative.shape[0] > external_derivative.shape[1]
@@ -239,7 +351,7 @@ def convert_external_derivative_to_internal(
         pre_replace_jac,
     ]
     if scaling_factor is not None:
-        mat_list.append(np.diag(scaling_factor))
+        mat_list.append(sp.diags(scaling_factor, format="csr"))
 
     if tall_external:
         deriv = _multiply_from_right(mat_list)
@@ -247,6 +359,7 @@ def convert_external_derivative_to_internal(
         deriv = _multiply_from_left(mat_list)
 
     # return gradient with shape (len(params),)
+    deriv = np.asarray(deriv)
     if deriv.shape[0] == 1:
         deriv = deriv.flatten()
     return deriv
@@ -304,15 +417,18 @@ def pre_replace(internal_values, fixed_values, pre_replacements):
         array([2., 0., 1.])
 
     """
-    pre_replaced = fixed_values.copy()
+    # keep complex internal values, e.g. from complex step derivatives
+    dtype = np.result_type(fixed_values, internal_values)
+    shape = np.shape(internal_values)[:-1] + fixed_values.shape
+    pre_replaced = np.broadcast_to(fixed_values, shape).astype(dtype)
 
     mask = pre_replacements >= 0
     positions = pre_replacements[mask]
-    pre_replaced[mask] = internal_values[positions]
+    pre_replaced[..., mask] = internal_values[..., positions]
     return pre_replaced
 
 
-def pre_replace_jacobian(pre_replacements, dim_in):
+def pre_replace_jacobian(pre_replacements, dim_in, sparse=False):
     """Return Jacobian of pre-replacement step.
 
     Remark. The function ``pre_replace`` can have ``np.nan`` in its output. In
@@ -328,9 +444,10 @@ def pre_replace_jacobian(pre_replacements, dim_in):
             be copied to the i_th position of the external parameter vector or -1 if no
             value has to be copied.
         dim_in (int): Dimension of the internal parameters.
+        sparse (bool): If True, the jacobian is returned as scipy.sparse.csr_matrix.
 
     Returns:
-        jacobian (np.ndarray): The jacobian.
+        jacobian (np.ndarray or scipy.sparse.csr_matrix): The jacobian.
 
     Examples:
         >>> # Note: The example is the same as in the doctest of pre_replace
@@ -346,12 +463,18 @@ def pre_replace_jacobian(pre_replacements, dim_in):
     position_in = pre_replacements[mask]
     position_out = np.arange(dim_out)[mask]
 
-    jacobian = np.zeros((dim_out, dim_in))
-    jacobian[position_out, position_in] = 1
+    if sparse:
+        jacobian = sp.csr_matrix(
+            (np.ones(len(position_in)), (position_out, position_in)),
+            shape=(dim_out, dim_in),
+        )
+    else:
+        jacobian = np.zeros((dim_out, dim_in))
+        jacobian[position_out, position_in] = 1
     return jacobian
 
 
-def transformation_jacobian(processed_constraints, pre_replaced):
+def transformation_jacobian(processed_constraints, pre_replaced, sparse=False):
     """Return Jacobian of constraint transformation step.
 
     The Jacobian of the constraint transformation step is build as a block matrix
@@ -364,20 +487,36 @@ def transformation_jacobian(processed_constraints, pre_replaced):
             dictionaries. Can have the types "linear", "probability", "covariance"
             and "sdcorr".
         pre_replaced (numpy.ndarray): 1d numpy array with pre-replaced params.
-        dim (int): The dimension of the external parameters.
+        sparse (bool): If True, the jacobian is returned as scipy.sparse.csr_matrix.
+            Only the blocks of constrained parameters are then stored densely.
 
     Returns:
-        jacobian (numpy.ndarray): The Jacobian.
+        jacobian (numpy.ndarray or scipy.sparse.csr_matrix): The Jacobian.
 
     """
     dim = len(pre_replaced)
-    jacobian = np.eye(dim)
+    is_unconstrained = np.ones(dim, dtype=bool)
+    rows, cols, values = [], [], []
 
     for constr in processed_constraints:
-        block_indices = constr["index"]
+        block_indices = np.asarray(constr["index"])
         jacobian_func = getattr(kt, f"{constr['type']}_from_internal_jacobian")
         jac = jacobian_func(pre_replaced[block_indices], constr)
-        jacobian[np.ix_(block_indices, block_indices)] = jac
+        is_unconstrained[block_indices] = False
+        rows.append(np.repeat(block_indices, len(block_indices)))
+        cols.append(np.tile(block_indices, len(block_indices)))
+        values.append(np.ravel(jac))
+
+    unconstrained = np.arange(dim)[is_unconstrained]
+    rows = np.concatenate([unconstrained, *rows]).astype(int)
+    cols = np.concatenate([unconstrained, *cols]).astype(int)
+    values = np.concatenate([np.ones(len(unconstrained)), *values])
+
+    if sparse:
+        jacobian = sp.csr_matrix((values, (rows, cols)), shape=(dim, dim))
+    else:
+        jacobian = np.zeros((dim, dim))
+        jacobian[rows, cols] = values
 
     return jacobian
 
@@ -406,11 +545,11 @@ def post_replace(external_values, post_replacements):
 
     mask = post_replacements >= 0
     positions = post_replacements[mask]
-    post_replaced[mask] = post_replaced[positions]
+    post_replaced[..., mask] = post_replaced[..., positions]
     return post_replaced
 
 
-def post_replace_jacobian(post_replacements):
+def post_replace_jacobian(post_replacements, sparse=False):
     """Return Jacobian of post-replacement step.
 
     Args:
@@ -418,10 +557,10 @@ def post_replace_jacobian(post_replacements):
             element contains the position a parameter in the transformed parameter
             vector that has to be copied to duplicated and copied to the i_th position
             of the external parameter vector.
-        dim (int): The dimension of the external parameters.
+        sparse (bool): If True, the jacobian is returned as scipy.sparse.csr_matrix.
 
     Returns:
-        jacobian (np.ndarray): The Jacobian.
+        jacobian (np.ndarray or scipy.sparse.csr_matrix): The Jacobian.
 
     Examples:
         >>> # Note: the example is the same as in the doctest of post_replace
@@ -435,11 +574,14 @@ def post_replace_jacobian(post_replacements):
 
     """
     dim = len(post_replacements)
-    mask = post_replacements >= 0
-    positions_in = post_replacements[mask]
-    positions_out = np.arange(dim)[mask]
+    # each external parameter is either kept or copied from exactly one position
+    positions_in = np.where(post_replacements >= 0, post_replacements, np.arange(dim))
 
-    jacobian = np.eye(dim)
-    jacobian[positions_out, :] *= 0
-    jacobian[positions_out, positions_in] = 1
+    if sparse:
+        jacobian = sp.csr_matrix(
+            (np.ones(dim), (np.arange(dim), positions_in)), shape=(dim, dim)
+        )
+    else:
+        jacobian = np.zeros((dim, dim))
+        jacobian[np.arange(dim), positions_in] = 1
     return jacobian
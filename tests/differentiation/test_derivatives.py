@@ -4,6 +4,8 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 import pytest
+import scipy.sparse as sp
+from estimagic.decorators import batch_criterion
 from estimagic.differentiation.derivatives import _consolidate_one_step_derivatives
 from estimagic.differentiation.derivatives import _convert_evaluation_data_to_frame
 from estimagic.differentiation.derivatives import (
@@ -14,8 +16,10 @@ from estimagic.differentiation.derivatives import _reshape_cross_step_evals
 from estimagic.differentiation.derivatives import _reshape_one_step_evals
 from estimagic.differentiation.derivatives import _reshape_two_step_evals
 from estimagic.differentiation.derivatives import _select_minimizer_along_axis
+from estimagic.differentiation.derivatives import directional_derivative
 from estimagic.differentiation.derivatives import first_derivative
 from estimagic.differentiation.derivatives import second_derivative
+from estimagic.differentiation.evaluation_cache import EvaluationCache
 from estimagic.examples.numdiff_functions import logit_loglike
 from estimagic.examples.numdiff_functions import logit_loglike_gradient
 from estimagic.examples.numdiff_functions import logit_loglike_hessian
@@ -306,6 +310,24 @@ def test__select_minimizer_along_axis():
     aaae(expected, got)
 
 
+def test_select_minimizer_along_axis_with_all_nan_errors():
+    der = np.array([[1.0, 2], [3, 4]])
+    err = np.array([[np.nan, 1], [np.nan, 0]])
+    got_der, got_err = _select_minimizer_along_axis(der, err)
+    aaae(got_der, [np.nan, 4])
+    aaae(got_err, [np.nan, 0])
+
+
+@pytest.mark.parametrize("method", methods)
+def test_first_derivative_richardson_with_all_methods(
+    example_function_jacobian_fixtures, method
+):
+    f = example_function_jacobian_fixtures["func"]
+    fprime = example_function_jacobian_fixtures["func_prime"]
+    calculated = first_derivative(f, np.ones(3), method=method, n_steps=3)
+    aaae(calculated["derivative"], fprime(np.ones(3)))
+
+
 def test_reshape_one_step_evals():
     n_steps, dim_f, dim_x = 2, 3, 4
     raw_evals_one_step = np.arange(2 * n_steps * dim_f * dim_x)
@@ -354,3 +376,367 @@ def test_reshape_cross_step_evals():
     got = _reshape_cross_step_evals(raw_evals_cross_step, n_steps, dim_x, f0)
     assert np.all(got.pos == expected_pos)
     assert np.all(got.neg == expected_neg)
+
+
+def test_first_derivative_evaluates_batch_criterion_in_one_call():
+    calls = []
+
+    @batch_criterion
+    def f(x):
+        calls.append(x.shape)
+        return (x**2).sum(axis=1)
+
+    x = np.arange(5.0)
+    calculated = first_derivative(f, x, n_cores=2)["derivative"]
+    aaae(calculated, 2 * x)
+    assert calls == [(11, 5)]
+
+
+def _banded(x):
+    return np.append(x[:-1] ** 2 * np.exp(x[1:]), x[-1] ** 3)
+
+
+def _banded_sparsity(dim):
+    return sp.diags([1, 1], [0, 1], shape=(dim, dim), format="csr")
+
+
+@pytest.mark.parametrize(
+    "method, n_steps", [("forward", 1), ("backward", 1), ("central", 1), ("central", 3)]
+)
+def test_first_derivative_with_sparsity(method, n_steps):
+    x = np.linspace(0.1, 1, 30)
+    n_evals = []
+
+    def func(x):
+        n_evals.append(1)
+        return _banded(x)
+
+    calculated = first_derivative(
+        func,
+        x,
+        method=method,
+        n_steps=n_steps,
+        sparsity=_banded_sparsity(len(x)),
+        n_cores=1,
+    )["derivative"]
+    expected = first_derivative(_banded, x, method=method, n_steps=n_steps)
+
+    assert sp.issparse(calculated)
+    aaae(calculated.toarray(), expected["derivative"])
+    # two colors per step and direction plus the evaluation at x
+    n_directions = 2 if method == "central" else 1
+    assert len(n_evals) == 2 * n_steps * n_directions + 1
+
+
+def test_first_derivative_with_sparsity_and_bounds():
+    x = np.linspace(0.1, 1, 10)
+    upper_bounds = np.append(np.full(9, np.inf), 1)
+    calculated = first_derivative(
+        _banded, x, upper_bounds=upper_bounds, sparsity=_banded_sparsity(len(x))
+    )["derivative"]
+    expected = first_derivative(_banded, x, upper_bounds=upper_bounds)["derivative"]
+    aaae(calculated.toarray(), expected)
+
+
+def test_first_derivative_with_sparsity_and_pandas_params():
+    params = pd.DataFrame({"value": np.linspace(0.1, 1, 5)}, index=list("abcde"))
+
+    def func(params):
+        return pd.Series(_banded(params["value"].to_numpy()), index=list("vwxyz"))
+
+    calculated = first_derivative(
+        func, params, sparsity=_banded_sparsity(5).toarray() != 0
+    )["derivative"]
+    expected = first_derivative(func, params)["derivative"]
+
+    assert isinstance(calculated.dtypes.iloc[0], pd.SparseDtype)
+    assert_frame_equal(calculated.sparse.to_dense(), expected)
+
+
+def test_first_derivative_with_sparsity_of_wrong_shape():
+    n_evals = []
+
+    def func(x):
+        n_evals.append(1)
+        return _banded(x)
+
+    with pytest.raises(ValueError):
+        first_derivative(func, np.ones(3), sparsity=np.ones((2, 3)))
+    # only f0 was evaluated, no perturbed parameters
+    assert len(n_evals) == 1
+
+
+def test_first_derivative_with_sparsity_info_only_contains_pattern_entries():
+    x = np.linspace(0.1, 1, 6)
+    pattern = _banded_sparsity(len(x))
+    res = first_derivative(_banded, x, n_steps=3, sparsity=pattern)
+
+    expected_entries = set(zip(*pattern.nonzero()))
+    for name in ["func_evals", "derivative_candidates"]:
+        index = res[name].index.to_frame(index=False)
+        entries = set(zip(index["dim_f"], index["dim_x"]))
+        assert entries == expected_entries
+
+    evals = res["func_evals"].loc[(1, 0)]["eval"]
+    for (dim_x, dim_f), value in evals.items():
+        step = res["func_evals"].loc[(1, 0, dim_x, dim_f), "step"]
+        x_perturbed = x.copy()
+        x_perturbed[dim_x] += step
+        assert value == pytest.approx(_banded(x_perturbed)[dim_f])
+
+
+def _polynomial(x):
+    return np.sum(x**3) + x[0] * x[1] * x[2] ** 2 + np.exp(x[3] * x[1])
+
+
+@pytest.mark.parametrize(
+    "method, expected_n_evals",
+    [
+        # f0, one step and upper triangle of two steps
+        ("forward", 1 + 4 + 10),
+        ("backward", 1 + 4 + 10),
+        # f0, one step and two steps in both directions
+        ("central_average", 1 + 8 + 20),
+        # f0, two steps and off-diagonal cross steps in both directions
+        ("central_cross", 1 + 20 + 12),
+    ],
+)
+def test_second_derivative_only_evaluates_needed_points(method, expected_n_evals):
+    n_evals = []
+
+    def func(x):
+        n_evals.append(1)
+        return _polynomial(x)
+
+    x = np.array([0.1, 0.5, -0.3, 1.2])
+    calculated = second_derivative(func, x, method=method, n_cores=1)["derivative"]
+    expected = second_derivative(_polynomial, x, method=method, fallback_methods=[])[
+        "derivative"
+    ]
+
+    assert len(n_evals) == expected_n_evals
+    aaae(calculated, expected)
+
+
+def test_second_derivative_falls_back_for_entries_at_bounds():
+    x = np.array([0.1, 0.5, -0.3, 1.2])
+    upper_bounds = np.array([np.inf, 0.5, np.inf, np.inf])
+    without_fallback = second_derivative(
+        _polynomial,
+        x,
+        upper_bounds=upper_bounds,
+        fallback_methods=[],
+    )["derivative"]
+    # all entries that involve the parameter at its bound are missing
+    assert np.isnan(without_fallback[1]).all()
+    assert np.isnan(without_fallback[:, 1]).all()
+    assert not np.isnan(np.delete(without_fallback, 1, axis=0)[:, [0, 2, 3]]).any()
+
+    with_fallback = second_derivative(
+        _polynomial,
+        x,
+        upper_bounds=upper_bounds,
+    )["derivative"]
+    expected = second_derivative(_polynomial, x)["derivative"]
+    aaae(with_fallback, expected, decimal=4)
+
+
+def test_second_derivative_with_invalid_fallback_methods():
+    with pytest.raises(ValueError):
+        second_derivative(np.sum, np.ones(2), fallback_methods=["richardson"])
+
+
+def test_derivatives_share_evaluation_cache():
+    n_evals = []
+
+    def func(x):
+        n_evals.append(1)
+        return {"value": _polynomial(x), "contributions": x**2}
+
+    x = np.array([0.1, 0.5, -0.3, 1.2])
+    cache = EvaluationCache()
+    jac = first_derivative(func, x, key="contributions", cache=cache)["derivative"]
+    # f0 and one forward and backward step per parameter
+    assert len(n_evals) == len(cache) == 9
+
+    hess = second_derivative(func, x, key="value", cache=cache)["derivative"]
+    assert cache.n_hits == 1
+
+    # evaluating again only uses the cache
+    n_evals.clear()
+    jac_again = first_derivative(func, x, key="contributions", cache=cache)
+    assert n_evals == []
+    aaae(jac_again["derivative"], jac)
+    aaae(hess, second_derivative(func, x, key="value")["derivative"])
+
+
+def test_evaluation_cache_does_not_store_failed_evaluations():
+    def func(x):
+        if x[0] > 1:
+            raise ValueError()
+        return x**2
+
+    cache = EvaluationCache()
+    first_derivative(func, np.ones(2), cache=cache)
+    assert np.ones(2) in cache
+    assert len(cache) == 4
+
+
+def test_first_derivative_complex_step_jacobian(binary_choice_inputs):
+    fix = binary_choice_inputs
+    func = partial(logit_loglikeobs, y=fix["y"], x=fix["x"])
+    calculated = first_derivative(func, fix["params_np"], method="complex")
+    expected = logit_loglikeobs_jacobian(fix["params_np"], fix["y"], fix["x"])
+    aaae(calculated["derivative"], expected, decimal=12)
+
+
+def test_first_derivative_complex_step_ignores_bounds(
+    example_function_jacobian_fixtures,
+):
+    f = example_function_jacobian_fixtures["func"]
+    fprime = example_function_jacobian_fixtures["func_prime"]
+    calculated = first_derivative(
+        f,
+        np.ones(3),
+        method="complex",
+        lower_bounds=np.ones(3),
+        upper_bounds=np.ones(3),
+        return_func_value=True,
+    )
+    aaae(calculated["derivative"], fprime(np.ones(3)), decimal=14)
+    aaae(calculated["func_value"], f(np.ones(3)))
+
+
+def test_first_derivative_complex_step_with_pandas_and_sparsity():
+    params = pd.DataFrame({"value": [0.5, 1.5, 2.0]}, index=["a", "b", "c"])
+
+    def func(params):
+        x = params["value"].to_numpy()
+        return pd.Series(np.exp(x) * x, index=["x", "y", "z"])
+
+    cache = EvaluationCache()
+    calculated = first_derivative(
+        func, params, method="complex", sparsity=np.eye(3), cache=cache
+    )
+    expected = np.diag(np.exp(params["value"]) * (1 + params["value"]))
+    aaae(calculated["derivative"].to_numpy(), expected, decimal=14)
+    # one evaluation at params and one with all parameters perturbed
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize("func", [np.abs, np.real, lambda x: x.astype(float)])
+def test_first_derivative_complex_step_detects_dropped_imaginary_part(func):
+    with pytest.raises(ValueError, match="propagates the imaginary part"):
+        first_derivative(func, np.arange(3.0), method="complex")
+
+
+def test_first_derivative_complex_step_with_richardson_extrapolation():
+    with pytest.raises(ValueError, match="n_steps has to be 1"):
+        first_derivative(np.exp, np.ones(2), method="complex", n_steps=2)
+
+
+@pytest.mark.parametrize("method", methods)
+def test_first_derivative_with_adaptive_richardson_extrapolation(
+    example_function_jacobian_fixtures, method
+):
+    f = example_function_jacobian_fixtures["func"]
+    fprime = example_function_jacobian_fixtures["func_prime"]
+    x = np.ones(3)
+
+    cache = EvaluationCache()
+    full = first_derivative(f, x, method=method, n_steps=6, cache=cache)
+    n_evals_full = len(cache)
+
+    cache = EvaluationCache()
+    adaptive = first_derivative(
+        f, x, method=method, n_steps=6, richardson_tol=1e-8, cache=cache
+    )
+
+    assert len(cache) < n_evals_full
+    aaae(adaptive["derivative"], fprime(x), decimal=6)
+    aaae(adaptive["derivative"], full["derivative"], decimal=6)
+
+
+def test_adaptive_richardson_extrapolation_stops_converged_parameters():
+    evaluated = []
+
+    def func(x):
+        evaluated.append(x.copy())
+        return np.array([2 * x[0], np.exp(x[1]) * np.sin(5 * x[1])])
+
+    x = np.array([1.0, 0.3])
+    first_derivative(func, x, method="forward", n_steps=6, richardson_tol=1e-8)
+    n_evals = (np.array(evaluated) != x).sum(axis=0)
+
+    # the linear parameter converges with the first three steps
+    assert n_evals[0] == 3
+    assert n_evals[1] > 3
+
+
+@pytest.mark.parametrize("method", methods + ["complex"])
+def test_directional_derivative(example_function_jacobian_fixtures, method):
+    f = example_function_jacobian_fixtures["func"]
+    fprime = example_function_jacobian_fixtures["func_prime"]
+    x = np.array([0.5, 1.0, 1.5])
+    directions = np.array([[1.0, 0.5], [-2, 0], [0.3, 1]])
+
+    calculated = directional_derivative(f, x, directions, method=method)
+    aaae(calculated["derivative"], fprime(x) @ directions, decimal=6)
+
+
+def test_directional_derivative_evaluations_scale_with_directions():
+    n_evals = []
+
+    def func(x):
+        n_evals.append(1)
+        return np.array([x @ x, x.sum()])
+
+    x = np.linspace(0.5, 1, 100)
+    direction = np.ones(100)
+    calculated = directional_derivative(func, x, direction)
+    aaae(calculated["derivative"], [2 * x.sum(), 100])
+    assert len(n_evals) == 3
+
+
+def test_directional_derivative_along_unit_vectors_equals_jacobian():
+    x = np.array([1.3, 0.7, 2.0])
+
+    def func(x):
+        return np.array([np.exp(x[0]) * np.sin(x[1]), x[0] ** 3 / x[1] + x[2]])
+
+    expected = first_derivative(func, x)["derivative"]
+    calculated = directional_derivative(func, x, np.eye(3))["derivative"]
+    aaae(calculated, expected, decimal=14)
+
+
+def test_directional_derivative_respects_bounds():
+    def func(x):
+        if x[0] < 1:
+            raise ValueError()
+        return np.array([x[0] ** 2, x[0] * x[1]])
+
+    x = np.array([1.0, 2.0])
+    directions = np.array([[1.0, -1], [1, 1]])
+    calculated = directional_derivative(
+        func,
+        x,
+        directions,
+        lower_bounds=np.array([1, -np.inf]),
+        error_handling="raise",
+    )
+    jacobian = np.array([[2, 0], [2, 1]])
+    aaae(calculated["derivative"], jacobian @ directions, decimal=6)
+
+
+def test_directional_derivative_with_pandas_inputs():
+    params = pd.DataFrame({"value": [1.0, 2, 3]}, index=["a", "b", "c"])
+    directions = pd.DataFrame(
+        [[0.0, 1], [1, 0], [0, 0]], index=["c", "b", "a"], columns=["u", "v"]
+    )
+
+    def func(params):
+        return (params["value"] ** 2).sum()
+
+    calculated = directional_derivative(func, params, directions)["derivative"]
+    expected = pd.Series([4.0, 6], index=["u", "v"])
+    pd.testing.assert_series_equal(calculated, expected, atol=1e-6)
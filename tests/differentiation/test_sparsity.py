@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from estimagic.differentiation.sparsity import color_columns
+from estimagic.differentiation.sparsity import decompress_evaluations
+from estimagic.differentiation.sparsity import process_sparsity
+from numpy.testing import assert_array_equal
+
+
+def _is_valid_coloring(pattern, colors):
+    pattern = pattern.toarray()
+    for color in np.unique(colors):
+        # no row may have more than one nonzero in the columns of one color
+        if (pattern[:, colors == color].sum(axis=1) > 1).any():
+            return False
+    return True
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_color_columns_gives_structurally_orthogonal_groups(seed):
+    pattern = sp.random(40, 30, density=0.05, random_state=seed, format="csc") != 0
+    colors = color_columns(pattern)
+    assert _is_valid_coloring(pattern, colors)
+    assert_array_equal(np.unique(colors), np.arange(colors.max() + 1))
+
+
+def test_color_columns_banded():
+    pattern = sp.diags([1, 1, 1], [-1, 0, 1], shape=(20, 20), format="csc")
+    colors = color_columns(pattern)
+    assert colors.max() + 1 == 3
+    assert _is_valid_coloring(pattern, colors)
+
+
+def test_color_columns_dense_needs_one_color_per_column():
+    colors = color_columns(sp.csc_matrix(np.ones((3, 4))))
+    assert_array_equal(np.sort(colors), np.arange(4))
+
+
+@pytest.mark.parametrize(
+    "sparsity",
+    [
+        np.array([[True, False], [True, True]]),
+        pd.DataFrame([[1, 0], [1, 1]]),
+        sp.coo_matrix([[2.0, 0], [1, 3]]),
+    ],
+)
+def test_process_sparsity(sparsity):
+    pattern = process_sparsity(sparsity, dim_x=2)
+    assert pattern.dtype == bool
+    assert_array_equal(pattern.toarray(), [[True, False], [True, True]])
+
+
+def test_process_sparsity_with_wrong_shape():
+    with pytest.raises(ValueError):
+        process_sparsity(np.ones((2, 3)), dim_x=2)
+    with pytest.raises(ValueError):
+        process_sparsity(np.ones(2), dim_x=2)
+
+
+def test_decompress_evaluations():
+    pattern = sp.csc_matrix(np.array([[1, 0, 0], [0, 1, 1]], dtype=bool))
+    colors = np.array([0, 0, 1])
+    # shape (2, 1, n_colors, dim_f)
+    group_evals = np.array([[[[11.0, 21], [10, 22]]], [[[9.0, 19], [10, 18]]]])
+    # entries in the order of pattern.tocoo(): (0, 0), (1, 1), (1, 2)
+    calculated = decompress_evaluations(group_evals, colors, pattern)
+    assert calculated.shape == (2, 1, 3)
+    assert_array_equal(calculated[0, 0], [11, 21, 22])
+    assert_array_equal(calculated[1, 0], [9, 19, 18])
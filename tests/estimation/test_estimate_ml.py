@@ -1,6 +1,8 @@
 import itertools
 
+import numpy as np
 import pytest
+from estimagic.differentiation.evaluation_cache import EvaluationCache
 from estimagic.estimation.estimate_ml import estimate_ml
 from estimagic.examples.logit import logit_derivative
 from estimagic.examples.logit import logit_hessian
@@ -45,3 +47,56 @@ def test_estimate_ml_with_logit_no_constraints(
         sm_res.conf_int().to_numpy(),
         decimal=3,
     )
+
+
+def test_estimate_ml_with_numerical_hessian_shares_evaluations(
+    logit_inputs, logit_object
+):
+    sm_res = logit_object.fit()
+    kwargs = {"y": logit_inputs["y"], "x": logit_inputs["x"]}
+    params = logit_inputs["params"].copy()
+    params["value"] = sm_res.params.to_numpy()
+
+    cache = EvaluationCache()
+    calculated = estimate_ml(
+        logit_loglike,
+        params,
+        loglike_kwargs=kwargs,
+        optimize_options=False,
+        hessian=None,
+        numdiff_options={"cache": cache},
+    )
+
+    aaae(
+        calculated["cov_hessian"].to_numpy(), sm_res.cov_params().to_numpy(), decimal=3
+    )
+    expected_hessian = logit_hessian(params, **kwargs)
+    aaae(calculated["hessian"] / expected_hessian, np.ones((4, 4)), decimal=3)
+
+    # the Hessian takes the function value and all points of the Jacobian from the
+    # cache, i.e. one forward and backward step per parameter
+    assert cache.n_hits == 1 + 2 * len(params)
+    assert len(cache) == 1 + 2 * len(params) ** 2
+    assert "hessian_numdiff_info" in calculated
+
+
+def test_estimate_ml_with_complex_step_jacobian(logit_inputs, logit_object):
+    sm_res = logit_object.fit()
+    kwargs = {"y": logit_inputs["y"], "x": logit_inputs["x"]}
+    params = logit_inputs["params"].copy()
+    params["value"] = sm_res.params.to_numpy()
+
+    calculated = estimate_ml(
+        logit_loglike,
+        params,
+        loglike_kwargs=kwargs,
+        optimize_options=False,
+        hessian=None,
+        numdiff_options={"method": "complex"},
+    )
+
+    expected_jacobian = logit_derivative(params, **kwargs)["contributions"]
+    aaae(calculated["jacobian"], expected_jacobian, decimal=12)
+    aaae(
+        calculated["cov_hessian"].to_numpy(), sm_res.cov_params().to_numpy(), decimal=3
+    )
@@ -80,6 +80,29 @@ def test_estimate_msm(simulate_moments, moments_cov):
     aaae(calculated_cov, expected_cov)
 
 
+@pytest.mark.parametrize("transformation_method", ["sampling", "delta"])
+def test_estimate_msm_with_constraints(transformation_method):
+    start_params = pd.DataFrame({"value": [3, 2, 2.0]})
+    empirical_moments = np.zeros(3)
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Standard matrix inversion failed")
+        calculated = estimate_msm(
+            simulate_moments=_sim_np,
+            empirical_moments=empirical_moments,
+            moments_cov=cov_np,
+            params=start_params,
+            optimize_options={"algorithm": "scipy_lbfgsb"},
+            constraints=[{"loc": [1, 2], "type": "equality"}],
+            transformation_method=transformation_method,
+        )
+
+    # the equal parameters are estimated from two moments with variances 2 and 3
+    expected_cov = np.diag([1, 1 / (1 / 2 + 1 / 3)])
+    decimal = 6 if transformation_method == "delta" else 1
+    aaae(calculated["cov"].to_numpy(), expected_cov, decimal=decimal)
+
+
 def test_check_and_process_numdiff_options_with_invalid_entries():
     with pytest.raises(ValueError):
         check_numdiff_options({"func": lambda x: x}, "estimate_msm")
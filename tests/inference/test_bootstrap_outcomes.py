@@ -78,3 +78,29 @@ def test_get_bootstrap_estimates_with_some_errors_and_continue(data):
         )
 
     assert 30 <= len(res) <= 70
+
+
+@pytest.mark.parametrize("n_cores", [1, 2])
+def test_bootstrap_estimates_with_shared_data(data, n_cores):
+    data = data.copy()
+    data["group"] = ["a", "b", "a", "b"]
+    data.index = pd.MultiIndex.from_tuples(
+        [(0, 1), (0, 2), (1, 1), (1, 2)], names=["id", "period"]
+    )
+
+    def outcome(sample):
+        assert sample.index.names == ["id", "period"]
+        return sample.groupby("group")[["x1", "x2"]].sum().stack()
+
+    kwargs = {
+        "indices": [np.array([1, 3, 3, 0]), np.array([0, 2, 2, 1])],
+        "data": data,
+        "outcome": outcome,
+        "n_cores": n_cores,
+        "error_handling": "raise",
+        "batch_evaluator": joblib_batch_evaluator,
+    }
+
+    calculated = _get_bootstrap_outcomes_from_indices(**kwargs, share_data=True)
+    expected = _get_bootstrap_outcomes_from_indices(**kwargs, share_data=False)
+    afe(calculated, expected)
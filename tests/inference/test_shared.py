@@ -2,6 +2,9 @@ import numpy as np
 import pandas as pd
 import pytest
 from estimagic.inference.shared import process_pandas_arguments
+from estimagic.inference.shared import transform_covariance
+from estimagic.parameters.parameter_conversion import get_reparametrize_functions
+from numpy.testing import assert_array_almost_equal as aaae
 
 
 @pytest.fixture
@@ -30,3 +33,62 @@ def test_process_pandas_arguments_incompatible_names(inputs):
 
     with pytest.raises(ValueError):
         process_pandas_arguments(**inputs)
+
+
+@pytest.mark.parametrize("bounds_handling", ["clip", "ignore"])
+def test_transform_covariance_matches_draw_by_draw_transformation(bounds_handling):
+    params = pd.DataFrame({"value": [0.2, 0.3, 0.5, 1, 0.1, 2, 0.2, 0.3, 3, 1, 1]})
+    params["lower_bound"] = [-np.inf] * 9 + [0.99, -np.inf]
+    constraints = [
+        {"loc": [0, 1, 2], "type": "probability"},
+        {"loc": [3, 4, 5, 6, 7, 8], "type": "covariance"},
+        {"loc": [9, 10], "type": "equality"},
+    ]
+    internal_cov = np.eye(9) * 1e-3
+
+    np.random.seed(0)
+    calculated = transform_covariance(
+        params, internal_cov, constraints, 1_000, bounds_handling
+    )
+
+    to_internal, from_internal = get_reparametrize_functions(params, constraints)
+    np.random.seed(0)
+    sample = np.random.multivariate_normal(
+        mean=to_internal(params), cov=internal_cov, size=1_000
+    )
+    if bounds_handling == "clip":
+        sample[:, 8] = np.clip(sample[:, 8], 0.99, np.inf)
+    transformed = np.array([from_internal(x) for x in sample])
+    free = [0, 1, 3, 4, 5, 6, 7, 8, 9]
+    expected = np.cov(transformed[:, free], rowvar=False)
+
+    assert calculated.index.tolist() == free
+    aaae(calculated.to_numpy(), expected)
+
+
+def test_transform_covariance_with_delta_method_is_close_to_sampling():
+    params = pd.DataFrame({"value": [0.2, 0.3, 0.5, 1, 0.1, 2, 0.2, 0.3, 3, 1, 1]})
+    constraints = [
+        {"loc": [0, 1, 2], "type": "probability"},
+        {"loc": [3, 4, 5, 6, 7, 8], "type": "covariance"},
+        {"loc": [9, 10], "type": "equality"},
+    ]
+    internal_cov = np.diag(np.arange(1, 10) * 1e-4)
+
+    np.random.seed(0)
+    sampled = transform_covariance(
+        params, internal_cov, constraints, 100_000, "ignore", method="sampling"
+    )
+    delta = transform_covariance(
+        params, internal_cov, constraints, 100_000, "ignore", method="delta"
+    )
+
+    assert delta.index.equals(sampled.index)
+    np.testing.assert_allclose(np.diag(delta), np.diag(sampled), rtol=0.02)
+    np.testing.assert_allclose(delta, sampled, atol=1e-4)
+
+
+def test_transform_covariance_with_invalid_method():
+    params = pd.DataFrame({"value": [1, 2.0]})
+    with pytest.raises(ValueError):
+        transform_covariance(params, np.eye(2), [], 10, "ignore", method="bootstrap")
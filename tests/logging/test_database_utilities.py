@@ -6,14 +6,20 @@ import pandas as pd
 import pytest
 import sqlalchemy
 from estimagic.logging.database_utilities import append_row
+from estimagic.logging.database_utilities import BinaryArrayPickler
+from estimagic.logging.database_utilities import buffered_logging
 from estimagic.logging.database_utilities import load_database
 from estimagic.logging.database_utilities import make_optimization_iteration_table
 from estimagic.logging.database_utilities import make_optimization_problem_table
 from estimagic.logging.database_utilities import make_steps_table
+from estimagic.logging.database_utilities import migrate_array_storage
 from estimagic.logging.database_utilities import read_last_rows
 from estimagic.logging.database_utilities import read_new_rows
 from estimagic.logging.database_utilities import read_table
+from estimagic.logging.database_utilities import RobustPickler
 from estimagic.logging.database_utilities import update_row
+from joblib import delayed
+from joblib import Parallel
 from numpy.testing import assert_array_equal
 from sqlalchemy import Float
 from sqlalchemy import PickleType
@@ -277,3 +283,146 @@ def test_read_table(tmp_path, iteration_data):
 
     assert table["rowid"] == list(range(1, 11))
     assert table["step"] == [1, 0] * 5
+
+
+@pytest.mark.parametrize("buffer_size", [1, 3, 1000])
+def test_buffered_logging(tmp_path, iteration_data, buffer_size):
+    path = tmp_path / "test.db"
+    database = load_database(path=path)
+    make_optimization_iteration_table(database, first_eval={"output": 0.5})
+    with buffered_logging(database, path, False, buffer_size=buffer_size):
+        for i in range(1, 11):
+            iteration_data["value"] = i
+            append_row(iteration_data, "optimization_iterations", database, path, False)
+        update_row({"value": 20}, 8, "optimization_iterations", database, path, False)
+
+        # reading flushes the buffer
+        res = read_last_rows(
+            database=database,
+            table_name="optimization_iterations",
+            n_rows=3,
+            return_type="dict_of_lists",
+            path=path,
+        )["value"]
+        assert res == [20, 9, 10]
+
+        append_row(iteration_data, "optimization_iterations", database, path, False)
+
+    res = read_table(database, "optimization_iterations", "dict_of_lists")["value"]
+    assert res == [1, 2, 3, 4, 5, 6, 7, 20, 9, 10, 10]
+
+
+def test_buffered_logging_flushes_after_exception(tmp_path, iteration_data):
+    path = tmp_path / "test.db"
+    database = load_database(path=path)
+    make_optimization_iteration_table(database, first_eval={"output": 0.5})
+    with pytest.raises(ZeroDivisionError):
+        with buffered_logging(database, path, False, interval=100):
+            append_row(iteration_data, "optimization_iterations", database, path, False)
+            1 / 0
+
+    res = read_table(database, "optimization_iterations", "dict_of_lists")
+    assert res["value"] == [5.0]
+
+
+@pytest.mark.parametrize("backend", ["loky", "multiprocessing"])
+def test_buffered_logging_collects_rows_from_workers(tmp_path, backend, monkeypatch):
+    path = tmp_path / "test.db"
+    database = load_database(path=path)
+    make_optimization_iteration_table(database, first_eval={"output": 0.5})
+
+    with buffered_logging(database, path, False, collect_from_workers=True) as writer:
+        # forked workers would fail if they wrote to the database themselves
+        monkeypatch.setattr(
+            "estimagic.logging.database_utilities._execute_write_statement", None
+        )
+        Parallel(n_jobs=2, backend=backend)(
+            delayed(append_row)(
+                {"value": float(i)},
+                "optimization_iterations",
+                database,
+                path,
+                False,
+                writer.log_queue,
+            )
+            for i in range(10)
+        )
+
+    res = read_table(database, "optimization_iterations", "dict_of_lists")["value"]
+    assert sorted(res) == list(range(10))
+
+
+binary_pickler_cases = [
+    np.arange(5.0),
+    np.arange(6).reshape(2, 3),
+    np.array(3.0),
+    np.ones((2, 0)),
+    np.arange(4.0)[::2],
+    np.array([True, False]),
+    {"value": np.arange(3.0), "contributions": np.ones((2, 3))},
+    {"value": np.arange(3.0), "bla": "blubb"},
+    pd.Series([1.0, 2.0], index=["a", "b"]),
+    [1, 2],
+    np.array(["a", "b"]),
+]
+
+
+@pytest.mark.parametrize("obj", binary_pickler_cases)
+def test_binary_array_pickler_round_trip(obj):
+    res = RobustPickler.loads(BinaryArrayPickler.dumps(obj))
+    if isinstance(obj, dict):
+        assert res.keys() == obj.keys()
+        for key, val in obj.items():
+            assert_array_equal(res[key], val)
+    elif isinstance(obj, pd.Series):
+        pd.testing.assert_series_equal(res, obj)
+    else:
+        assert_array_equal(res, obj)
+        assert np.asarray(res).dtype == np.asarray(obj).dtype
+
+
+@pytest.mark.parametrize("array_storage", ["pickle", "binary"])
+def test_array_storage_of_optimization_iterations(tmp_path, array_storage):
+    path = tmp_path / "test.db"
+    database = load_database(path=path)
+    first_eval = {"output": {"contributions": np.ones(3), "value": 3.0}}
+    make_optimization_iteration_table(
+        database, first_eval=first_eval, array_storage=array_storage
+    )
+    data = {
+        "params": np.arange(4.0),
+        "internal_derivative": {"contributions": np.ones((3, 4))},
+        "contributions": pd.Series(np.ones(3)),
+        "value": 3.0,
+    }
+    append_row(data, "optimization_iterations", database, path, False)
+
+    # reflect the database to check that other processes can read it
+    reflected = load_database(path=path)
+    res = read_table(reflected, "optimization_iterations", "list_of_dicts")[0]
+    assert_array_equal(res["params"], data["params"])
+    assert_array_equal(res["internal_derivative"]["contributions"], np.ones((3, 4)))
+    pd.testing.assert_series_equal(res["contributions"], data["contributions"])
+
+
+def test_migrate_array_storage(tmp_path):
+    path = tmp_path / "test.db"
+    database = load_database(path=path)
+    make_optimization_iteration_table(database, first_eval={"output": 0.5})
+    for i in range(3):
+        data = {"params": np.arange(3.0) + i, "internal_derivative": None}
+        append_row(data, "optimization_iterations", database, path, False)
+
+    migrate_array_storage(path, array_storage="binary")
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        raw = list(connection.execute("SELECT params FROM optimization_iterations"))
+    assert all(row[0].startswith(b"\x00EA1") for row in raw)
+
+    res = read_table(
+        load_database(path=path), "optimization_iterations", "dict_of_lists"
+    )
+    for i, params in enumerate(res["params"]):
+        assert_array_equal(params, np.arange(3.0) + i)
+    assert res["internal_derivative"] == [None] * 3
@@ -0,0 +1,236 @@
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from bokeh.document import Document
+from estimagic.config import IS_PYARROW_INSTALLED
+from estimagic.dashboard.dashboard_app import dashboard_app
+from estimagic.examples.criterion_functions import sos_dict_criterion
+from estimagic.exceptions import TableExistsError
+from estimagic.logging.database_utilities import append_row
+from estimagic.logging.database_utilities import load_database
+from estimagic.logging.database_utilities import make_optimization_iteration_table
+from estimagic.logging.database_utilities import make_steps_table
+from estimagic.logging.database_utilities import read_last_rows
+from estimagic.logging.database_utilities import read_new_rows
+from estimagic.logging.database_utilities import read_specific_row
+from estimagic.logging.database_utilities import read_table
+from estimagic.logging.database_utilities import update_row
+from estimagic.logging.log_backends import ArrowBackend
+from estimagic.logging.log_backends import LogBackend
+from estimagic.logging.read_log import OptimizationHistoryReader
+from estimagic.logging.read_log import read_optimization_histories
+from estimagic.logging.read_log import read_steps_table
+from estimagic.optimization.optimize import minimize
+from numpy.testing import assert_array_almost_equal as aaae
+
+pytestmark = pytest.mark.skipif(
+    not IS_PYARROW_INSTALLED, reason="pyarrow is not installed."
+)
+
+
+@pytest.fixture
+def iteration_data():
+    data = {
+        "params": np.ones(1),
+        "timestamp": datetime(year=2020, month=4, day=9, hour=12, minute=41, second=1),
+        "value": 5.0,
+    }
+    return data
+
+
+@pytest.fixture
+def database(tmp_path, iteration_data):
+    path = tmp_path / "test.arrow"
+    database = load_database(path=path)
+    make_optimization_iteration_table(database, first_eval={"output": 0.5})
+    for i in range(1, 11):
+        data = {**iteration_data, "value": i, "step": i % 2}
+        append_row(data, "optimization_iterations", database, path, False)
+    return database
+
+
+def test_load_database_returns_arrow_backend(database):
+    assert isinstance(database, ArrowBackend)
+    assert load_database(path=database.path) is database
+    assert load_database(database) is database
+
+
+def test_read_new_rows(database, iteration_data):
+    res, last = read_new_rows(
+        database=database,
+        table_name="optimization_iterations",
+        last_retrieved=3,
+        return_type="list_of_dicts",
+        limit=4,
+    )
+    assert [row["rowid"] for row in res] == [4, 5, 6, 7]
+    assert last == 7
+    assert res[0]["timestamp"] == iteration_data["timestamp"]
+    aaae(res[0]["params"], np.ones(1))
+    assert res[0]["internal_derivative"] is None
+
+
+def test_read_new_rows_stride_and_step(database):
+    res, _ = read_new_rows(
+        database=database,
+        table_name="optimization_iterations",
+        last_retrieved=1,
+        return_type="dict_of_lists",
+        stride=2,
+    )
+    assert res["rowid"] == [2, 4, 6, 8, 10]
+
+    res, _ = read_new_rows(
+        database=database,
+        table_name="optimization_iterations",
+        last_retrieved=0,
+        return_type="dict_of_lists",
+        step=1,
+    )
+    assert res["value"] == [1, 3, 5, 7, 9]
+
+
+def test_read_last_rows(database):
+    res = read_last_rows(
+        database=database,
+        table_name="optimization_iterations",
+        n_rows=3,
+        return_type="dict_of_lists",
+    )
+    assert res["rowid"] == [8, 9, 10]
+
+    res = read_last_rows(
+        database=database,
+        table_name="optimization_iterations",
+        n_rows=2,
+        return_type="list_of_dicts",
+        stride=3,
+    )
+    assert [row["rowid"] for row in res] == [6, 9]
+
+
+def test_update_and_read_specific_row(database):
+    update_row({"value": 20}, 8, "optimization_iterations", database, None, False)
+    res = read_specific_row(database, "optimization_iterations", 8, "list_of_dicts")
+    assert res[0]["value"] == 20
+    res = read_table(database, "optimization_iterations", "dict_of_lists")
+    assert res["value"] == [1, 2, 3, 4, 5, 6, 7, 20, 9, 10]
+
+
+def test_rows_from_other_instances_are_appended(database, iteration_data):
+    # unpickling creates a new instance as in a worker process
+    other = pickle.loads(pickle.dumps(database))
+    assert other is not database
+    append_row(iteration_data, "optimization_iterations", other, None, False)
+    other.flush()
+
+    res = read_last_rows(database, "optimization_iterations", 2, "dict_of_lists")
+    assert res["rowid"] == [10, 11]
+
+
+def test_orphaned_empty_segment_does_not_block_later_rows(database, iteration_data):
+    database.flush()
+    directory = database.path / "optimization_iterations"
+    n_files = len(list(directory.glob("*.arrow")))
+    # an empty file, e.g. left over by an interrupted write
+    (directory / f"{n_files:012d}.arrow").touch()
+    other = pickle.loads(pickle.dumps(database))
+    append_row(iteration_data, "optimization_iterations", other, None, False)
+    other.flush()
+
+    res = read_last_rows(database, "optimization_iterations", 2, "dict_of_lists")
+    assert res["rowid"] == [10, 11]
+    assert res["value"] == [10, iteration_data["value"]]
+    assert not list(directory.glob("*.tmp"))
+
+
+def test_incomplete_log_backend_cannot_be_instantiated():
+    class IncompleteBackend(LogBackend):
+        def append_rows(self, table_name, rows):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_history_reader(database):
+    reader = OptimizationHistoryReader(database, last_retrieved=2, stride=2)
+    res = reader.read_new_rows(limit=3)
+    aaae(res["rowid"], [4, 6, 8])
+    aaae(res["value"], [4, 6, 8])
+    assert res["params"].shape == (3, 1)
+    aaae(reader.read_new_rows()["rowid"], [10])
+
+
+def test_if_exists(database):
+    make_steps_table(database)
+    append_row({"status": "running"}, "steps", database, None, False)
+    with pytest.raises(TableExistsError):
+        make_steps_table(database, if_exists="raise")
+    make_steps_table(database, if_exists="extend")
+    assert len(read_table(database, "steps", "list_of_dicts")) == 1
+    make_steps_table(database, if_exists="replace")
+    assert read_table(database, "steps", "list_of_dicts") == []
+
+
+def test_multistart_with_arrow_log_and_pool_evaluator(tmp_path):
+    params = pd.DataFrame(
+        {"value": [1.0, 2, 3], "lower_bound": -5.0, "upper_bound": 10.0}
+    )
+
+    n_rows = []
+    for suffix in ["db", "arrow"]:
+        path = tmp_path / f"log.{suffix}"
+        minimize(
+            criterion=sos_dict_criterion,
+            params=params,
+            algorithm="scipy_lbfgsb",
+            logging=path,
+            multistart=True,
+            multistart_options={"n_cores": 2, "batch_evaluator": "pool"},
+        )
+        database = load_database(path=path)
+        rows = read_table(
+            database, "optimization_iterations", return_type="list_of_dicts"
+        )
+        n_rows.append(len(rows))
+
+    assert n_rows[0] == n_rows[1]
+
+
+def test_minimize_with_arrow_log(tmp_path):
+    params = pd.DataFrame({"value": [1.0, 2, 3]})
+
+    histories = []
+    for suffix in ["db", "arrow"]:
+        path = tmp_path / f"log.{suffix}"
+        minimize(
+            criterion=sos_dict_criterion,
+            params=params,
+            algorithm="scipy_lbfgsb",
+            logging=path,
+        )
+        histories.append(read_optimization_histories(path))
+        assert read_steps_table(path)["status"].tolist() == ["complete"]
+
+    sqlite, arrow = histories
+    pd.testing.assert_frame_equal(sqlite["params"], arrow["params"])
+    pd.testing.assert_series_equal(sqlite["values"], arrow["values"])
+    pd.testing.assert_frame_equal(sqlite["contributions"], arrow["contributions"])
+
+    session_data = {"last_retrieved": 0, "database_path": path, "callbacks": {}}
+    updating_options = {
+        "rollover": 10_000,
+        "jump": False,
+        "update_frequency": 0.1,
+        "update_chunk": 30,
+        "stride": 1,
+    }
+    dashboard_app(
+        doc=Document(),
+        session_data=session_data,
+        updating_options=updating_options,
+    )
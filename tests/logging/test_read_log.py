@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import numpy as np
 import pandas as pd
 import pytest
@@ -6,8 +8,10 @@ from estimagic.logging.database_utilities import append_row
 from estimagic.logging.database_utilities import load_database
 from estimagic.logging.database_utilities import make_optimization_iteration_table
 from estimagic.logging.database_utilities import make_optimization_problem_table
+from estimagic.logging.read_log import OptimizationHistoryReader
 from estimagic.logging.read_log import read_optimization_iteration
 from estimagic.logging.read_log import read_start_params
+from numpy.testing import assert_array_equal
 from pandas.testing import assert_frame_equal
 
 
@@ -55,3 +59,57 @@ def test_read_optimization_iteration(tmp_path):
 def test_non_existing_database_raises_error():
     with pytest.raises(FileNotFoundError):
         read_optimization_iteration("i_do_not_exist.db", -1)
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    path = tmp_path / "test.db"
+    database = load_database(path=path)
+    make_optimization_iteration_table(database, first_eval={"output": 0.5})
+    for i in range(1, 7):
+        data = {
+            "params": np.array([i, -i]),
+            "timestamp": datetime(2021, 1, 1, 0, 0, i),
+            "step": i % 2,
+        }
+        # every third row only contains a derivative
+        if i % 3 != 0:
+            data["value"] = float(i)
+        append_row(data, "optimization_iterations", database, path, False)
+    return path
+
+
+def test_history_reader_reads_incrementally(history_path):
+    reader = OptimizationHistoryReader(history_path)
+
+    first = reader.read_new_rows(limit=4)
+    assert_array_equal(first["rowid"], [1, 2, 3, 4])
+    assert_array_equal(first["value"], [1, 2, np.nan, 4])
+    assert_array_equal(first["params"], [[1, -1], [2, -2], [3, -3], [4, -4]])
+    assert first["timestamp"].dtype == np.dtype("datetime64[ns]")
+    assert first["timestamp"][0] == np.datetime64("2021-01-01T00:00:01")
+    assert reader.last_retrieved == 4
+
+    database = load_database(path=history_path)
+    data = {"params": np.array([7, -7])}
+    append_row(data, "optimization_iterations", database, history_path, False)
+
+    second = reader.read_new_rows()
+    assert_array_equal(second["rowid"], [5, 6, 7])
+    assert_array_equal(second["params"][-1], [7, -7])
+    assert np.isnat(second["timestamp"][-1])
+
+    empty = reader.read_new_rows()
+    assert empty["params"].shape == (0, 2)
+    assert reader.last_retrieved == 7
+
+    reader.reset(5)
+    assert_array_equal(reader.read_new_rows()["rowid"], [6, 7])
+
+
+def test_history_reader_with_stride_and_step(history_path):
+    reader = OptimizationHistoryReader(history_path, last_retrieved=1, stride=2)
+    assert_array_equal(reader.read_new_rows()["rowid"], [2, 4, 6])
+
+    reader = OptimizationHistoryReader(history_path, step=1)
+    assert_array_equal(reader.read_new_rows()["value"], [1, np.nan, 5])
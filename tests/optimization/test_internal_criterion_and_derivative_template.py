@@ -11,6 +11,7 @@ from estimagic.examples.criterion_functions import sos_dict_criterion_with_pd_ob
 from estimagic.examples.criterion_functions import sos_gradient
 from estimagic.examples.criterion_functions import sos_pandas_gradient
 from estimagic.examples.criterion_functions import sos_scalar_criterion
+from estimagic.optimization.internal_criterion_template import _broyden_update
 from estimagic.optimization.internal_criterion_template import _penalty_contributions
 from estimagic.optimization.internal_criterion_template import (
     _penalty_contributions_derivative,
@@ -23,6 +24,7 @@ from estimagic.optimization.internal_criterion_template import (
 )
 from estimagic.optimization.internal_criterion_template import _penalty_value
 from estimagic.optimization.internal_criterion_template import _penalty_value_derivative
+from estimagic.optimization.internal_criterion_template import BROYDEN_CACHE_KEY
 from estimagic.optimization.internal_criterion_template import (
     internal_criterion_and_derivative_template,
 )
@@ -232,3 +234,63 @@ def test_penalty_derivatives(func, deriv):
     expected = first_derivative(partialed, x)
 
     aaae(calculated, expected["derivative"])
+
+
+def test_broyden_updates_of_numerical_jacobian(base_inputs):
+    n_evals = []
+    weights = np.arange(10).reshape(2, 5) / 10
+
+    def criterion(params):
+        n_evals.append(1)
+        x = params["value"].to_numpy()
+        root_contributions = weights @ x + 1
+        return {
+            "root_contributions": root_contributions,
+            "value": root_contributions @ root_contributions,
+        }
+
+    inputs = base_inputs.copy()
+    inputs["algorithm_info"] = {
+        **inputs["algorithm_info"],
+        "primary_criterion_entry": "root_contributions",
+    }
+    inputs["criterion"] = criterion
+    inputs["derivative"] = None
+    inputs["criterion_and_derivative"] = None
+    inputs["direction"] = "minimize"
+    inputs["numdiff_options"] = {"method": "forward", "n_broyden_updates": 2}
+    inputs["cache"] = {}
+    inputs.pop("x")
+
+    xs = [np.arange(5.0) + 0.1 * i for i in range(4)]
+    for x in xs:
+        n_evals.clear()
+        jac = internal_criterion_and_derivative_template(x, task="derivative", **inputs)
+        # updates are exact for linear functions
+        aaae(jac, weights)
+        # new jacobians need one evaluation per parameter, updates only one in total
+        assert len(n_evals) == (1 if x is xs[1] or x is xs[2] else 6)
+
+    assert inputs["cache"][BROYDEN_CACHE_KEY]["n_updates"] == 0
+
+    # a different local optimization does not update the jacobian of this one
+    n_evals.clear()
+    inputs["fixed_log_data"] = {"step": 1}
+    x = np.arange(5.0) - 1
+    internal_criterion_and_derivative_template(x, task="derivative", **inputs)
+    assert len(n_evals) == 6
+    assert inputs["cache"][BROYDEN_CACHE_KEY]["step"] == 1
+
+
+def test_broyden_update_satisfies_secant_condition():
+    state = {"x": np.zeros(2), "f": np.zeros(3), "jacobian": np.ones((3, 2))}
+    x = np.array([0.5, 1])
+    f = np.array([1.0, 2, 1.6])
+    updated = _broyden_update(state, x, f)
+    aaae(updated @ x, f)
+
+
+def test_broyden_update_is_rejected_if_linear_model_degrades():
+    state = {"x": np.zeros(2), "f": np.zeros(2), "jacobian": np.eye(2)}
+    assert _broyden_update(state, np.ones(2), -np.ones(2)) is None
+    assert _broyden_update(state, np.zeros(2), np.ones(2)) is None
@@ -6,6 +6,8 @@ import pytest
 from estimagic.decorators import switch_sign
 from estimagic.examples.criterion_functions import sos_dict_criterion
 from estimagic.examples.criterion_functions import sos_scalar_criterion
+from estimagic.examples.logit import logit_derivative
+from estimagic.examples.logit import logit_loglike
 from estimagic.logging.database_utilities import load_database
 from estimagic.logging.database_utilities import read_new_rows
 from estimagic.logging.read_log import read_steps_table
@@ -162,3 +164,84 @@ def test_error_is_raised_with_transforming_constraints(params):
 def _params_list_to_aray(params_list):
     data = [params["value"].tolist() for params in params_list]
     return np.array(data)
+
+
+@pytest.mark.slow
+def test_multistart_with_pool_batch_evaluator(params):
+    res = minimize(
+        criterion=sos_dict_criterion,
+        params=params,
+        algorithm="scipy_lbfgsb",
+        multistart=True,
+        multistart_options={"n_cores": 2, "batch_evaluator": "pool"},
+        numdiff_options={"n_cores": 2, "batch_evaluator": "pool"},
+    )
+    aaae(res["solution_params"]["value"], np.zeros(4))
+
+
+@pytest.mark.parametrize("n_cores", [1, 2])
+def test_multistart_with_asynchronous_scheduling(params, tmp_path, n_cores):
+    path = tmp_path / "logging.db"
+    res = minimize(
+        criterion=sos_dict_criterion,
+        params=params,
+        algorithm="scipy_lbfgsb",
+        multistart=True,
+        multistart_options={"n_cores": n_cores, "scheduling": "asynchronous"},
+        logging=path,
+    )
+    aaae(res["solution_params"]["value"], np.zeros(4))
+
+    steps = read_steps_table(path)
+    optimizations = steps.query("type == 'optimization'")
+    assert set(optimizations["status"]) <= {"complete", "skipped"}
+    assert (optimizations["status"] == "complete").any()
+
+
+def test_multistart_with_invalid_scheduling(params):
+    with pytest.raises(ValueError):
+        minimize(
+            criterion=sos_dict_criterion,
+            params=params,
+            algorithm="scipy_lbfgsb",
+            multistart=True,
+            multistart_options={"scheduling": "eager"},
+        )
+
+
+def test_multistart_with_asynchronous_scheduling_warns_about_batch_evaluator(params):
+    with pytest.warns(UserWarning, match="batch_evaluator"):
+        res = minimize(
+            criterion=sos_dict_criterion,
+            params=params,
+            algorithm="scipy_lbfgsb",
+            multistart=True,
+            multistart_options={
+                "scheduling": "asynchronous",
+                "batch_evaluator": "joblib",
+            },
+        )
+    aaae(res["solution_params"]["value"], np.zeros(4))
+
+
+def test_multistart_with_contributions_based_optimizer(logit_inputs):
+    kwargs = {"y": logit_inputs["y"], "x": logit_inputs["x"]}
+    params = logit_inputs["params"].copy()
+    params["soft_lower_bound"] = [-15, -1, -1, 0]
+    params["soft_upper_bound"] = [-5, 5, 1, 4]
+
+    res = maximize(
+        criterion=logit_loglike,
+        params=params,
+        algorithm="bhhh",
+        criterion_kwargs=kwargs,
+        derivative=logit_derivative,
+        derivative_kwargs=kwargs,
+        multistart=True,
+    )
+
+    # the best local optimum has the largest sum of log-likelihood contributions
+    local_optima = res["multistart_info"]["local_optima"]
+    best_loglike = max(np.sum(opt["solution_criterion"]) for opt in local_optima)
+    assert np.sum(res["solution_criterion"]) == best_loglike
+    assert {opt["primary_criterion_entry"] for opt in local_optima} == {"contributions"}
@@ -1,8 +1,15 @@
 """Tests for (almost) algorithm independent properties of maximize and minimize."""
+from itertools import product
+
 import numpy as np
 import pandas as pd
 import pytest
+from estimagic.decorators import batch_criterion
+from estimagic.decorators import numpy_params
 from estimagic.examples.criterion_functions import sos_scalar_criterion
+from estimagic.logging.database_utilities import load_database
+from estimagic.logging.database_utilities import read_table
+from estimagic.logging.read_log import read_steps_table
 from estimagic.optimization.optimize import maximize
 from estimagic.optimization.optimize import minimize
 
@@ -19,6 +26,19 @@ def test_sign_is_switched_back_after_maximization():
     assert np.allclose(res["solution_criterion"], 1)
 
 
+def test_minimize_with_complex_step_derivatives():
+    params = pd.DataFrame({"value": [1.0, 2, 3, 4]})
+    constraints = [{"loc": [1, 2], "type": "increasing"}, {"loc": 3, "type": "fixed"}]
+    res = minimize(
+        criterion=sos_scalar_criterion,
+        params=params,
+        algorithm="scipy_lbfgsb",
+        constraints=constraints,
+        numdiff_options={"method": "complex"},
+    )
+    assert np.allclose(res["solution_params"]["value"], [0, 0, 0, 4], atol=1e-6)
+
+
 def test_warnings_with_old_bounds_names():
     base_params = pd.DataFrame()
     base_params["value"] = [1, 2, 3]
@@ -47,3 +67,126 @@ def test_scipy_lbfgsb_actually_calls_criterion_and_derivative():
             algorithm="scipy_lbfgsb",
             criterion_and_derivative=raising_crit_and_deriv,
         )
+
+
+@pytest.mark.parametrize(
+    "algorithm, multistart",
+    [("scipy_lbfgsb", False), ("scipy_lbfgsb", True), ("neldermead_parallel", False)],
+)
+def test_minimize_with_batch_criterion(algorithm, multistart):
+    n_points = []
+
+    @batch_criterion
+    def criterion(x):
+        n_points.append(len(x))
+        return (x**2).sum(axis=1)
+
+    params = pd.DataFrame({"value": [1.0, 2, 3]})
+    if multistart:
+        params["soft_lower_bound"] = -4.0
+        params["soft_upper_bound"] = 5.0
+
+    res = minimize(
+        criterion=criterion,
+        params=params,
+        algorithm=algorithm,
+        multistart=multistart,
+    )
+
+    assert np.allclose(res["solution_params"]["value"], 0, atol=1e-4)
+    assert max(n_points) > 1
+
+
+@pytest.mark.parametrize("multistart", [False, True])
+def test_minimize_least_squares_with_broyden_updates(multistart):
+    def criterion(params):
+        x = params["value"].to_numpy()
+        root_contributions = np.array(
+            [10 * (x[1] - x[0] ** 2), 1 - x[0], 10 * (x[3] - x[2] ** 2), 1 - x[2]]
+        )
+        return {
+            "root_contributions": root_contributions,
+            "value": root_contributions @ root_contributions,
+        }
+
+    params = pd.DataFrame({"value": [-1.2, 1, 0.5, -0.5]})
+    params["soft_lower_bound"] = -2.0
+    params["soft_upper_bound"] = 2.0
+
+    res = minimize(
+        criterion=criterion,
+        params=params,
+        algorithm="scipy_ls_trf",
+        multistart=multistart,
+        numdiff_options={"n_broyden_updates": 3},
+    )
+
+    local_optima = res["multistart_info"]["local_optima"] if multistart else [res]
+    for local_res in local_optima:
+        assert np.allclose(local_res["solution_params"]["value"], 1, atol=1e-4)
+
+
+@pytest.mark.parametrize("scaling", [False, True])
+def test_minimize_with_numpy_params(scaling):
+    @numpy_params
+    def criterion(x):
+        assert isinstance(x, np.ndarray)
+        return x @ x
+
+    @numpy_params
+    def derivative(x):
+        assert isinstance(x, np.ndarray)
+        return 2 * x
+
+    params = pd.DataFrame({"value": [1.0, 2, 3]})
+
+    res = minimize(
+        criterion=criterion,
+        params=params,
+        algorithm="scipy_lbfgsb",
+        scaling=scaling,
+        scaling_options={"method": "gradient"},
+        logging=False,
+    )
+    assert np.allclose(res["solution_params"]["value"], 0, atol=1e-4)
+
+    res = minimize(
+        criterion=criterion,
+        derivative=derivative,
+        params=params,
+        algorithm="scipy_lbfgsb",
+        scaling=scaling,
+        scaling_options={"method": "gradient"},
+    )
+    assert np.allclose(res["solution_params"]["value"], 0, atol=1e-4)
+
+
+@pytest.mark.parametrize("multistart, n_cores", product([False, True], [1, 2]))
+def test_minimize_with_buffered_logging(tmp_path, multistart, n_cores):
+    params = pd.DataFrame({"value": [1.0, 2, 3]})
+    params["soft_lower_bound"] = -4.0
+    params["soft_upper_bound"] = 5.0
+
+    iterations, steps = [], []
+    for buffered in [False, True]:
+        path = tmp_path / f"log_{buffered}.db"
+        minimize(
+            criterion=sos_scalar_criterion,
+            params=params,
+            algorithm="scipy_lbfgsb",
+            multistart=multistart,
+            logging=path,
+            log_options={"buffered_logging": buffered, "buffer_size": 7},
+            numdiff_options={"n_cores": n_cores},
+            multistart_options={"n_cores": n_cores},
+        )
+        database = load_database(path=path)
+        iterations.append(
+            read_table(database, "optimization_iterations", "dict_of_lists")
+        )
+        steps.append(read_steps_table(path))
+
+    # parallel evaluations are written in random order
+    unbuffered, buffered = [sorted(zip(it["step"], it["value"])) for it in iterations]
+    assert unbuffered == buffered
+    pd.testing.assert_frame_equal(steps[0], steps[1])
@@ -46,7 +46,7 @@ start_params = [
 ]
 
 TEST_CASES = []
-for subsolver in ["L-BFGS-B", "trust-constr"]:
+for subsolver in ["L-BFGS-B", "trust-constr", "gpcg"]:
     for x0 in start_params:
         for gtol in [1e-8]:
             for subtol in [1e-8, 1e-9]:
@@ -17,6 +17,7 @@ from estimagic.optimization.pounders_auxiliary import (
     get_interpolation_matrices_residual_model,
 )
 from estimagic.optimization.pounders_auxiliary import interpolate_f
+from estimagic.optimization.pounders_auxiliary import solve_subproblem
 from estimagic.optimization.pounders_auxiliary import update_initial_residual_model
 from estimagic.optimization.pounders_auxiliary import update_main_from_residual_model
 from estimagic.optimization.pounders_auxiliary import (
@@ -488,6 +489,80 @@ def test_get_interpolation_matrices_residual_model(
     assert np.allclose(n_modelpoints, expected["n_modelpoints_expected"])
 
 
+def test_get_interpolation_matrices_residual_model_rejects_duplicates():
+    n = 5
+    rng = np.random.default_rng(1234)
+    xs = rng.normal(size=(30, n))
+    xs[28] = xs[29]
+    history = LeastSquaresHistory()
+    history.add_entries(xs, rng.normal(size=(30, 3)))
+    model_indices = np.zeros(2 * n + 1, dtype=int)
+    model_indices[: n + 1] = np.arange(n + 1)
+
+    (
+        *_,
+        basis_null_space,
+        lower_triangular,
+        n_modelpoints,
+    ) = get_interpolation_matrices_residual_model(
+        history=history,
+        x_accepted=xs[0],
+        model_indices=model_indices,
+        delta=1,
+        c2=10,
+        theta2=1e-4,
+        n_maxinterp=2 * n + 1,
+        n_modelpoints=n + 1,
+    )
+
+    assert n_modelpoints == 2 * n + 1
+    aaae(model_indices[n + 1 :], [29, 27, 26, 25, 24])
+    aaae(basis_null_space.T @ basis_null_space, np.eye(n))
+    projected = lower_triangular[:, n + 1 :]
+    assert np.linalg.svd(projected, compute_uv=False).min() > 1e-4
+
+
+def test_solve_subproblem_gpcg_nonconvex():
+    main_model = {
+        "linear_terms": np.array([0.1, -1, 0.5]),
+        "square_terms": np.diag([-1.0, 2, 4]),
+    }
+    rslt = solve_subproblem(
+        solution=np.zeros(3),
+        delta=1,
+        main_model=main_model,
+        ftol=1e-10,
+        xtol=1e-10,
+        gtol=1e-10,
+        solver="gpcg",
+        lower_bounds=np.array([-2, -2, -0.1]),
+        upper_bounds=None,
+    )
+    aaae(rslt.x, [-1, 0.5, -0.1])
+    assert np.isclose(rslt.fun, -0.6 - 0.25 - 0.03)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_solve_subproblem_gpcg_convex(seed):
+    rng = np.random.default_rng(seed)
+    n = 6
+    root = rng.normal(size=(n, n))
+    main_model = {"linear_terms": 3 * rng.normal(size=n), "square_terms": root @ root.T}
+    kwargs = {
+        "solution": np.zeros(n),
+        "delta": 1,
+        "main_model": main_model,
+        "ftol": 1e-12,
+        "xtol": 1e-12,
+        "gtol": 1e-12,
+        "lower_bounds": -rng.uniform(size=n),
+        "upper_bounds": rng.uniform(size=n),
+    }
+    calculated = solve_subproblem(solver="gpcg", **kwargs)
+    expected = solve_subproblem(solver="L-BFGS-B", **kwargs)
+    aaae(calculated.x, expected.x)
+
+
 def test_interpolate_f(data_interpolate_f):
     inputs, expected = data_interpolate_f
     f_interpolated = interpolate_f(**inputs)
@@ -190,6 +190,37 @@ def test_update_state_converged(current_state, starts, results):
     assert is_converged
 
 
+@pytest.mark.parametrize(
+    "primary, expected_best_x",
+    [("contributions", np.zeros(3)), ("root_contributions", np.ones(3))],
+)
+def test_update_state_aggregates_criterion_vectors(
+    current_state, primary, expected_best_x
+):
+    results = [
+        {
+            "solution_x": np.zeros(3),
+            "solution_criterion": np.array([2.0, -1]),
+            "primary_criterion_entry": primary,
+        },
+        {
+            "solution_x": np.ones(3),
+            "solution_criterion": np.array([1.0, 1]),
+            "primary_criterion_entry": primary,
+        },
+    ]
+    criteria = {"xtol": 1e-3, "max_discoveries": 5}
+
+    new_state, _ = update_convergence_state(
+        current_state=current_state,
+        starts=[np.zeros(3), np.zeros(3)],
+        results=results,
+        convergence_criteria=criteria,
+    )
+
+    aaae(new_state["best_x"], expected_best_x)
+
+
 def test_update_state_not_converged(current_state, starts, results):
     criteria = {
         "xtol": 1e-3,
@@ -204,3 +235,20 @@ def test_update_state_not_converged(current_state, starts, results):
     )
 
     assert not is_converged
+
+
+def test_update_state_with_only_failed_optimizations(current_state, starts):
+    criteria = {
+        "xtol": 1e-3,
+        "max_discoveries": 2,
+    }
+
+    new_state, is_converged = update_convergence_state(
+        current_state=current_state,
+        starts=starts,
+        results=["Traceback"],
+        convergence_criteria=criteria,
+    )
+
+    assert new_state == current_state
+    assert not is_converged
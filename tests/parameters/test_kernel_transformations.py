@@ -5,7 +5,7 @@ import estimagic.parameters.kernel_transformations as kt
 import numpy as np
 import pytest
 from estimagic.differentiation.derivatives import first_derivative
-from estimagic.parameters.kernel_transformations import cov_matrix_to_sdcorr_params
+from estimagic.utilities import cov_matrix_to_sdcorr_params
 from numpy.testing import assert_array_almost_equal as aaae
 
 to_test = list(product(range(10, 30, 5), [1234, 5471]))
@@ -115,3 +115,79 @@ def test_sdcorr_to_internal_jacobian(dim, seed):
     deriv = kt.sdcorr_to_internal_jacobian(external, None)
 
     aaae(deriv, numerical_deriv["derivative"], decimal=3)
+
+
+batched_cases = {
+    "covariance_from_internal": get_internal_cholesky,
+    "covariance_to_internal": get_external_covariance,
+    "probability_from_internal": get_internal_probability,
+    "probability_to_internal": get_external_probability,
+    "sdcorr_from_internal": get_internal_cholesky,
+    "sdcorr_to_internal": get_external_sdcorr,
+}
+
+
+@pytest.mark.parametrize("func_name", batched_cases)
+def test_kernel_transformations_with_batches(func_name):
+    func = getattr(kt, func_name)
+    values = np.array(
+        [
+            [batched_cases[func_name](4, seed=i + 2 * j) for i in range(2)]
+            for j in range(3)
+        ]
+    )
+    calculated = func(values, None)
+    expected = np.array([[func(vals, None) for vals in row] for row in values])
+
+    assert calculated.shape == expected.shape
+    aaae(calculated, expected)
+
+
+def test_linear_transformations_with_batches():
+    np.random.seed(0)
+    constr = {"to_internal": np.random.randn(3, 3), "from_internal": np.eye(3) * 2}
+    values = np.random.randn(5, 3)
+    aaae(kt.linear_to_internal(values, constr), values @ constr["to_internal"].T)
+    aaae(kt.linear_from_internal(values, constr), 2 * values)
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3, 6])
+def test_covariance_from_internal_jacobian_matches_kronecker_formula(dim):
+    internal = get_internal_cholesky(dim, seed=dim)
+    chol = np.zeros((dim, dim))
+    chol[np.tril_indices(dim)] = internal
+
+    elimination = kt._elimination_matrix(dim)
+    commutation = kt._commutation_matrix(dim)
+    expected = (
+        elimination
+        @ (np.eye(dim**2) + commutation)
+        @ np.kron(chol, np.eye(dim))
+        @ kt._duplication_matrix(dim)
+    )
+
+    aaae(kt.covariance_from_internal_jacobian(internal, None), expected)
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+def test_sdcorr_from_internal_jacobian_small_dimensions(dim):
+    internal = get_internal_cholesky(dim, seed=dim)
+
+    func = partial(kt.sdcorr_from_internal, **{"constr": None})
+    numerical_deriv = first_derivative(func, internal)
+    deriv = kt.sdcorr_from_internal_jacobian(internal, None)
+
+    aaae(deriv, numerical_deriv["derivative"], decimal=5)
+
+
+def test_kernel_matrices_are_memoized_and_read_only():
+    for func in [
+        kt._elimination_matrix,
+        kt._duplication_matrix,
+        kt._transformation_matrix,
+        kt._commutation_matrix,
+    ]:
+        matrix = func(4)
+        assert func(4) is matrix
+        with pytest.raises(ValueError):
+            matrix[0, 0] = 2
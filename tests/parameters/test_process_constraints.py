@@ -2,6 +2,8 @@
 import numpy as np
 import pandas as pd
 import pytest
+from estimagic.parameters import process_constraints as pc_module
+from estimagic.parameters.consolidate_constraints import _join_overlapping_lists
 from estimagic.parameters.process_constraints import _process_selectors
 from estimagic.parameters.process_constraints import (
     _replace_pairwise_equality_by_equality,
@@ -147,3 +149,74 @@ def test_empty_constraint_is_dropped(constraints):
     aaae(pp["_pre_replacements"], np.arange(5))
     # no post replacements
     aaae(pp["_post_replacements"], np.full(5, -1))
+
+
+def test_process_selectors_with_list_of_labels():
+    params = pd.DataFrame(
+        np.ones((4, 1)),
+        columns=["value"],
+        index=pd.MultiIndex.from_product([["a", "b"], [0, 1]]),
+    )
+    constraints = [
+        {"loc": [("b", 1), ("a", 0)], "type": "equality"},
+        {"loc": ("a", 1), "type": "fixed"},
+        {"loc": "b", "type": "increasing"},
+    ]
+    calculated = [constr["index"] for constr in _process_selectors(constraints, params)]
+    assert calculated == [[3, 0], [1], [2, 3]]
+
+
+def test_join_overlapping_lists():
+    candidates = [[5, 6], [1, 2], [7], [3, 1], [6, 4], [2, 9]]
+    calculated = _join_overlapping_lists(candidates)
+    assert calculated == [[4, 5, 6], [1, 2, 3, 9], [7]]
+
+
+def test_chained_equality_constraints_are_consolidated():
+    params = pd.DataFrame(np.arange(6, dtype=float).reshape(-1, 1), columns=["value"])
+    params["value"] = [1, 0, 1, 1, 1, 0]
+    constraints = [
+        {"loc": [3, 4], "type": "equality"},
+        {"loc": [0, 2], "type": "equality"},
+        {"loc": [4, 2], "type": "equality"},
+        {"loc": 3, "type": "fixed"},
+    ]
+    _, pp = process_constraints(constraints, params)
+    aaae(pp["_post_replacements"], [-1, -1, 0, 0, 0, -1])
+    aaae(pp["_is_fixed_to_value"], [True, False, True, True, True, False])
+    aaae(pp["_internal_free"], [False, True, False, False, False, True])
+
+
+def test_processed_constraints_are_cached(monkeypatch):
+    calls = []
+    consolidate = pc_module.consolidate_constraints
+
+    def counting_consolidate(*args, **kwargs):
+        calls.append(None)
+        return consolidate(*args, **kwargs)
+
+    monkeypatch.setattr(pc_module, "consolidate_constraints", counting_consolidate)
+    pc_module._PROCESSED_CONSTRAINTS_CACHE.clear()
+
+    params = pd.DataFrame({"value": [0.5, 0.3, 0.2, 4.0]}, index=list("abcd"))
+    constraints = [{"loc": ["a", "b", "c"], "type": "probability"}]
+
+    pc, pp = process_constraints(constraints, params)
+    pp["_internal_lower"] = np.nan
+    pc[0]["index"].append(3)
+    pc_cached, pp_cached = process_constraints(constraints, params.copy())
+    assert len(calls) == 1
+    assert pc_cached[0]["index"] == [0, 1, 2]
+    assert pp_cached["_internal_lower"].notnull().all()
+
+    params.loc["d", "value"] = 5
+    process_constraints(constraints, params)
+    assert len(calls) == 2
+
+
+def test_warnings_are_repeated_for_cached_results():
+    params = pd.DataFrame({"value": [1.0, 2.0]})
+    constraints = [{"loc": 0, "type": "fixed", "value": 3}]
+    for _ in range(2):
+        with pytest.warns(UserWarning, match="fixed to a different value"):
+            process_constraints(constraints, params)
@@ -1,6 +1,7 @@
 from functools import partial
 from itertools import product
 
+import estimagic.parameters.kernel_transformations as kt
 import numpy as np
 import pandas as pd
 import pytest
@@ -10,12 +11,15 @@ from estimagic.parameters.parameter_conversion import get_reparametrize_function
 from estimagic.parameters.process_constraints import process_constraints
 from estimagic.parameters.reparametrize import _multiply_from_left
 from estimagic.parameters.reparametrize import _multiply_from_right
+from estimagic.parameters.reparametrize import compile_reparametrization_plan
+from estimagic.parameters.reparametrize import convert_external_derivative_to_internal
 from estimagic.parameters.reparametrize import post_replace
 from estimagic.parameters.reparametrize import post_replace_jacobian
 from estimagic.parameters.reparametrize import pre_replace
 from estimagic.parameters.reparametrize import pre_replace_jacobian
 from estimagic.parameters.reparametrize import reparametrize_from_internal
 from estimagic.parameters.reparametrize import reparametrize_to_internal
+from estimagic.parameters.reparametrize import transformation_jacobian
 from numpy.testing import assert_array_almost_equal as aaae
 
 
@@ -188,8 +192,10 @@ def test_pre_replace_jacobian(example_params, all_constraints, case, number):
     numerical_deriv[np.isnan(numerical_deriv)] = 0
 
     deriv = pre_replace_jacobian(pre_repl, len(internal_p))
+    sparse_deriv = pre_replace_jacobian(pre_repl, len(internal_p), sparse=True)
 
     aaae(deriv, numerical_deriv)
+    aaae(sparse_deriv.toarray(), numerical_deriv)
 
 
 @pytest.mark.parametrize("case, number", to_test)
@@ -215,8 +221,31 @@ def test_post_replace_jacobian(example_params, all_constraints, case, number):
     numerical_deriv = first_derivative(func, external)
 
     deriv = post_replace_jacobian(post_repl)
+    sparse_deriv = post_replace_jacobian(post_repl, sparse=True)
 
     aaae(deriv, numerical_deriv["derivative"])
+    aaae(sparse_deriv.toarray(), numerical_deriv["derivative"])
+
+
+@pytest.mark.parametrize("case, number", to_test)
+def test_sparse_transformation_jacobian(example_params, all_constraints, case, number):
+    constraints = all_constraints[case]
+    params = reduce_params(example_params, constraints)
+    params["value"] = params[f"value{number}"]
+
+    keep = params[f"internal_value{number}"].notnull()
+
+    pc, pp = process_constraints(constraints, params)
+
+    internal_p = params[f"internal_value{number}"][keep].to_numpy()
+    fixed_val = pp["_internal_fixed_value"].to_numpy()
+    pre_repl = pp["_pre_replacements"].to_numpy()
+    pre_replaced = pre_replace(internal_p, fixed_val, pre_repl)
+
+    dense = transformation_jacobian(pc, pre_replaced)
+    sparse = transformation_jacobian(pc, pre_replaced, sparse=True)
+
+    aaae(sparse.toarray(), dense)
 
 
 def test_linear_constraint():
@@ -292,3 +321,160 @@ def test_multiply_from_left_and_right(seed):
 
     aaae(calc_from_left, expected)
     aaae(calc_from_right, expected)
+
+
+def test_reparametrize_from_internal_propagates_complex_steps():
+    params = pd.DataFrame({"value": [1.0, 0.2, 2.0, 3, 3, 1]})
+    constraints = [
+        {"loc": [0, 1, 2], "type": "covariance"},
+        {"loc": [3, 4], "type": "equality"},
+        {"loc": 5, "type": "fixed"},
+    ]
+    pc, pp = process_constraints(constraints, params)
+    internal = reparametrize_to_internal(
+        pp["value"].to_numpy(), pp["_internal_free"].to_numpy(), pc
+    )
+    func = partial(
+        reparametrize_from_internal,
+        fixed_values=pp["_internal_fixed_value"].to_numpy(),
+        pre_replacements=pp["_pre_replacements"].to_numpy(),
+        params=params,
+        processed_constraints=pc,
+        post_replacements=pp["_post_replacements"].to_numpy(),
+    )
+
+    complex_step = first_derivative(func, internal, method="complex")["derivative"]
+    central = first_derivative(func, internal, method="central")["derivative"]
+    aaae(complex_step, central)
+
+
+@pytest.mark.parametrize("n_rows", [1, 3, 20])
+def test_convert_external_derivative_with_dense_and_sparse_jacobians(n_rows):
+    params = pd.DataFrame({"value": [1.0, 0.2, 2.0, 3, 3, 1, 0.5]})
+    constraints = [
+        {"loc": [0, 1, 2], "type": "covariance"},
+        {"loc": [3, 4], "type": "equality"},
+        {"loc": 5, "type": "fixed"},
+    ]
+    pc, pp = process_constraints(constraints, params)
+    internal = reparametrize_to_internal(
+        pp["value"].to_numpy(), pp["_internal_free"].to_numpy(), pc
+    )
+    pre_repl = pp["_pre_replacements"].to_numpy()
+    post_repl = pp["_post_replacements"].to_numpy()
+    kwargs = {
+        "internal_values": internal,
+        "fixed_values": pp["_internal_fixed_value"].to_numpy(),
+        "pre_replacements": pre_repl,
+        "processed_constraints": pc,
+        "scaling_factor": np.arange(len(internal)) + 1.0,
+    }
+    external_derivative = np.random.default_rng(n_rows).normal(size=(n_rows, 7))
+
+    sparse = convert_external_derivative_to_internal(
+        external_derivative, post_replacements=post_repl, **kwargs
+    )
+    dense = convert_external_derivative_to_internal(
+        external_derivative,
+        pre_replace_jac=pre_replace_jacobian(pre_repl, len(internal)),
+        post_replace_jac=post_replace_jacobian(post_repl),
+        **kwargs,
+    )
+
+    assert isinstance(sparse, np.ndarray)
+    assert sparse.shape == dense.shape
+    aaae(sparse, dense)
+
+
+def _transform_constraint_by_constraint(values, processed_constraints, direction):
+    out = values.copy()
+    for constr in processed_constraints:
+        func = getattr(kt, f"{constr['type']}_{direction}")
+        out[constr["index"]] = func(values[constr["index"]], constr)
+    return out
+
+
+def test_compiled_plan_groups_constraints_and_matches_kernel_transformations():
+    n_blocks = 4
+    probs = np.tile([0.2, 0.3, 0.5], n_blocks)
+    cov = np.tile([1, 0.1, 2, 0.2, 0.3, 3], n_blocks)
+    sdcorr = np.tile([1, 2, 3, 0.1, 0.2, 0.3], n_blocks)
+    params = pd.DataFrame({"value": np.hstack([probs, cov, sdcorr, [1.0, 2, 4]])})
+
+    constraints = []
+    for i in range(n_blocks):
+        constraints += [
+            {"loc": list(range(3 * i, 3 * i + 3)), "type": "probability"},
+            {"loc": list(range(12 + 6 * i, 18 + 6 * i)), "type": "covariance"},
+            {"loc": list(range(36 + 6 * i, 42 + 6 * i)), "type": "sdcorr"},
+        ]
+    constraints.append({"loc": [60, 61, 62], "type": "increasing"})
+    pc, pp = process_constraints(constraints, params)
+
+    plan = compile_reparametrization_plan(pc)
+    assert sorted(step["type"] for step in plan) == [
+        "covariance",
+        "linear",
+        "probability",
+        "sdcorr",
+    ]
+    assert all(step["index"].shape[0] == n_blocks for step in plan[:3])
+
+    external = params["value"].to_numpy()
+    internal = reparametrize_to_internal(external, np.full(63, True), pc, plan=plan)
+    expected = _transform_constraint_by_constraint(external, pc, "to_internal")
+    aaae(internal, expected)
+
+    from_internal = _transform_constraint_by_constraint(internal, pc, "from_internal")
+    aaae(from_internal, external)
+    calculated = reparametrize_from_internal(
+        internal=internal,
+        fixed_values=np.full(63, np.nan),
+        pre_replacements=np.arange(63),
+        processed_constraints=pc,
+        post_replacements=np.full(63, -1),
+        params=params,
+        plan=plan,
+    )
+    aaae(calculated, external)
+
+
+def test_compiled_plan_keeps_order_of_overlapping_constraints():
+    constraints = [
+        {"type": "probability", "index": np.array([0, 1])},
+        {"type": "probability", "index": np.array([1, 2])},
+    ]
+    plan = compile_reparametrization_plan(constraints)
+    assert len(plan) == 2
+
+    values = np.array([1.0, 2, 3])
+    for step in plan:
+        values[step["index"]] = step["from_internal"](values[step["index"]], step)
+    aaae(values, [1 / 3, 2 / 11, 9 / 11])
+
+
+@pytest.mark.parametrize("case, number", to_test)
+def test_reparametrize_with_batches(example_params, all_constraints, case, number):
+    constraints = all_constraints[case]
+    params = reduce_params(example_params, constraints)
+    params["value"] = params[f"value{number}"]
+
+    _, pp = process_constraints(constraints, params)
+    n_free = int(pp._internal_free.sum())
+
+    to_internal, from_internal = get_reparametrize_functions(
+        params=params,
+        constraints=constraints,
+        scaling_factor=np.arange(n_free) + 1.0,
+        scaling_offset=np.ones(n_free),
+    )
+
+    internal = to_internal(params["value"].to_numpy())
+    np.random.seed(number)
+    internal_sample = internal * np.random.uniform(0.9, 1.1, size=(4, n_free))
+
+    external_sample = from_internal(internal_sample)
+    expected = np.array([from_internal(x) for x in internal_sample])
+    aaae(external_sample, expected)
+
+    aaae(to_internal(external_sample), [to_internal(x) for x in external_sample])
@@ -1,12 +1,17 @@
 import itertools
+import os
 import warnings
 
+import cloudpickle
 import pytest
 from estimagic.batch_evaluators import joblib_batch_evaluator
+from estimagic.batch_evaluators import pool_batch_evaluator
+from estimagic.batch_evaluators import PoolBatchEvaluator
 
 
 batch_evaluators = [
     joblib_batch_evaluator,
+    pool_batch_evaluator,
 ]
 
 n_core_list = [1, 2]
@@ -94,3 +99,54 @@ def test_batch_evaluator_with_dict_unpacking(batch_evaluator, n_cores):
     )
     expected = [3, 7]
     assert calculated == expected
+
+
+def get_pid(x):
+    return os.getpid()
+
+
+@pytest.mark.slow
+def test_pool_batch_evaluator_reuses_workers():
+    with PoolBatchEvaluator(n_cores=2) as evaluator:
+        first = evaluator(func=get_pid, arguments=list(range(20)))
+        second = evaluator(func=get_pid, arguments=list(range(20)))
+        assert evaluator(func=double, arguments=[1, 2]) == [2, 4]
+
+    assert os.getpid() not in first
+    assert set(second).issubset(set(first))
+    assert evaluator._pool is None
+
+
+@pytest.mark.slow
+def test_pool_batch_evaluator_ships_func_once(monkeypatch):
+    dumped_funcs = []
+    dumps = cloudpickle.dumps
+
+    def counting_dumps(obj, *args, **kwargs):
+        if callable(obj):
+            dumped_funcs.append(obj)
+        return dumps(obj, *args, **kwargs)
+
+    monkeypatch.setattr(cloudpickle, "dumps", counting_dumps)
+
+    with PoolBatchEvaluator(n_cores=2) as evaluator:
+        for _ in range(3):
+            assert evaluator(func=double, arguments=[1, 2]) == [2, 4]
+        assert evaluator(func=buggy_func, arguments=[1], error_handling="continue")[
+            0
+        ].startswith("Traceback")
+        assert evaluator(func=add_x_and_y, arguments=[(1, 2)], unpack_symbol="*") == [3]
+        assert len(list(evaluator._func_dir.iterdir())) == 3
+
+    assert dumped_funcs == [double, buggy_func, add_x_and_y]
+
+
+@pytest.mark.slow
+def test_pool_batch_evaluator_is_restarted_after_error():
+    evaluator = PoolBatchEvaluator(n_cores=2)
+    with pytest.raises(AssertionError):
+        evaluator(func=buggy_func, arguments=list(range(4)), error_handling="raise")
+    assert evaluator._pool is None
+
+    assert evaluator(func=double, arguments=[1, 2]) == [2, 4]
+    evaluator.close()
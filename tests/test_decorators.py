@@ -1,8 +1,14 @@
+import functools
+
 import numpy as np
 import pandas as pd
 import pytest
+from estimagic.decorators import batch_criterion
 from estimagic.decorators import catch
+from estimagic.decorators import get_batch_function
 from estimagic.decorators import numpy_interface
+from estimagic.decorators import numpy_params
+from estimagic.decorators import takes_numpy_params
 from estimagic.decorators import unpack
 from numpy.testing import assert_array_almost_equal as aaae
 from pandas.testing import assert_frame_equal
@@ -94,3 +100,31 @@ def test_unpack_decorator_two_stars():
         return x + y
 
     assert f({"x": 3, "y": 4}) == 7
+
+
+def test_batch_criterion_with_single_and_stacked_params():
+    @batch_criterion
+    def f(x, scale):
+        return scale * (x**2).sum(axis=1)
+
+    params = pd.DataFrame({"value": [1.0, 2]})
+    assert f(params, scale=2) == 10
+    assert f(np.array([1.0, 2]), scale=2) == 10
+
+    batch_func = get_batch_function(functools.partial(f, scale=2))
+    aaae(batch_func(np.array([[1.0, 2], [0, 1]])), [10, 2])
+
+
+def test_get_batch_function_of_normal_function():
+    assert get_batch_function(functools.partial(np.sum, axis=0)) is None
+
+
+def test_takes_numpy_params():
+    @numpy_params
+    def f(x, scale):
+        return scale * x.sum()
+
+    assert f(np.ones(2), scale=2) == 4
+    assert takes_numpy_params(functools.partial(f, scale=2))
+    assert takes_numpy_params(batch_criterion(np.sum))
+    assert not takes_numpy_params(functools.partial(np.sum, axis=0))